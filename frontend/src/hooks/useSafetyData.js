@@ -26,6 +26,19 @@ export const useSafetyData = () => {
       }
     };
 
+    // Prefer pushed updates from the backend when it is configured
+    const unsubscribe = api.subscribeSafetyData(
+      (data) => {
+        setSafetyData((prev) => ({ ...prev, ...data }));
+        setError(null);
+        setLoading(false);
+      },
+      (err) => setError(err.message)
+    );
+    if (unsubscribe) {
+      return unsubscribe;
+    }
+
     // Fetch initial data
     fetchData();
 
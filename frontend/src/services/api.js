@@ -1,3 +1,6 @@
+// Base URL of the Python safety API (src/api/server.py); when unset the mock data below is used
+const SAFETY_API_URL = import.meta.env.VITE_SAFETY_API_URL || '';
+
 // Mock API service to simulate communication with backend
 class ApiService {
   constructor() {
@@ -66,6 +69,31 @@ class ApiService {
     });
   }
 
+  // Subscribe to pushed safety updates from the backend.
+  // The server sends one full snapshot, then deltas containing only changed fields.
+  // Returns an unsubscribe function, or null when no backend is configured.
+  subscribeSafetyData(onData, onError) {
+    if (!SAFETY_API_URL || typeof EventSource === 'undefined') {
+      return null;
+    }
+    let current = {};
+    const source = new EventSource(`${SAFETY_API_URL}/api/safety/stream`);
+    source.addEventListener('snapshot', (event) => {
+      current = JSON.parse(event.data);
+      onData({ ...current });
+    });
+    source.addEventListener('delta', (event) => {
+      const { changes } = JSON.parse(event.data);
+      current = { ...current, ...changes };
+      onData({ ...current });
+    });
+    source.onerror = () => {
+      // EventSource reconnects on its own and the server resends a snapshot
+      if (onError) onError(new Error('Lost connection to safety stream'));
+    };
+    return () => source.close();
+  }
+
   // Simulate triggering emergency with auto-trigger for critical threats
   async triggerEmergency(autoTriggered = false) {
     // In a real app, this would communicate with the Python emergency system
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Fleet aggregator for the Women Safety Application
+Receives the encrypted UDP alerts and heartbeats broadcast by every
+crowd_detector node, merges duplicate alerts from cameras in the same zone
+and keeps per-node health, feeding the API state and the emergency system
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import socket
+import asyncio
+import argparse
+import itertools
+import threading
+from collections import deque, Counter
+
+from cryptography.fernet import Fernet, MultiFernet, InvalidToken
+
+from api.state import get_safety_state
+from api.server import SafetyApiServer
+from utils.config import get_config_manager
+from utils.metrics import get_metrics
+
+
+def load_cipher(keys):
+    """MultiFernet over comma-separated keys (first encrypts, all decrypt) so keys can be rotated"""
+    keys = [k.strip() for k in keys.split(",") if k.strip()] if isinstance(keys, str) else list(keys)
+    if not keys:
+        raise ValueError("fleet.key is not set; every node and the aggregator need the same key")
+    return MultiFernet([Fernet(k) for k in keys])
+
+
+class NodeStats:
+    """Health and rate counters for one camera node"""
+
+    __slots__ = ("node_id", "zone", "address", "first_seen", "last_seen", "alerts", "heartbeats",
+                 "duplicates", "info", "window_start", "window_count", "rate")
+
+    def __init__(self, node_id, zone, address, now):
+        self.node_id = node_id
+        self.zone = zone
+        self.address = address
+        self.first_seen = now
+        self.last_seen = now
+        self.alerts = 0
+        self.heartbeats = 0
+        self.duplicates = 0
+        self.info = {}
+        self.window_start = now
+        self.window_count = 0
+        self.rate = 0.0
+
+    def seen(self, now):
+        self.last_seen = now
+        self.window_count += 1
+        elapsed = now - self.window_start
+        if elapsed >= 10.0:
+            # Messages per second over the last ~10 s window
+            self.rate = self.window_count / elapsed
+            self.window_start = now
+            self.window_count = 0
+
+    def to_dict(self, now, timeout):
+        return {
+            "node_id": self.node_id,
+            "zone": self.zone,
+            "address": self.address,
+            "status": "online" if now - self.last_seen <= timeout else "stale",
+            "last_seen": self.last_seen,
+            "alerts": self.alerts,
+            "heartbeats": self.heartbeats,
+            "duplicates": self.duplicates,
+            "messages_per_second": round(self.rate, 3),
+            "info": self.info,
+        }
+
+
+class FleetAggregator:
+    """Decrypts node datagrams, deduplicates alerts and tracks node health
+
+    Alerts from nodes in the same zone (or the same node when it has no zone)
+    within `window` seconds of the incident's last alert are merged into one
+    incident; only the first alert of an incident is forwarded to listeners.
+    The event loop mutates the tables and the API thread serializes them, so
+    both hold `lock`; listeners run outside it.
+    """
+
+    def __init__(self, keys, window=10.0, node_timeout=30.0, max_token_age=0, history=200):
+        self.cipher = load_cipher(keys)
+        self.window = window
+        self.node_timeout = node_timeout
+        self.max_token_age = max_token_age or None
+        self.nodes = {}
+        self.open_incidents = {}
+        self.incidents = deque(maxlen=history)
+        self.incident_ids = itertools.count(1)
+        self.listeners = []
+        self.status_listeners = []
+        self.lock = threading.Lock()
+        self.received = 0
+        self.invalid = 0
+        self.invalid_by_address = Counter()
+        self.merged = 0
+
+        metrics = get_metrics()
+        self.m_received = metrics.counter("fleet_datagrams_total", "Datagrams received from nodes")
+        self.m_invalid = metrics.counter("fleet_invalid_total", "Datagrams that failed to decrypt or parse")
+        self.m_incidents = metrics.counter("fleet_incidents_total", "Deduplicated incidents")
+        self.m_merged = metrics.counter("fleet_alerts_merged_total", "Alerts merged into an open incident")
+
+    def add_listener(self, listener):
+        """Register listener(incident dict), called once per new incident"""
+        self.listeners.append(listener)
+
+    def add_status_listener(self, listener):
+        """Register listener(online_nodes, open_incidents), called on every expire() tick"""
+        self.status_listeners.append(listener)
+
+    def handle(self, data, address, now=None):
+        """Process one datagram; returns the new incident if it opened one"""
+        now = time.time() if now is None else now
+        self.m_received.inc()
+        try:
+            message = json.loads(self.cipher.decrypt(data, self.max_token_age))
+            node_id = str(message.get("node_id") or f"{address[0]}:{address[1]}")
+        except (InvalidToken, ValueError, TypeError, AttributeError):
+            with self.lock:
+                self.received += 1
+                self.invalid += 1
+                self.invalid_by_address[address[0]] += 1
+            self.m_invalid.inc()
+            return None
+
+        with self.lock:
+            self.received += 1
+            node = self.nodes.get(node_id)
+            if node is None:
+                node = self.nodes[node_id] = NodeStats(node_id, str(message.get("zone", "")), address[0], now)
+            node.seen(now)
+
+            if message.get("type") == "heartbeat":
+                node.heartbeats += 1
+                node.info = message.get("info", {})
+                return None
+            node.alerts += 1
+            incident = self._dedup(node, message, now)
+        if incident is not None:
+            self._notify(incident)
+        return incident
+
+    def _notify(self, incident):
+        for listener in list(self.listeners):
+            try:
+                listener(incident)
+            except Exception as e:
+                print(f"❌ Error in fleet listener: {str(e)}")
+
+    def _dedup(self, node, message, now):
+        """Merge into the zone's open incident or open a new one (called with the lock held)"""
+        key = node.zone or node.node_id
+        incident = self.open_incidents.get(key)
+        if incident is not None and now - incident["last_seen"] <= self.window:
+            incident["last_seen"] = now
+            incident["alerts"] += 1
+            if node.node_id not in incident["nodes"]:
+                incident["nodes"].append(node.node_id)
+            else:
+                node.duplicates += 1
+            self.merged += 1
+            self.m_merged.inc()
+            return None
+
+        incident = {
+            "id": next(self.incident_ids),
+            "zone": node.zone,
+            "first_seen": now,
+            "last_seen": now,
+            "alerts": 1,
+            "nodes": [node.node_id],
+            "metadata": message,
+        }
+        self.open_incidents[key] = incident
+        self.incidents.append(incident)
+        self.m_incidents.inc()
+        return incident
+
+    def expire(self, now=None):
+        """Drop closed incidents from the dedup table and report fleet status to status listeners"""
+        now = time.time() if now is None else now
+        with self.lock:
+            for key in [k for k, inc in self.open_incidents.items() if now - inc["last_seen"] > self.window]:
+                del self.open_incidents[key]
+            online = self._online_locked(now)
+            open_count = len(self.open_incidents)
+        for listener in list(self.status_listeners):
+            try:
+                listener(online, open_count)
+            except Exception as e:
+                print(f"❌ Error in fleet status listener: {str(e)}")
+
+    def _online_locked(self, now):
+        return sum(1 for node in self.nodes.values() if now - node.last_seen <= self.node_timeout)
+
+    def online_nodes(self, now=None):
+        now = time.time() if now is None else now
+        with self.lock:
+            return self._online_locked(now)
+
+    def nodes_json(self):
+        # Runs on the API thread: snapshot under the lock, encode outside it
+        now = time.time()
+        with self.lock:
+            body = {"nodes": [n.to_dict(now, self.node_timeout) for n in self.nodes.values()],
+                    "received": self.received, "invalid": self.invalid,
+                    "invalid_by_address": dict(self.invalid_by_address.most_common(20))}
+        return "application/json", json.dumps(body).encode("utf-8")
+
+    def incidents_json(self):
+        with self.lock:
+            body = {"incidents": [dict(inc, nodes=list(inc["nodes"])) for inc in self.incidents],
+                    "merged": self.merged}
+        return "application/json", json.dumps(body).encode("utf-8")
+
+
+class FleetReceiver:
+    """Drains the UDP socket from an asyncio reader callback
+
+    asyncio's datagram transport reads one packet per event-loop wake-up, and
+    at tens of thousands of packets per second that overhead costs more than
+    decrypting them. This reader drains up to `batch` packets per wake-up
+    and stamps them with a single clock read.
+    """
+
+    def __init__(self, aggregator, sock, batch=256):
+        self.aggregator = aggregator
+        self.sock = sock
+        self.batch = batch
+        self.loop = None
+        sock.setblocking(False)
+
+    def start(self, loop):
+        self.loop = loop
+        loop.add_reader(self.sock.fileno(), self._read_ready)
+        return self
+
+    def _read_ready(self):
+        recvfrom = self.sock.recvfrom
+        handle = self.aggregator.handle
+        now = time.time()
+        for _ in range(self.batch):
+            try:
+                data, address = recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(f"⚠️ Fleet socket error: {e}")
+                return
+            handle(data, address, now)
+
+    def close(self):
+        if self.loop is not None:
+            self.loop.remove_reader(self.sock.fileno())
+            self.loop = None
+        self.sock.close()
+
+
+async def serve_fleet(aggregator, host="0.0.0.0", port=5005, receive_buffer=4 * 1024 * 1024):
+    """Bind the UDP endpoint and expire incidents periodically; runs until cancelled"""
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Large kernel buffer so bursts from many nodes are absorbed instead of dropped
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+    sock.bind((host, port))
+    receiver = FleetReceiver(aggregator, sock).start(loop)
+    print(f"📡 Fleet aggregator listening on udp://{host}:{sock.getsockname()[1]}")
+    try:
+        while True:
+            await asyncio.sleep(min(aggregator.window, 5.0))
+            aggregator.expire()
+    finally:
+        receiver.close()
+
+
+def connect_outputs(aggregator, state=None, emergency=None):
+    """Feed new incidents into the SafetyState (and an EmergencySystem, if given)
+
+    threatLevel goes HIGH when an incident opens and back to LOW on the
+    first expire() tick with no open incidents; fleetNodesOnline follows
+    every tick, so heartbeats and stale nodes show up without an incident.
+    """
+    state = state or get_safety_state()
+
+    def on_incident(incident):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(incident["first_seen"]))
+        state.update(threatLevel="HIGH", lastAlert=stamp, fleetIncidents=incident["id"],
+                     fleetNodesOnline=aggregator.online_nodes())
+        print(f"🚨 Incident #{incident['id']} zone={incident['zone'] or '-'} node={incident['nodes'][0]}")
+        if emergency is not None:
+            emergency.handle_alert(incident)
+
+    def on_status(online, open_incidents):
+        changes = {"fleetNodesOnline": online}
+        if not open_incidents:
+            changes["threatLevel"] = "LOW"
+        state.update(**changes)
+
+    aggregator.add_listener(on_incident)
+    aggregator.add_status_listener(on_status)
+    return on_incident
+
+
+def main():
+    from emergency.emergency_system import EmergencySystem
+
+    config = get_config_manager().current
+    parser = argparse.ArgumentParser(description="Women Safety fleet alert aggregator")
+    parser.add_argument("--host", default=config.fleet.listen_host, help="UDP bind address")
+    parser.add_argument("--port", type=int, default=config.fleet.listen_port, help="UDP port (default: 5005)")
+    parser.add_argument("--api-port", type=int, default=config.api.port, help="Safety API port, 0 to disable")
+    args = parser.parse_args()
+
+    aggregator = FleetAggregator(config.fleet.key, config.fleet.dedup_window, config.fleet.node_timeout,
+                                 config.fleet.max_token_age)
+    connect_outputs(aggregator, emergency=EmergencySystem())
+    if args.api_port:
+        api_server = SafetyApiServer(host=config.api.host, port=args.api_port)
+        api_server.add_route("/api/fleet/nodes", aggregator.nodes_json)
+        api_server.add_route("/api/fleet/incidents", aggregator.incidents_json)
+        api_server.add_route("/metrics", get_metrics().prometheus_route)
+        try:
+            api_server.start_in_thread()
+        except OSError as e:
+            print(f"❌ Fleet API failed to start on {config.api.host}:{args.api_port}: {str(e)}")
+    try:
+        asyncio.run(serve_fleet(aggregator, args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Stopping fleet aggregator...")
+
+
+if __name__ == "__main__":
+    main()
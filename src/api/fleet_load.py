@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Load generator for the fleet aggregator
+Simulates many camera nodes blasting encrypted alerts and heartbeats at a
+local FleetAggregator and reports datagrams/s, loss and CPU per datagram
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import socket
+import random
+import asyncio
+import argparse
+import multiprocessing
+
+from cryptography.fernet import Fernet
+
+from api.fleet import FleetAggregator, FleetReceiver
+
+
+def build_payloads(key, nodes, zones, alert_fraction, invalid_fraction, per_node=32, seed=0):
+    """Pre-encrypt datagrams so the senders measure the aggregator, not Fernet.encrypt"""
+    rng = random.Random(seed)
+    cipher = Fernet(key)
+    payloads = []
+    for n in range(nodes):
+        for i in range(per_node):
+            if rng.random() < alert_fraction:
+                message = {"type": "alert", "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                           "n_people": rng.randint(5, 12), "risky_pose": True, "motion": True,
+                           "audio_alert": rng.random() < 0.5}
+            else:
+                message = {"type": "heartbeat", "info": {"frames": i * 30, "uptime": i}}
+            message.update(node_id=f"node-{n:03d}", zone=f"zone-{n % zones:02d}")
+            payloads.append(cipher.encrypt(json.dumps(message).encode()))
+    for _ in range(int(len(payloads) * invalid_fraction)):
+        payloads.append(os.urandom(rng.randint(60, 200)))
+    rng.shuffle(payloads)
+    return payloads
+
+
+def sender(payloads, port, rate, duration, results):
+    """Send payloads round-robin at `rate` datagrams/s in 1 ms batches"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = ("127.0.0.1", port)
+    batch = max(1, int(rate / 1000))
+    interval = batch / rate
+    sent = 0
+    start = time.perf_counter()
+    next_batch = start
+    n = len(payloads)
+    while time.perf_counter() - start < duration:
+        for _ in range(batch):
+            try:
+                sock.sendto(payloads[sent % n], target)
+                sent += 1
+            except (BlockingIOError, OSError):
+                pass
+        next_batch += interval
+        delay = next_batch - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    results.put((sent, time.perf_counter() - start))
+
+
+async def run_aggregator(aggregator, port_ready, done):
+    loop = asyncio.get_running_loop()
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 8 * 1024 * 1024)
+    sock.bind(("127.0.0.1", 0))
+    receiver = FleetReceiver(aggregator, sock).start(loop)
+    port_ready(sock.getsockname()[1])
+    try:
+        while not done():
+            await asyncio.sleep(0.05)
+    finally:
+        receiver.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fleet aggregator load generator")
+    parser.add_argument("--nodes", type=int, default=60, help="Simulated camera nodes (default: 60)")
+    parser.add_argument("--zones", type=int, default=12, help="Zones the nodes are spread over (default: 12)")
+    parser.add_argument("--rate", type=float, default=20000, help="Total datagrams per second (default: 20000)")
+    parser.add_argument("--senders", type=int, default=2, help="Sender processes (default: 2)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to send (default: 10)")
+    parser.add_argument("--alert-fraction", type=float, default=0.5, help="Share of alerts vs heartbeats (default: 0.5)")
+    parser.add_argument("--invalid-fraction", type=float, default=0.01, help="Share of undecryptable datagrams (default: 0.01)")
+    args = parser.parse_args()
+
+    key = Fernet.generate_key()
+    payloads = build_payloads(key, args.nodes, args.zones, args.alert_fraction, args.invalid_fraction)
+    aggregator = FleetAggregator(key.decode(), window=5.0)
+
+    results = multiprocessing.Queue()
+    senders = []
+    state = {"port": None, "finished_at": None}
+
+    def port_ready(port):
+        state["port"] = port
+        for _ in range(args.senders):
+            p = multiprocessing.Process(target=sender, args=(payloads, port, args.rate / args.senders,
+                                                             args.duration, results))
+            p.daemon = True
+            p.start()
+            senders.append(p)
+        state["cpu_start"] = time.process_time()
+        state["wall_start"] = time.perf_counter()
+
+    def done():
+        if state["finished_at"] is None and senders and not any(p.is_alive() for p in senders):
+            state["finished_at"] = time.perf_counter()
+        # Give the socket a moment to drain after the senders stop
+        return state["finished_at"] is not None and time.perf_counter() - state["finished_at"] > 0.5
+
+    print(f"🚀 {args.nodes} nodes in {args.zones} zones → {args.rate:.0f} datagrams/s for {args.duration:.0f}s")
+    asyncio.run(run_aggregator(aggregator, port_ready, done))
+    cpu = time.process_time() - state["cpu_start"]
+    wall = state["finished_at"] - state["wall_start"]
+
+    sent = 0
+    while not results.empty():
+        count, _ = results.get()
+        sent += count
+
+    received = aggregator.received
+    print("=" * 60)
+    print(f"📤 Sent:      {sent} ({sent / wall:.0f}/s)")
+    print(f"📥 Processed: {received} ({received / wall:.0f}/s), loss {100.0 * (sent - received) / max(1, sent):.2f}%")
+    print(f"⏱️  CPU:       {cpu / max(1, received) * 1e6:.1f} µs/datagram ({100.0 * cpu / wall:.0f}% of one core)")
+    print(f"🔒 Invalid:   {aggregator.invalid}")
+    print(f"🚨 Incidents: {aggregator.m_incidents.get()} opened, {aggregator.merged} alerts merged")
+    print(f"🖥️  Nodes:     {len(aggregator.nodes)} seen, {aggregator.online_nodes()} online")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Load test for the Safety API server
+Opens many concurrent SSE dashboards and polling clients, drives state
+updates and reports delta latency and GET throughput
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+from api.state import SafetyState
+from api.server import SafetyApiServer
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+async def sse_client(host, port, latencies, connected, stop):
+    """Read delta events and record time from update to delivery"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /api/safety/stream HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    connected.append(1)
+    try:
+        while not stop.is_set():
+            line = await reader.readline()
+            if not line:
+                break
+            if line.startswith(b"data: "):
+                data = json.loads(line[6:])
+                stamp = data.get("changes", {}).get("loadTestStamp")
+                if stamp is not None:
+                    latencies.append(time.time() - stamp)
+    finally:
+        writer.close()
+
+
+async def poll_client(host, port, counts, stop):
+    """Issue keep-alive GET /api/safety/status requests back to back"""
+    reader, writer = await asyncio.open_connection(host, port)
+    request = f"GET /api/safety/status HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("latin-1")
+    try:
+        while not stop.is_set():
+            writer.write(request)
+            await writer.drain()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            counts.append(1)
+    finally:
+        writer.close()
+
+
+def drive_updates(state, rate, duration, done):
+    """Change the state at `rate` updates per second from a detector-like thread"""
+    interval = 1.0 / rate
+    end = time.time() + duration
+    count = 0
+    while time.time() < end:
+        count += 1
+        state.update(peopleCount=count % 20, loadTestStamp=time.time())
+        time.sleep(interval)
+    done.set()
+
+
+async def run(args):
+    state = SafetyState()
+    host, port = args.host, args.port
+    if port == 0:
+        server = SafetyApiServer(state=state, host="127.0.0.1", port=0, coalesce_ms=args.coalesce_ms)
+        server.start_in_thread()
+        host, port = "127.0.0.1", server.port
+
+    stop = asyncio.Event()
+    latencies, polls, connected = [], [], []
+    tasks = [asyncio.create_task(sse_client(host, port, latencies, connected, stop))
+             for _ in range(args.sse_clients)]
+    tasks += [asyncio.create_task(poll_client(host, port, polls, stop))
+              for _ in range(args.poll_clients)]
+
+    while len(connected) < args.sse_clients:
+        await asyncio.sleep(0.05)
+    await asyncio.sleep(0.2)
+
+    done = threading.Event()
+    start = time.time()
+    driver = threading.Thread(target=drive_updates, args=(state, args.rate, args.duration, done))
+    driver.daemon = True
+    driver.start()
+    while not done.is_set():
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(0.5)
+    elapsed = time.time() - start
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    print("=" * 60)
+    print(f"📊 SSE clients: {args.sse_clients}, polling clients: {args.poll_clients}")
+    print(f"   Updates driven: {args.rate}/s for {args.duration}s")
+    print(f"   Deltas received: {len(latencies)}")
+    print(f"   Delta latency p50: {percentile(latencies, 50) * 1000:.1f} ms, "
+          f"p99: {percentile(latencies, 99) * 1000:.1f} ms, "
+          f"max: {max(latencies, default=0) * 1000:.1f} ms")
+    print(f"   GET /api/safety/status: {len(polls) / elapsed:.0f} req/s")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Safety API load test")
+    parser.add_argument("--host", default="127.0.0.1", help="Server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=0, help="Server port; 0 starts an in-process server")
+    parser.add_argument("--sse-clients", type=int, default=200, help="Concurrent SSE dashboards (default: 200)")
+    parser.add_argument("--poll-clients", type=int, default=20, help="Concurrent polling clients (default: 20)")
+    parser.add_argument("--rate", type=float, default=10.0, help="State updates per second (default: 10)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Test duration in seconds (default: 10)")
+    parser.add_argument("--coalesce-ms", type=int, default=50, help="Server delta coalescing window (default: 50)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
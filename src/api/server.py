@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Safety status API server for the Women Safety Application
+Serves /api/safety/* from the in-memory SafetyState and pushes
+changed fields to dashboards over Server-Sent Events
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import asyncio
+import threading
+
+from api.state import (get_safety_state, VISION_FIELDS, AUDIO_FIELDS, THREAT_FIELDS, FLEET_FIELDS,
+                       RELAYED_FIELDS)
+
+# Route -> (view name, field subset); None means all fields
+SAFETY_VIEWS = {
+    "/api/safety/status": ("status", None),
+    "/api/safety/vision": ("vision", VISION_FIELDS),
+    "/api/safety/audio": ("audio", AUDIO_FIELDS),
+    "/api/safety/threat-level": ("threat", THREAT_FIELDS),
+    "/api/safety/fleet": ("fleet", FLEET_FIELDS),
+}
+STREAM_PATH = "/api/safety/stream"
+
+STATUS_TEXT = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+CORS_HEADERS = (
+    "Access-Control-Allow-Origin: *\r\n"
+    "Access-Control-Allow-Methods: GET, OPTIONS\r\n"
+    "Access-Control-Allow-Headers: Content-Type\r\n"
+)
+
+
+class StateRelayProtocol(asyncio.DatagramProtocol):
+    """Applies state fields forwarded by other local processes (api.state.forward_state)
+
+    Every sender is remembered for peer_timeout seconds so confirm requests
+    from the decision engine can be passed back to the audio detectors.
+    """
+
+    def __init__(self, state, keys=RELAYED_FIELDS, peer_timeout=30.0):
+        self.state = state
+        self.keys = set(keys)
+        self.peer_timeout = peer_timeout
+        self.transport = None
+        self.peers = {}
+        self.last_confirm = {}
+        self.updates = 0
+        self.confirms_sent = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.peers[addr] = time.monotonic()
+        try:
+            changes = json.loads(data)
+        except ValueError:
+            return
+        if isinstance(changes, dict):
+            self.state.update(**{k: v for k, v in changes.items() if k in self.keys})
+            self.updates += 1
+
+    def confirm(self, names, seconds):
+        """Ask every live peer to keep `names` running for `seconds`
+
+        Repeats within half the hold are skipped, so calling this on every
+        frame costs one datagram per peer every seconds / 2.
+        """
+        now = time.monotonic()
+        names = tuple(names)
+        if self.transport is None or now - self.last_confirm.get(names, float("-inf")) < seconds / 2:
+            return
+        self.last_confirm[names] = now
+        body = json.dumps({"confirm": list(names), "seconds": seconds}).encode("utf-8")
+        for addr, seen in list(self.peers.items()):
+            if now - seen > self.peer_timeout:
+                del self.peers[addr]
+                continue
+            self.transport.sendto(body, addr)
+            self.confirms_sent += 1
+
+
+class SafetyApiServer:
+    """asyncio HTTP server with cached JSON reads and an SSE delta stream"""
+
+    def __init__(self, state=None, host="127.0.0.1", port=8000, coalesce_ms=50,
+                 heartbeat_interval=15.0, max_client_buffer=256 * 1024, relay_port=0):
+        self.state = state or get_safety_state()
+        self.host = host
+        self.port = port
+        self.relay_port = relay_port
+        self.relay = None
+        self.coalesce = coalesce_ms / 1000.0
+        self.heartbeat_interval = heartbeat_interval
+        self.max_client_buffer = max_client_buffer
+
+        self.loop = None
+        self.server = None
+        self.heartbeat_task = None
+        self.stream_clients = set()
+        self.pending_delta = {}
+        self.pending_version = 0
+        self.flush_scheduled = False
+        self.extra_routes = {}
+
+        self.requests_served = 0
+        self.events_sent = 0
+        self.slow_clients_dropped = 0
+
+    def add_route(self, path, handler):
+        """Register handler() -> (content_type, body bytes) for an extra GET path"""
+        self.extra_routes[path] = handler
+
+    # State changes arrive on detector threads; hop onto the event loop
+    def _on_state_change(self, version, delta):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._queue_delta, version, delta)
+
+    def _queue_delta(self, version, delta):
+        self.pending_delta.update(delta)
+        self.pending_version = version
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            self.loop.call_later(self.coalesce, self._flush_delta)
+
+    def _flush_delta(self):
+        """Encode the coalesced delta once and write it to every stream client"""
+        self.flush_scheduled = False
+        if not self.pending_delta:
+            return
+        payload = json.dumps({"version": self.pending_version, "changes": self.pending_delta},
+                             separators=(",", ":"))
+        frame = f"id: {self.pending_version}\nevent: delta\ndata: {payload}\n\n".encode("utf-8")
+        self.pending_delta = {}
+        self._broadcast(frame)
+
+    def _broadcast(self, frame):
+        for writer in list(self.stream_clients):
+            if writer.transport.get_write_buffer_size() > self.max_client_buffer:
+                # A stalled dashboard must not grow memory; it reconnects and resyncs
+                self.slow_clients_dropped += 1
+                self.stream_clients.discard(writer)
+                writer.close()
+                continue
+            writer.write(frame)
+            self.events_sent += 1
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            self._broadcast(b": keep-alive\n\n")
+
+    def _response(self, writer, status, body=b"", content_type="application/json", keep_alive=True):
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Cache-Control: no-cache\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            + CORS_HEADERS + "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+
+    async def _stream(self, reader, writer):
+        version, body = self.state.view_json("status")
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: keep-alive\r\n"
+            + CORS_HEADERS.encode("latin-1") + b"\r\n"
+            + f"retry: 1000\nid: {version}\nevent: snapshot\ndata: ".encode("utf-8")
+            + body + b"\n\n"
+        )
+        self.stream_clients.add(writer)
+        try:
+            await writer.drain()
+            # SSE is one-way; wait until the client goes away
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.stream_clients.discard(writer)
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) < 3:
+                    self._response(writer, 400, b'{"error":"bad request"}', keep_alive=False)
+                    break
+                method, target, http_version = parts[0], parts[1], parts[2]
+                path = target.split("?", 1)[0]
+                keep_alive = headers.get("connection", "").lower() != "close" and http_version == "HTTP/1.1"
+                self.requests_served += 1
+
+                if method == "OPTIONS":
+                    self._response(writer, 204, keep_alive=keep_alive)
+                elif method != "GET":
+                    self._response(writer, 405, b'{"error":"method not allowed"}', keep_alive=keep_alive)
+                elif path == STREAM_PATH:
+                    await self._stream(reader, writer)
+                    break
+                elif path in SAFETY_VIEWS:
+                    name, keys = SAFETY_VIEWS[path]
+                    _, body = self.state.view_json(name, keys)
+                    self._response(writer, 200, body, keep_alive=keep_alive)
+                elif path in self.extra_routes:
+                    content_type, body = self.extra_routes[path]()
+                    self._response(writer, 200, body, content_type, keep_alive=keep_alive)
+                else:
+                    self._response(writer, 404, b'{"error":"not found"}', keep_alive=keep_alive)
+
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.state.add_listener(self._on_state_change)
+        self.server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self.server.sockets[0].getsockname()[1]
+        # The loop only holds a weak reference to tasks; keep one so it is not collected
+        self.heartbeat_task = self.loop.create_task(self._heartbeat())
+        print(f"🌐 Safety API listening on http://{self.host}:{self.port}")
+        if self.relay_port:
+            # Loopback only: the audio detectors run on the same box
+            try:
+                _, self.relay = await self.loop.create_datagram_endpoint(
+                    lambda: StateRelayProtocol(self.state), local_addr=("127.0.0.1", self.relay_port))
+                print(f"📡 Accepting audio state on udp://127.0.0.1:{self.relay_port}")
+            except OSError as e:
+                print(f"⚠️ State relay disabled: {str(e)}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self.server:
+            await self.server.serve_forever()
+
+    def start_in_thread(self, timeout=5.0):
+        """Run the server on a daemon thread; returns once it is listening
+
+        A failed bind (port in use, ...) is re-raised here as the original
+        OSError; a start that takes longer than timeout raises TimeoutError.
+        """
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            async def main():
+                try:
+                    await self.start()
+                except Exception as e:
+                    failure.append(e)
+                    return
+                finally:
+                    ready.set()
+                await self.server.serve_forever()
+            asyncio.run(main())
+
+        thread = threading.Thread(target=run, name="safety-api")
+        thread.daemon = True
+        thread.start()
+        if not ready.wait(timeout):
+            raise TimeoutError(f"Safety API did not start within {timeout:g}s")
+        if failure:
+            raise failure[0]
+        return thread
+
+    def confirm_remote(self, names, seconds):
+        """Forward a confirm request to the audio detectors on the relay; callable from any thread"""
+        if self.loop is not None and self.relay is not None:
+            self.loop.call_soon_threadsafe(self.relay.confirm, names, seconds)
+
+    def stop(self):
+        self.state.remove_listener(self._on_state_change)
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+            if self.heartbeat_task is not None:
+                self.loop.call_soon_threadsafe(self.heartbeat_task.cancel)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Women Safety status API server")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port (default: 8000)")
+    parser.add_argument("--relay-port", type=int, default=8001,
+                        help="UDP port for state forwarded by the audio detectors (0 disables)")
+    parser.add_argument("--demo", action="store_true", help="Feed the state with changing demo values")
+    args = parser.parse_args()
+
+    server = SafetyApiServer(host=args.host, port=args.port, relay_port=args.relay_port)
+    if not args.demo:
+        asyncio.run(server.serve_forever())
+        return
+
+    server.start_in_thread()
+    state = server.state
+    count = 0
+    try:
+        while True:
+            count += 1
+            state.update(peopleCount=3 + count % 5,
+                         motionStatus="Rapid" if count % 7 == 0 else "Normal")
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        print("\n👋 Stopping Safety API server...")
+
+
+if __name__ == "__main__":
+    main()
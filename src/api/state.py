@@ -0,0 +1,170 @@
+"""
+Shared safety state for the Women Safety API
+Vision, audio and decision components write here; the API server reads it
+"""
+
+import json
+import time
+import socket
+import threading
+
+VISION_FIELDS = ("peopleCount", "motionStatus", "poseRisk")
+AUDIO_FIELDS = ("currentEmotion", "emotionConfidence", "audioLevel", "distressSound")
+THREAT_FIELDS = ("threatLevel", "lastAlert")
+FLEET_FIELDS = ("fleetNodesOnline", "fleetIncidents")
+# Fields owned by the speech emotion processes (audioLevel comes from the vision loop)
+RELAYED_FIELDS = ("currentEmotion", "emotionConfidence", "distressSound")
+
+DEFAULT_STATE = {
+    "peopleCount": 0,
+    "currentEmotion": "Neutral",
+    "emotionConfidence": 0.0,
+    "audioLevel": "OK",
+    "distressSound": "None",
+    "motionStatus": "Normal",
+    "poseRisk": "Safe",
+    "threatLevel": "LOW",
+    "lastAlert": "No Alerts",
+    "fleetNodesOnline": 0,
+    "fleetIncidents": 0,
+}
+
+
+class SafetyState:
+    """Versioned in-memory snapshot of the safety status
+
+    update() only records fields whose value actually changed, so listeners
+    receive minimal deltas. Serialized views are cached per version, so reads
+    never touch the detectors and cost one dict lookup.
+    """
+
+    def __init__(self, initial=None):
+        self.lock = threading.Lock()
+        self.fields = dict(DEFAULT_STATE)
+        if initial:
+            self.fields.update(initial)
+        self.version = 0
+        self.updated_at = time.time()
+        self.listeners = []
+        self._views = {}
+
+    def update(self, **changes):
+        """Apply field changes; returns the delta dict (empty if nothing changed)"""
+        with self.lock:
+            delta = {k: v for k, v in changes.items() if self.fields.get(k) != v}
+            if not delta:
+                return {}
+            self.fields.update(delta)
+            self.version += 1
+            self.updated_at = time.time()
+            self._views = {}
+            version = self.version
+            listeners = list(self.listeners)
+
+        for listener in listeners:
+            try:
+                listener(version, delta)
+            except Exception as e:
+                print(f"❌ Error in safety state listener: {str(e)}")
+        return delta
+
+    def snapshot(self, keys=None):
+        """Return (version, dict) for all fields or the given subset"""
+        with self.lock:
+            if keys is None:
+                return self.version, dict(self.fields)
+            return self.version, {k: self.fields.get(k) for k in keys}
+
+    def view_json(self, name, keys=None):
+        """Return (version, JSON bytes) for a named view, cached until the next change"""
+        with self.lock:
+            cached = self._views.get(name)
+            if cached is not None:
+                return cached
+            if keys is None:
+                data = dict(self.fields)
+            else:
+                data = {k: self.fields.get(k) for k in keys}
+            data["version"] = self.version
+            body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+            self._views[name] = (self.version, body)
+            return self.version, body
+
+    def add_listener(self, listener):
+        """Register listener(version, delta), called from the updating thread"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+
+def forward_state(state, port, keys=RELAYED_FIELDS, host="127.0.0.1", on_confirm=None, resend_interval=5.0):
+    """Mirror `keys` of this process's state to the API server process over UDP
+
+    The audio detectors run as separate processes without a server; each
+    change sends the full subset (not just the delta), so a server that
+    started late catches up on the next change. With on_confirm, a thread
+    also listens on the same socket for the server's confirm requests,
+    calls on_confirm(names, seconds) for each, and re-sends the subset every
+    resend_interval so the server always knows where to reach this process.
+    Returns the listener.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    def send_fields():
+        _, fields = state.snapshot(keys)
+        try:
+            sock.sendto(json.dumps(fields, separators=(",", ":")).encode("utf-8"), (host, port))
+        except OSError:
+            # No server running yet; the next change tries again
+            pass
+
+    def send(version, delta):
+        if any(k in delta for k in keys):
+            send_fields()
+
+    def receive():
+        last_sent = float("-inf")
+        while True:
+            if time.monotonic() - last_sent >= resend_interval:
+                send_fields()
+                last_sent = time.monotonic()
+            try:
+                data, _ = sock.recvfrom(4096)
+                request = json.loads(data)
+            except socket.timeout:
+                continue
+            except (OSError, ValueError):
+                # ICMP port-unreachable while no server listens surfaces here
+                time.sleep(resend_interval)
+                continue
+            if isinstance(request, dict) and isinstance(request.get("confirm"), list):
+                names = tuple(name for name in request["confirm"] if isinstance(name, str))
+                try:
+                    on_confirm(names, float(request.get("seconds", 0.0)) or None)
+                except Exception as e:
+                    print(f"❌ Error in confirm handler: {str(e)}")
+
+    state.add_listener(send)
+    if on_confirm is not None:
+        # Bind now so the first datagram already carries this socket's reply address
+        sock.bind(("127.0.0.1", 0))
+        sock.settimeout(resend_interval)
+        threading.Thread(target=receive, name="state-relay", daemon=True).start()
+    return send
+
+
+_state = None
+_state_lock = threading.Lock()
+
+
+def get_safety_state():
+    """Return the process-wide SafetyState"""
+    global _state
+    with _state_lock:
+        if _state is None:
+            _state = SafetyState()
+        return _state
@@ -0,0 +1,158 @@
+"""
+Lightweight audio heads on the speech emotion model's pooled embedding
+The emotion model's forward pass already produces a pooled Whisper encoder
+embedding; small linear heads (screams, "help" keywords, ...) classify that
+same vector, so extra detectors cost a matrix-vector product, not a model
+"""
+
+import os
+import glob
+
+import numpy as np
+
+from utils.metrics import get_metrics
+
+BACKGROUND_LABELS = ("none", "background", "other", "negative")
+
+
+class EmbeddingTap:
+    """Captures the pooled embedding the classifier layer receives during forward()
+
+    Works for AutoModelForAudioClassification models whose final layer is
+    `model.classifier` (Whisper, wav2vec2, HuBERT): its input is the pooled,
+    projected encoder output.
+    """
+
+    def __init__(self, model):
+        self.embedding = None
+        classifier = getattr(model, "classifier", None)
+        if classifier is None:
+            raise ValueError(f"{type(model).__name__} has no classifier layer to tap")
+        self.handle = classifier.register_forward_pre_hook(self._capture)
+        self.dim = getattr(classifier, "in_features", None)
+
+    def _capture(self, module, inputs):
+        self.embedding = inputs[0]
+
+    def pop(self):
+        """Return the last captured embedding (first batch item) as a float32 numpy vector"""
+        embedding, self.embedding = self.embedding, None
+        if embedding is None:
+            return None
+        return embedding[0].detach().float().cpu().numpy()
+
+    def remove(self):
+        self.handle.remove()
+
+
+class AudioHead:
+    """Linear classifier over the pooled embedding, loaded from an .npz file
+
+    Required arrays: weight (n_labels, dim), bias (n_labels,), labels (n_labels,).
+    Optional: mean/std (dim,) for input standardisation, activation ("softmax"
+    or "sigmoid"), threshold (scalar).
+    """
+
+    def __init__(self, name, weight, bias, labels, activation="softmax", threshold=0.5, mean=None, std=None):
+        self.name = name
+        self.weight = np.asarray(weight, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.labels = [str(label) for label in labels]
+        self.activation = activation
+        self.threshold = float(threshold)
+        self.mean = None if mean is None else np.asarray(mean, dtype=np.float32)
+        self.std = None if std is None else np.asarray(std, dtype=np.float32)
+        if self.weight.shape[0] != len(self.labels) or self.bias.shape != (len(self.labels),):
+            raise ValueError(f"{name}: weight/bias/labels shapes do not match")
+
+    @property
+    def dim(self):
+        return self.weight.shape[1]
+
+    @classmethod
+    def from_file(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {key: data[key] for key in data.files}
+        name = os.path.splitext(os.path.basename(path))[0]
+        return cls(
+            name,
+            arrays["weight"],
+            arrays["bias"],
+            arrays["labels"],
+            activation=str(arrays.get("activation", "softmax")),
+            threshold=float(arrays.get("threshold", 0.5)),
+            mean=arrays.get("mean"),
+            std=arrays.get("std"),
+        )
+
+    def save(self, path):
+        extra = {}
+        if self.mean is not None:
+            extra["mean"] = self.mean
+        if self.std is not None:
+            extra["std"] = self.std
+        np.savez(path, weight=self.weight, bias=self.bias, labels=np.array(self.labels),
+                 activation=np.array(self.activation), threshold=np.array(self.threshold), **extra)
+
+    def predict(self, embedding):
+        """Return {"label", "score", "scores", "triggered"} for one embedding"""
+        x = embedding
+        if self.mean is not None:
+            x = x - self.mean
+        if self.std is not None:
+            x = x / np.maximum(self.std, 1e-6)
+        logits = self.weight @ x + self.bias
+        if self.activation == "sigmoid":
+            scores = 1.0 / (1.0 + np.exp(-logits))
+        else:
+            exp = np.exp(logits - logits.max())
+            scores = exp / exp.sum()
+        best = int(scores.argmax())
+        label, score = self.labels[best], float(scores[best])
+        return {
+            "label": label,
+            "score": score,
+            "scores": {l: float(s) for l, s in zip(self.labels, scores)},
+            "triggered": score >= self.threshold and label.lower() not in BACKGROUND_LABELS,
+        }
+
+
+class HeadSet:
+    """All heads found in a directory, run together on each embedding"""
+
+    def __init__(self, heads=()):
+        self.heads = list(heads)
+        self.t_heads = get_metrics().stage("audio_heads")
+
+    @classmethod
+    def load(cls, directory, dim=None):
+        """Load every *.npz head in directory, skipping files that fail or do not match dim"""
+        heads = []
+        for path in sorted(glob.glob(os.path.join(directory, "*.npz"))) if directory else []:
+            try:
+                head = AudioHead.from_file(path)
+            except (OSError, KeyError, ValueError) as e:
+                print(f"⚠️ Skipping audio head {path}: {str(e)}")
+                continue
+            if dim is not None and head.dim != dim:
+                print(f"⚠️ Skipping audio head {head.name}: expects {head.dim}-d embeddings, model gives {dim}")
+                continue
+            heads.append(head)
+        if heads:
+            print(f"🧩 Audio heads: {', '.join(h.name for h in heads)}")
+        return cls(heads)
+
+    def __bool__(self):
+        return bool(self.heads)
+
+    def run(self, embedding):
+        """Return {head name: prediction}; empty when there are no heads or no embedding"""
+        if not self.heads or embedding is None:
+            return {}
+        with self.t_heads.time():
+            return {head.name: head.predict(embedding) for head in self.heads}
+
+
+def triggered_labels(head_results):
+    """Labels of heads that fired, e.g. ["scream"]"""
+    return [result["label"] for result in head_results.values() if result["triggered"]]
@@ -0,0 +1,75 @@
+"""
+Setup shared by the continuous speech emotion detectors
+(realtime_speech_emotion.py and simple_automatic_speech_emotion.py)
+Only the standard library is imported here, so the scripts can budget
+threads through this module before torch and numpy are loaded
+"""
+
+from utils.config import get_config_manager
+from utils.resources import apply_thread_budget
+from api.state import get_safety_state, forward_state
+from core.scheduler import get_scheduler
+
+
+def budget_audio_threads():
+    """Share the CPU with the vision loop (resources.preset)
+
+    Call before torch and numpy are imported, while OpenMP/BLAS still read
+    their thread env vars.
+    """
+    apply_thread_budget("audio", get_config_manager().current.resources)
+
+
+class LiveEmotionMixin:
+    """Live config, audio heads and state relay for a continuous detector
+
+    chunk_duration, overlap and threshold follow config.json (audio.*) unless
+    an explicit value was given, so reloads apply without a restart.
+    """
+
+    def _init_live_config(self, chunk_duration=None, overlap=None, threshold=None):
+        self.config = get_config_manager()
+        self._chunk_duration = chunk_duration
+        self._overlap = overlap
+        self._threshold = threshold
+        self.sample_rate = self.config.current.audio.sample_rate
+
+    @property
+    def chunk_duration(self):
+        """Chunk length in seconds (explicit value, else live config)"""
+        if self._chunk_duration is not None:
+            return self._chunk_duration
+        return self.config.current.audio.chunk_duration
+
+    @property
+    def overlap(self):
+        """Chunk overlap in seconds (explicit value, else live config)"""
+        if self._overlap is not None:
+            return self._overlap
+        return self.config.current.audio.overlap
+
+    @property
+    def threshold(self):
+        """Minimum confidence (explicit value, else live config)"""
+        if self._threshold is not None:
+            return self._threshold
+        return self.config.current.audio.threshold
+
+    def _init_heads(self, model):
+        """Distress heads reuse the emotion model's pooled embedding"""
+        # Imported here: audio_heads needs numpy, which must load after the thread budget
+        from audio.audio_heads import EmbeddingTap, HeadSet
+
+        self.embedding_tap = EmbeddingTap(model)
+        self.heads = HeadSet.load(self.config.current.audio.heads_dir, self.embedding_tap.dim)
+
+    def _init_state(self):
+        """This process runs no API server; mirror the audio fields to the one crowd_detector runs
+
+        The same channel carries the decision engine's confirm requests back,
+        keeping Whisper escalated here while a threat is unconfirmed.
+        """
+        self.safety_state = get_safety_state()
+        if self.config.current.api.relay_port:
+            forward_state(self.safety_state, self.config.current.api.relay_port,
+                          on_confirm=lambda names, seconds: get_scheduler().confirm(names, seconds))
@@ -7,6 +7,11 @@ Continuously listens and analyzes emotions without user interaction
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from audio.live_emotion import budget_audio_threads, LiveEmotionMixin
+
+budget_audio_threads()
 
 import torch
 import numpy as np
@@ -18,29 +23,45 @@ import threading
 import queue
 import time
 
-class AutomaticRealtimeSpeechEmotion:
+from utils.metrics import get_metrics, start_exporters
+from utils.profiler import maybe_start_profiler
+from utils import event_log
+from core.scheduler import get_scheduler
+from audio.audio_heads import triggered_labels
+
+class AutomaticRealtimeSpeechEmotion(LiveEmotionMixin):
     def __init__(self, model_id="firdhokk/speech-emotion-recognition-with-openai-whisper-large-v3", 
-                 chunk_duration=3, overlap=1, threshold=0.3):
+                 chunk_duration=None, overlap=None, threshold=None):
         """Initialize the automatic real-time speech emotion detector."""
         print("🎤 Initializing Automatic Real-time Speech Emotion Recognition...")
         
         self.model_id = model_id
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.chunk_duration = chunk_duration
-        self.overlap = overlap
-        self.threshold = threshold
-        self.sample_rate = 16000
+        self._init_live_config(chunk_duration, overlap, threshold)
         
         print(f"🔧 Using device: {self.device}")
-        print(f"⏱️  Chunk duration: {chunk_duration}s, Overlap: {overlap}s")
+        print(f"⏱️  Chunk duration: {self.chunk_duration}s, Overlap: {self.overlap}s")
+        
+        self.metrics = get_metrics()
+        self.t_features = self.metrics.stage("feature_extraction")
+        self.t_inference = self.metrics.stage("emotion_inference")
+        self.chunks_total = self.metrics.counter("audio_chunks_total", "Audio chunks classified")
+        self.chunks_dropped = self.metrics.counter("audio_chunks_dropped_total",
+                                                   "Audio blocks lost to input overflow")
+        self.queue_depth = self.metrics.gauge("queue_depth", "Pending jobs per queue", {"queue": "audio"})
         
         # Load model and feature extractor
+        load_start = time.perf_counter()
         self.model = AutoModelForAudioClassification.from_pretrained(model_id)
         self.feature_extractor = AutoFeatureExtractor.from_pretrained(model_id, do_normalize=True)
         self.id2label = self.model.config.id2label
         
         # Move model to device
         self.model = self.model.to(self.device)
+        self.metrics.gauge("model_load_seconds", "Model load time", {"model": "speech_emotion"}).set(
+            time.perf_counter() - load_start)
+        
+        self._init_heads(self.model)
         
         # Audio processing queue
         self.audio_queue = queue.Queue()
@@ -48,6 +69,9 @@ class AutomaticRealtimeSpeechEmotion:
         self.is_running = False
         self.current_emotion = "Neutral"
         self.current_confidence = 0.0
+        self._init_state()
+        self.scheduler = get_scheduler()
+        self.recorder = None
         
         print(f"✅ Model loaded successfully!")
         print(f"🎯 Available emotions: {list(self.id2label.values())}")
@@ -61,10 +85,12 @@ class AutomaticRealtimeSpeechEmotion:
         """Callback function for continuous audio streaming."""
         if status:
             print(f"Audio status: {status}")
+            if status.input_overflow:
+                self.chunks_dropped.inc()
         self.audio_queue.put(indata.copy())
     
     def process_audio_chunk(self, audio_chunk):
-        """Process a chunk of audio and predict emotion."""
+        """Process a chunk of audio and predict emotion (plus any audio head results)."""
         try:
             # Convert to numpy array
             audio_array = audio_chunk.flatten()
@@ -77,43 +103,49 @@ class AutomaticRealtimeSpeechEmotion:
                 audio_array = np.pad(audio_array, (0, max_length - len(audio_array)))
             
             # Extract features
-            inputs = self.feature_extractor(
-                audio_array,
-                sampling_rate=self.sample_rate,
-                max_length=max_length,
-                truncation=True,
-                return_tensors="pt",
-            )
+            with self.t_features.time():
+                inputs = self.feature_extractor(
+                    audio_array,
+                    sampling_rate=self.sample_rate,
+                    max_length=max_length,
+                    truncation=True,
+                    return_tensors="pt",
+                )
             
             # Move to device
             inputs = {key: value.to(self.device) for key, value in inputs.items()}
             
             # Predict
-            with torch.no_grad():
+            with self.t_inference.time(), torch.no_grad():
                 outputs = self.model(**inputs)
+            self.chunks_total.inc()
             
             logits = outputs.logits
             probabilities = torch.softmax(logits, dim=-1)
             predicted_id = torch.argmax(logits, dim=-1).item()
             predicted_label = self.id2label[predicted_id]
             confidence = probabilities[0][predicted_id].item()
+            heads = self.heads.run(self.embedding_tap.pop())
             
-            return predicted_label, confidence
+            return predicted_label, confidence, heads
             
         except Exception as e:
             print(f"❌ Error processing audio: {str(e)}")
-            return None, 0.0
+            return None, 0.0, {}
     
     def audio_processing_thread(self):
         """Thread for processing audio chunks."""
         audio_buffer = np.array([], dtype=np.float32)
-        chunk_samples = int(self.chunk_duration * self.sample_rate)
-        overlap_samples = int(self.overlap * self.sample_rate)
         
         while self.is_running:
             try:
+                # Re-read each pass so config reloads apply without a restart
+                chunk_samples = int(self.chunk_duration * self.sample_rate)
+                overlap_samples = int(self.overlap * self.sample_rate)
+                
                 # Get audio from queue
                 if not self.audio_queue.empty():
+                    self.queue_depth.set(self.audio_queue.qsize())
                     new_audio = self.audio_queue.get()
                     audio_buffer = np.concatenate([audio_buffer, new_audio.flatten()])
                     
@@ -122,14 +154,26 @@ class AutomaticRealtimeSpeechEmotion:
                         # Extract chunk
                         chunk = audio_buffer[:chunk_samples]
                         
-                        # Process the chunk
-                        emotion, confidence = self.process_audio_chunk(chunk)
+                        # Whisper only runs on audible chunks (or when its result is stale)
+                        level = float(np.sqrt(np.mean(np.square(chunk))))
+                        if self.scheduler.should_run("emotion", level > self.config.current.scheduler.audio_gate):
+                            emotion, confidence, heads = self.process_audio_chunk(chunk)
+                            if emotion and self.recorder is not None:
+                                self.recorder.record(event_log.EMOTION, (emotion, confidence))
+                            distress = triggered_labels(heads)
+                            self.safety_state.update(distressSound=", ".join(distress) or "None")
+                        else:
+                            emotion, confidence, distress = None, 0.0, []
                         
                         # Update current emotion if confidence is high enough
                         if emotion and confidence >= self.threshold:
                             self.current_emotion = emotion
                             self.current_confidence = confidence
-                            self.results_queue.put((emotion, confidence))
+                            self.safety_state.update(currentEmotion=emotion,
+                                                     emotionConfidence=round(confidence, 3))
+                            self.results_queue.put((emotion, confidence, distress))
+                        elif distress:
+                            self.results_queue.put((self.current_emotion, self.current_confidence, distress))
                         
                         # Keep overlap for next chunk
                         if overlap_samples > 0 and len(audio_buffer) > chunk_samples:
@@ -162,7 +206,7 @@ class AutomaticRealtimeSpeechEmotion:
                 
                 # Check for new results
                 if not self.results_queue.empty():
-                    emotion, confidence = self.results_queue.get()
+                    emotion, confidence, distress = self.results_queue.get()
                     timestamp = datetime.now().strftime("%H:%M:%S")
                     
                     # Color coding for different confidence levels
@@ -174,6 +218,8 @@ class AutomaticRealtimeSpeechEmotion:
                         confidence_indicator = "🟠"
                     
                     print(f"� {timestamp} | {confidence_indicator} NEW: {emotion:<12} | Confidence: {confidence:.3f} ({confidence*100:.1f}%)")
+                    if distress:
+                        print(f"🚨 {timestamp} | Distress sound: {', '.join(distress)}")
                 
                 time.sleep(0.1)
                 
@@ -181,18 +227,21 @@ class AutomaticRealtimeSpeechEmotion:
                 print(f"❌ Error in display thread: {str(e)}")
                 time.sleep(0.5)
     
-    def run(self):
+    def run(self, profile=None, record=None):
         """Run the automatic real-time emotion detection."""
         self.is_running = True
+        start_exporters("audio", self.config.current.metrics)
+        profiler = maybe_start_profiler(profile)
+        self.recorder = event_log.maybe_start_recorder("audio", record)
         
         try:
             # Start processing thread
-            processing_thread = threading.Thread(target=self.audio_processing_thread)
+            processing_thread = threading.Thread(target=self.audio_processing_thread, name="audio-processing")
             processing_thread.daemon = True
             processing_thread.start()
             
             # Start display thread
-            display_thread = threading.Thread(target=self.display_results_thread)
+            display_thread = threading.Thread(target=self.display_results_thread, name="audio-display")
             display_thread.daemon = True
             display_thread.start()
             
@@ -220,6 +269,10 @@ class AutomaticRealtimeSpeechEmotion:
         
         finally:
             self.is_running = False
+            if profiler is not None:
+                profiler.stop()
+            if self.recorder is not None:
+                self.recorder.close()
             print("🛑 All threads stopped. Goodbye!")
 
 if __name__ == "__main__":
@@ -227,9 +280,11 @@ if __name__ == "__main__":
     import argparse
     
     parser = argparse.ArgumentParser(description="Automatic Real-time Speech Emotion Recognition")
-    parser.add_argument("--chunk-duration", type=int, default=3, help="Audio chunk duration in seconds (default: 3)")
-    parser.add_argument("--overlap", type=int, default=1, help="Overlap between chunks in seconds (default: 1)")
-    parser.add_argument("--threshold", type=float, default=0.3, help="Minimum confidence threshold (default: 0.3)")
+    parser.add_argument("--chunk-duration", type=float, default=None, help="Audio chunk duration in seconds (default: from config, 3)")
+    parser.add_argument("--overlap", type=float, default=None, help="Overlap between chunks in seconds (default: from config, 1)")
+    parser.add_argument("--threshold", type=float, default=None, help="Minimum confidence threshold (default: from config, 0.3)")
+    parser.add_argument("--profile", action="store_true", help="Sample thread stacks into profiles/*.collapsed (or set WS_PROFILE=1)")
+    parser.add_argument("--record", action="store_true", help="Log emotion events to recordings/*.wsev for replay (or set WS_RECORD=1)")
     
     args = parser.parse_args()
     
@@ -238,4 +293,4 @@ if __name__ == "__main__":
         overlap=args.overlap,
         threshold=args.threshold
     )
-    detector.run()
\ No newline at end of file
+    detector.run(profile=args.profile or None, record=args.record or None)
\ No newline at end of file
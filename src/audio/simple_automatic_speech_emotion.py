@@ -7,6 +7,11 @@ Just run and it starts listening continuously
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from audio.live_emotion import budget_audio_threads, LiveEmotionMixin
+
+budget_audio_threads()
 
 import torch
 import numpy as np
@@ -17,33 +22,52 @@ import threading
 import queue
 import time
 
-class SimpleAutomaticSpeechEmotion:
+from utils.metrics import get_metrics, start_exporters
+from utils.profiler import maybe_start_profiler
+from utils import event_log
+from core.scheduler import get_scheduler
+from audio.audio_heads import triggered_labels
+
+class SimpleAutomaticSpeechEmotion(LiveEmotionMixin):
     def __init__(self, model_id="firdhokk/speech-emotion-recognition-with-openai-whisper-large-v3"):
         """Initialize the simple automatic speech emotion detector."""
         print("🎤 Initializing Simple Automatic Speech Emotion Recognition...")
         
         self.model_id = model_id
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.sample_rate = 16000
-        self.chunk_duration = 3  # seconds
-        self.overlap = 1  # seconds
-        self.threshold = 0.3  # minimum confidence
+        self._init_live_config()
         
         print(f"🔧 Using device: {self.device}")
         
+        self.metrics = get_metrics()
+        self.t_features = self.metrics.stage("feature_extraction")
+        self.t_inference = self.metrics.stage("emotion_inference")
+        self.chunks_total = self.metrics.counter("audio_chunks_total", "Audio chunks classified")
+        self.chunks_dropped = self.metrics.counter("audio_chunks_dropped_total",
+                                                   "Audio blocks lost to input overflow")
+        self.queue_depth = self.metrics.gauge("queue_depth", "Pending jobs per queue", {"queue": "audio"})
+        
         # Load model and feature extractor
+        load_start = time.perf_counter()
         self.model = AutoModelForAudioClassification.from_pretrained(model_id)
         self.feature_extractor = AutoFeatureExtractor.from_pretrained(model_id, do_normalize=True)
         self.id2label = self.model.config.id2label
         
         # Move model to device
         self.model = self.model.to(self.device)
+        self.metrics.gauge("model_load_seconds", "Model load time", {"model": "speech_emotion"}).set(
+            time.perf_counter() - load_start)
+        
+        self._init_heads(self.model)
         
         # Processing variables
         self.audio_queue = queue.Queue()
         self.is_running = False
         self.current_emotion = "Neutral"
         self.current_confidence = 0.0
+        self._init_state()
+        self.scheduler = get_scheduler()
+        self.recorder = None
         
         print(f"✅ Model loaded successfully!")
         print(f"🎯 Available emotions: {list(self.id2label.values())}")
@@ -57,10 +81,12 @@ class SimpleAutomaticSpeechEmotion:
         """Callback function for continuous audio streaming."""
         if status:
             print(f"Audio status: {status}")
+            if status.input_overflow:
+                self.chunks_dropped.inc()
         self.audio_queue.put(indata.copy())
     
     def process_audio_chunk(self, audio_chunk):
-        """Process a chunk of audio and predict emotion."""
+        """Process a chunk of audio and predict emotion (plus any audio head results)."""
         try:
             # Convert to numpy array
             audio_array = audio_chunk.flatten()
@@ -73,43 +99,49 @@ class SimpleAutomaticSpeechEmotion:
                 audio_array = np.pad(audio_array, (0, max_length - len(audio_array)))
             
             # Extract features
-            inputs = self.feature_extractor(
-                audio_array,
-                sampling_rate=self.sample_rate,
-                max_length=max_length,
-                truncation=True,
-                return_tensors="pt",
-            )
+            with self.t_features.time():
+                inputs = self.feature_extractor(
+                    audio_array,
+                    sampling_rate=self.sample_rate,
+                    max_length=max_length,
+                    truncation=True,
+                    return_tensors="pt",
+                )
             
             # Move to device
             inputs = {key: value.to(self.device) for key, value in inputs.items()}
             
             # Predict
-            with torch.no_grad():
+            with self.t_inference.time(), torch.no_grad():
                 outputs = self.model(**inputs)
+            self.chunks_total.inc()
             
             logits = outputs.logits
             probabilities = torch.softmax(logits, dim=-1)
             predicted_id = torch.argmax(logits, dim=-1).item()
             predicted_label = self.id2label[predicted_id]
             confidence = probabilities[0][predicted_id].item()
+            heads = self.heads.run(self.embedding_tap.pop())
             
-            return predicted_label, confidence
+            return predicted_label, confidence, heads
             
         except Exception as e:
             print(f"❌ Error processing audio: {str(e)}")
-            return None, 0.0
+            return None, 0.0, {}
     
     def processing_thread(self):
         """Thread for processing audio chunks."""
         audio_buffer = np.array([], dtype=np.float32)
-        chunk_samples = int(self.chunk_duration * self.sample_rate)
-        overlap_samples = int(self.overlap * self.sample_rate)
         
         while self.is_running:
             try:
+                # Re-read each pass so config reloads apply without a restart
+                chunk_samples = int(self.chunk_duration * self.sample_rate)
+                overlap_samples = int(self.overlap * self.sample_rate)
+                
                 # Get audio from queue
                 if not self.audio_queue.empty():
+                    self.queue_depth.set(self.audio_queue.qsize())
                     new_audio = self.audio_queue.get()
                     audio_buffer = np.concatenate([audio_buffer, new_audio.flatten()])
                     
@@ -118,13 +150,26 @@ class SimpleAutomaticSpeechEmotion:
                         # Extract chunk
                         chunk = audio_buffer[:chunk_samples]
                         
-                        # Process the chunk
-                        emotion, confidence = self.process_audio_chunk(chunk)
+                        # Whisper only runs on audible chunks (or when its result is stale)
+                        level = float(np.sqrt(np.mean(np.square(chunk))))
+                        if self.scheduler.should_run("emotion", level > self.config.current.scheduler.audio_gate):
+                            emotion, confidence, heads = self.process_audio_chunk(chunk)
+                            if emotion and self.recorder is not None:
+                                self.recorder.record(event_log.EMOTION, (emotion, confidence))
+                            distress = triggered_labels(heads)
+                            self.safety_state.update(distressSound=", ".join(distress) or "None")
+                            if distress:
+                                timestamp = datetime.now().strftime("%H:%M:%S")
+                                print(f"🚨 {timestamp} | Distress sound: {', '.join(distress)}")
+                        else:
+                            emotion, confidence = None, 0.0
                         
                         # Update current emotion if confidence is high enough
                         if emotion and confidence >= self.threshold:
                             self.current_emotion = emotion
                             self.current_confidence = confidence
+                            self.safety_state.update(currentEmotion=emotion,
+                                                     emotionConfidence=round(confidence, 3))
                             
                             # Display result
                             timestamp = datetime.now().strftime("%H:%M:%S")
@@ -144,13 +189,16 @@ class SimpleAutomaticSpeechEmotion:
                 print(f"❌ Error in processing thread: {str(e)}")
                 time.sleep(0.5)
     
-    def run(self):
+    def run(self, profile=None, record=None):
         """Run the automatic real-time emotion detection."""
         self.is_running = True
+        start_exporters("audio", self.config.current.metrics)
+        profiler = maybe_start_profiler(profile)
+        self.recorder = event_log.maybe_start_recorder("audio", record)
         
         try:
             # Start processing thread
-            processing_thread = threading.Thread(target=self.processing_thread)
+            processing_thread = threading.Thread(target=self.processing_thread, name="audio-processing")
             processing_thread.daemon = True
             processing_thread.start()
             
@@ -178,6 +226,10 @@ class SimpleAutomaticSpeechEmotion:
         
         finally:
             self.is_running = False
+            if profiler is not None:
+                profiler.stop()
+            if self.recorder is not None:
+                self.recorder.close()
             print("🛑 All threads stopped. Goodbye!")
 
 if __name__ == "__main__":
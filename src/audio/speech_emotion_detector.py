@@ -8,6 +8,7 @@ to detect emotions from speech/audio files.
 import os
 import sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 import torch
 import librosa
@@ -16,11 +17,16 @@ from transformers import AutoModelForAudioClassification, AutoFeatureExtractor
 import sounddevice as sd
 import soundfile as sf
 from datetime import datetime
+import time
 import warnings
 warnings.filterwarnings('ignore')
 
+from utils.metrics import get_metrics
+from utils.config import get_config_manager
+from audio.audio_heads import EmbeddingTap, HeadSet, triggered_labels
+
 class SpeechEmotionDetector:
-    def __init__(self, model_id="firdhokk/speech-emotion-recognition-with-openai-whisper-large-v3"):
+    def __init__(self, model_id="firdhokk/speech-emotion-recognition-with-openai-whisper-large-v3", heads_dir=None):
         """Initialize the speech emotion detector with the specified model."""
         print("🎤 Initializing Speech Emotion Detector...")
         print(f"📡 Loading model: {model_id}")
@@ -29,13 +35,26 @@ class SpeechEmotionDetector:
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         print(f"🔧 Using device: {self.device}")
         
+        self.metrics = get_metrics()
+        self.t_features = self.metrics.stage("feature_extraction")
+        self.t_inference = self.metrics.stage("emotion_inference")
+        
         # Load model and feature extractor
+        load_start = time.perf_counter()
         self.model = AutoModelForAudioClassification.from_pretrained(model_id)
         self.feature_extractor = AutoFeatureExtractor.from_pretrained(model_id, do_normalize=True)
         self.id2label = self.model.config.id2label
         
         # Move model to device
         self.model = self.model.to(self.device)
+        self.metrics.gauge("model_load_seconds", "Model load time", {"model": "speech_emotion"}).set(
+            time.perf_counter() - load_start)
+        
+        # Distress heads reuse the emotion model's pooled embedding
+        if heads_dir is None:
+            heads_dir = get_config_manager().current.audio.heads_dir
+        self.embedding_tap = EmbeddingTap(self.model)
+        self.heads = HeadSet.load(heads_dir, self.embedding_tap.dim)
         
         print(f"✅ Model loaded successfully!")
         print(f"🎯 Available emotions: {list(self.id2label.values())}")
@@ -67,14 +86,15 @@ class SpeechEmotionDetector:
         return inputs
     
     def predict_emotion_from_array(self, audio_array, sampling_rate=16000, max_duration=30.0):
-        """Predict emotion from audio array."""
-        inputs = self.preprocess_audio(audio_array, sampling_rate, max_duration)
+        """Predict emotion from audio array; returns label, confidence, all emotions and audio head results."""
+        with self.t_features.time():
+            inputs = self.preprocess_audio(audio_array, sampling_rate, max_duration)
         
         # Move inputs to device
         inputs = {key: value.to(self.device) for key, value in inputs.items()}
         
         # Predict
-        with torch.no_grad():
+        with self.t_inference.time(), torch.no_grad():
             outputs = self.model(**inputs)
         
         logits = outputs.logits
@@ -82,13 +102,14 @@ class SpeechEmotionDetector:
         predicted_id = torch.argmax(logits, dim=-1).item()
         predicted_label = self.id2label[predicted_id]
         confidence = probabilities[0][predicted_id].item()
+        heads = self.heads.run(self.embedding_tap.pop())
         
         # Get all emotion probabilities
         all_emotions = {}
         for i, emotion in self.id2label.items():
             all_emotions[emotion] = probabilities[0][i].item()
         
-        return predicted_label, confidence, all_emotions
+        return predicted_label, confidence, all_emotions, heads
     
     def predict_emotion_from_file(self, audio_path, max_duration=30.0):
         """Predict emotion from audio file."""
@@ -99,15 +120,15 @@ class SpeechEmotionDetector:
             audio_array, sampling_rate = librosa.load(audio_path, sr=self.feature_extractor.sampling_rate)
             
             # Predict emotion
-            predicted_label, confidence, all_emotions = self.predict_emotion_from_array(
+            predicted_label, confidence, all_emotions, heads = self.predict_emotion_from_array(
                 audio_array, sampling_rate, max_duration
             )
             
-            return predicted_label, confidence, all_emotions
+            return predicted_label, confidence, all_emotions, heads
             
         except Exception as e:
             print(f"❌ Error processing file {audio_path}: {str(e)}")
-            return None, 0.0, {}
+            return None, 0.0, {}, {}
     
     def record_audio(self, duration=5, sample_rate=16000):
         """Record audio from microphone."""
@@ -132,14 +153,14 @@ class SpeechEmotionDetector:
         audio_array, sampling_rate = self.record_audio(duration)
         
         if audio_array is not None:
-            predicted_label, confidence, all_emotions = self.predict_emotion_from_array(
+            predicted_label, confidence, all_emotions, heads = self.predict_emotion_from_array(
                 audio_array, sampling_rate
             )
-            return predicted_label, confidence, all_emotions
+            return predicted_label, confidence, all_emotions, heads
         
-        return None, 0.0, {}
+        return None, 0.0, {}, {}
     
-    def display_results(self, predicted_label, confidence, all_emotions, audio_source):
+    def display_results(self, predicted_label, confidence, all_emotions, audio_source, heads=None):
         """Display prediction results."""
         print("\n" + "="*50)
         print(f"🎯 EMOTION PREDICTION RESULTS for: {audio_source}")
@@ -157,6 +178,15 @@ class SpeechEmotionDetector:
             bar = "█" * bar_length + "░" * (30 - bar_length)
             print(f"  {emotion:12} | {bar} | {percentage:5.2f}%")
         
+        if heads:
+            print("\n🧩 Audio Heads:")
+            for name, result in heads.items():
+                flag = "🚨" if result["triggered"] else "  "
+                print(f"  {flag} {name:12} | {result['label']:<12} | {result['score']*100:5.2f}%")
+            distress = triggered_labels(heads)
+            if distress:
+                print(f"🚨 Distress sound: {', '.join(distress)}")
+        
         print("="*50)
 
 def main():
@@ -181,10 +211,10 @@ def main():
             duration = input("Enter recording duration in seconds (default 5): ").strip()
             duration = int(duration) if duration else 5
             
-            predicted_label, confidence, all_emotions = detector.predict_emotion_live(duration)
+            predicted_label, confidence, all_emotions, heads = detector.predict_emotion_live(duration)
             
             if predicted_label:
-                detector.display_results(predicted_label, confidence, all_emotions, "Live Recording")
+                detector.display_results(predicted_label, confidence, all_emotions, "Live Recording", heads)
             else:
                 print("❌ Failed to process audio")
         
@@ -193,10 +223,10 @@ def main():
             audio_path = input("Enter path to audio file: ").strip()
             
             if os.path.exists(audio_path):
-                predicted_label, confidence, all_emotions = detector.predict_emotion_from_file(audio_path)
+                predicted_label, confidence, all_emotions, heads = detector.predict_emotion_from_file(audio_path)
                 
                 if predicted_label:
-                    detector.display_results(predicted_label, confidence, all_emotions, audio_path)
+                    detector.display_results(predicted_label, confidence, all_emotions, audio_path, heads)
                 else:
                     print("❌ Failed to process audio file")
             else:
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the nearest-help index
+Builds a synthetic nationwide dataset of help locations and compares the
+cached KD-tree against a linear haversine scan
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import csv
+import time
+import random
+import argparse
+
+from emergency.help_locations import load_index, load_locations, linear_nearest, haversine_m
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+KINDS = ("police", "hospital", "safe_zone")
+
+
+def write_dataset(path, count, seed=0):
+    """Points clustered around pseudo-cities inside India's bounding box"""
+    rng = random.Random(seed)
+    cities = [(rng.uniform(8.0, 35.0), rng.uniform(69.0, 96.0)) for _ in range(400)]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "kind", "lat", "lon", "phone"])
+        for i in range(count):
+            lat, lon = rng.choice(cities)
+            writer.writerow([f"place-{i}", rng.choice(KINDS), round(rng.gauss(lat, 0.3), 6),
+                             round(rng.gauss(lon, 0.3), 6), "112"])
+    return path
+
+
+def time_queries(fn, queries):
+    latencies = []
+    for lat, lon in queries:
+        start = time.perf_counter()
+        fn(lat, lon)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.95)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Help location index benchmark")
+    parser.add_argument("--points", type=int, default=200000, help="Dataset size (default: 200000)")
+    parser.add_argument("--queries", type=int, default=500, help="Index queries to time (default: 500)")
+    parser.add_argument("--linear-queries", type=int, default=10, help="Linear-scan queries to time (default: 10)")
+    parser.add_argument("-k", type=int, default=5, help="Neighbours per query (default: 5)")
+    parser.add_argument("--radius", type=float, default=5000, help="Radius query in meters (default: 5000)")
+    args = parser.parse_args()
+
+    path = os.path.join(FIXTURES_DIR, f"help_locations_{args.points}.csv")
+    if not os.path.exists(path):
+        write_dataset(path, args.points)
+    cache_path = path + ".index.json"
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+
+    start = time.perf_counter()
+    index = load_index(path)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    index = load_index(path)
+    warm = time.perf_counter() - start
+    locations = load_locations(path)
+
+    rng = random.Random(1)
+    queries = [(rng.uniform(8.0, 35.0), rng.uniform(69.0, 96.0)) for _ in range(args.queries)]
+    knn = time_queries(lambda lat, lon: index.nearest(lat, lon, args.k), queries)
+    knn_kind = time_queries(lambda lat, lon: index.nearest(lat, lon, 1, "police"), queries)
+    radius = time_queries(lambda lat, lon: index.within(lat, lon, args.radius), queries)
+    linear = time_queries(lambda lat, lon: linear_nearest(locations, lat, lon, args.k),
+                          queries[:args.linear_queries])
+
+    mismatches = 0
+    for lat, lon in queries[:args.linear_queries]:
+        expected = [loc for loc, _ in linear_nearest(locations, lat, lon, args.k)]
+        mismatches += [loc for loc, _ in index.nearest(lat, lon, args.k)] != expected
+        expected = {loc for loc in locations if haversine_m(lat, lon, loc.lat, loc.lon) <= args.radius}
+        mismatches += {loc for loc, _ in index.within(lat, lon, args.radius)} != expected
+
+    print("=" * 60)
+    print(f"🗺️ {len(index)} help locations")
+    print(f"   Build (cold):      {cold:8.2f} s")
+    print(f"   Load from cache:   {warm:8.2f} s")
+    print(f"   k={args.k} nearest:       p50 {knn[0]:9.1f} µs | p95 {knn[1]:9.1f} µs")
+    print(f"   nearest police:    p50 {knn_kind[0]:9.1f} µs | p95 {knn_kind[1]:9.1f} µs")
+    print(f"   within {args.radius:.0f} m:    p50 {radius[0]:9.1f} µs | p95 {radius[1]:9.1f} µs")
+    print(f"   linear scan k={args.k}:   p50 {linear[0]:9.1f} µs | p95 {linear[1]:9.1f} µs "
+          f"({linear[0] / max(knn[0], 1e-9):.0f}x slower)")
+    print(f"   Mismatches vs linear scan: {mismatches}")
+    print("=" * 60)
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
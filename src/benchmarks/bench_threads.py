@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Thread budget benchmark
+Runs person detection and speech emotion inference side by side in two
+processes under each resources preset and reports combined throughput
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+import argparse
+import multiprocessing
+from dataclasses import replace
+
+from utils.config import ResourcesConfig
+from utils.resources import PRESETS, available_cpus, apply_thread_budget
+
+SETUPS = {"vision": "setup_person_detect", "audio": "setup_emotion_inference"}
+
+
+def worker(component, preset, duration, barrier, results):
+    """Apply the budget before torch loads, then run the component's stage until time is up"""
+    apply_thread_budget(component, replace(ResourcesConfig(), preset=preset))
+    try:
+        from benchmarks import run_benchmarks
+        fn, unit = getattr(run_benchmarks, SETUPS[component])()
+        fn(0)  # warm-up outside the timed window
+    except Exception as e:
+        # SkipStage (missing weights) or a missing dependency; keep the other worker unblocked
+        barrier.wait()
+        results.put((component, None, str(e)))
+        return
+    barrier.wait()
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        fn(count)
+        count += 1
+    results.put((component, count / (time.perf_counter() - start), unit))
+
+
+def run_preset(preset, duration):
+    ctx = multiprocessing.get_context("spawn")
+    barrier = ctx.Barrier(len(SETUPS))
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(component, preset, duration, barrier, results))
+             for component in SETUPS]
+    for p in procs:
+        p.start()
+    outcome = dict((component, (rate, info)) for component, rate, info in (results.get() for _ in procs))
+    for p in procs:
+        p.join()
+    return outcome
+
+
+def main():
+    cpus = len(available_cpus())
+    parser = argparse.ArgumentParser(description="Vision + audio thread budget benchmark")
+    parser.add_argument("--presets", nargs="*",
+                        default=["off"] + [str(c) for c in sorted(PRESETS) if c <= cpus],
+                        help="Presets to compare (default: off plus every preset that fits this box)")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per preset (default: 20)")
+    args = parser.parse_args()
+
+    print(f"🧵 Thread budget benchmark on {cpus} CPUs")
+    print("=" * 60)
+    for preset in args.presets:
+        outcome = run_preset(preset, args.duration)
+        parts = []
+        for component, (rate, info) in outcome.items():
+            parts.append(f"{component} skipped ({info})" if rate is None else f"{component} {rate:7.2f} {info}/s")
+        print(f"{preset:>5}: " + " | ".join(parts))
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Synthetic benchmark fixtures for the Women Safety Application
+Deterministic crowd / empty-scene video and speech / scream / silence audio
+"""
+
+import os
+import wave
+
+import numpy as np
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FRAME_SIZE = (480, 640)
+SAMPLE_RATE = 16000
+
+
+def _background(rng, height, width):
+    """Static street-like gradient with sensor noise"""
+    ramp = np.linspace(60, 140, width, dtype=np.float32)
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    frame[:] = ramp[None, :, None]
+    frame[height * 2 // 3:] *= 0.6
+    frame += rng.normal(0, 3, frame.shape)
+    return frame
+
+
+def empty_scene_frames(n_frames=60, seed=0):
+    """Frames of an empty scene: background plus noise only"""
+    rng = np.random.default_rng(seed)
+    height, width = FRAME_SIZE
+    base = _background(rng, height, width)
+    frames = []
+    for _ in range(n_frames):
+        frame = base + rng.normal(0, 2, base.shape)
+        frames.append(np.clip(frame, 0, 255).astype(np.uint8))
+    return frames
+
+
+def crowd_scene_frames(n_frames=60, n_people=12, seed=1):
+    """Frames of a crowd: person-shaped blobs walking across the scene"""
+    import cv2
+
+    rng = np.random.default_rng(seed)
+    height, width = FRAME_SIZE
+    base = np.clip(_background(rng, height, width), 0, 255).astype(np.uint8)
+    people = []
+    for _ in range(n_people):
+        people.append({
+            "x": rng.uniform(0, width),
+            "y": rng.uniform(height * 0.35, height * 0.8),
+            "vx": rng.uniform(-6, 6),
+            "scale": rng.uniform(0.6, 1.2),
+            "color": tuple(int(c) for c in rng.integers(30, 220, 3)),
+        })
+
+    frames = []
+    for _ in range(n_frames):
+        frame = base.copy()
+        for p in sorted(people, key=lambda q: q["y"]):
+            p["x"] = (p["x"] + p["vx"]) % width
+            x, y, s = int(p["x"]), int(p["y"]), p["scale"]
+            head = int(12 * s)
+            cv2.circle(frame, (x, y - int(70 * s)), head, (150, 170, 200), -1)
+            cv2.rectangle(frame, (x - int(18 * s), y - int(55 * s)), (x + int(18 * s), y + int(20 * s)),
+                          p["color"], -1)
+            cv2.rectangle(frame, (x - int(14 * s), y + int(20 * s)), (x + int(14 * s), y + int(75 * s)),
+                          (40, 40, 60), -1)
+        frames.append(frame)
+    return frames
+
+
+def speech_audio(duration=3.0, seed=2):
+    """Speech-like signal: harmonic voice with syllable-rate amplitude envelope"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 20 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 4 * t), 0, None) ** 0.5
+    signal = 0.2 * voice * envelope + rng.normal(0, 0.005, len(t))
+    return signal.astype(np.float32)
+
+
+def scream_audio(duration=3.0, seed=3):
+    """Scream-like signal: loud high-pitched tone with vibrato and noise"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 1200 + 150 * np.sin(2 * np.pi * 6 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    signal = 0.6 * np.sin(phase) + 0.3 * np.sin(2 * phase) + rng.normal(0, 0.05, len(t))
+    return np.clip(signal, -1, 1).astype(np.float32)
+
+
+def silence_audio(duration=3.0, seed=4):
+    """Near-silent room tone"""
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 0.002, int(duration * SAMPLE_RATE)).astype(np.float32)
+
+
+AUDIO_FIXTURES = {"speech": speech_audio, "scream": scream_audio, "silence": silence_audio}
+VIDEO_FIXTURES = {"crowd": crowd_scene_frames, "empty": empty_scene_frames}
+
+
+def write_wav(path, samples, sample_rate=SAMPLE_RATE):
+    with wave.open(path, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes((np.clip(samples, -1, 1) * 32767).astype(np.int16).tobytes())
+
+
+def write_video(path, frames, fps=15):
+    import cv2
+
+    height, width = frames[0].shape[:2]
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    for frame in frames:
+        writer.write(frame)
+    writer.release()
+
+
+def generate_all(directory=FIXTURES_DIR):
+    """Write every fixture to disk (WAV + MJPG AVI) and return their paths"""
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for name, make in AUDIO_FIXTURES.items():
+        path = os.path.join(directory, f"{name}.wav")
+        write_wav(path, make())
+        paths[name] = path
+    for name, make in VIDEO_FIXTURES.items():
+        path = os.path.join(directory, f"{name}.avi")
+        write_video(path, make())
+        paths[name] = path
+    return paths
+
+
+if __name__ == "__main__":
+    for name, path in generate_all().items():
+        print(f"✅ {name}: {path}")
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the Women Safety Application
+Measures per-stage latency and throughput on synthetic fixtures and
+fails when a stage regresses against the saved JSON baseline
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import platform
+import argparse
+
+import numpy as np
+
+from benchmarks.fixtures import crowd_scene_frames, empty_scene_frames, speech_audio, scream_audio, silence_audio, SAMPLE_RATE
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'models')
+EMOTION_MODEL_ID = "firdhokk/speech-emotion-recognition-with-openai-whisper-large-v3"
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+class SkipStage(Exception):
+    """Raised by a stage setup when its dependencies or weights are absent"""
+
+
+def _require(module_name):
+    try:
+        return __import__(module_name)
+    except ImportError:
+        raise SkipStage(f"{module_name} is not installed")
+
+
+def _load_yolo(weights):
+    path = os.path.join(MODELS_DIR, weights)
+    if not os.path.exists(path):
+        raise SkipStage(f"model weights not found: {path}")
+    ultralytics = _require("ultralytics")
+    return ultralytics.YOLO(path)
+
+
+def _audio_clips():
+    return [speech_audio(), scream_audio(), silence_audio()]
+
+
+# Vision stages run on both scenes: a crowd exercises NMS and pose heads,
+# an empty scene is the common idle case
+SCENES = {"crowd": crowd_scene_frames, "empty": empty_scene_frames}
+
+
+# Each setup returns (callable taking the iteration index, unit of work)
+
+def setup_person_detect(scene="crowd"):
+    model = _load_yolo("yolov8n.pt")
+    frames = SCENES[scene](30)
+    return (lambda i: model(frames[i % len(frames)], conf=0.3, verbose=False)), "frames"
+
+
+def setup_pose(scene="crowd"):
+    model = _load_yolo("yolov8n-pose.pt")
+    frames = SCENES[scene](30)
+    return (lambda i: model(frames[i % len(frames)], verbose=False)), "frames"
+
+
+def setup_motion(scene="crowd"):
+    _require("cv2")
+    from vision.image_ops import MotionDetector
+    detector = MotionDetector()
+    frames = SCENES[scene](30)
+    detector.update(frames[-1])
+    return (lambda i: detector.update(frames[i % len(frames)])), "frames"
+
+
+def setup_blur():
+    _require("cv2")
+    from vision.image_ops import blur_faces
+    frames = crowd_scene_frames(10)
+    return (lambda i: blur_faces(frames[i % len(frames)].copy())), "frames"
+
+
+def _load_feature_extractor():
+    transformers = _require("transformers")
+    try:
+        return transformers.AutoFeatureExtractor.from_pretrained(
+            EMOTION_MODEL_ID, do_normalize=True, local_files_only=True)
+    except OSError:
+        raise SkipStage(f"feature extractor for {EMOTION_MODEL_ID} is not cached locally")
+
+
+def _prepare(feature_extractor, clip):
+    max_length = int(feature_extractor.sampling_rate * 30.0)
+    clip = np.pad(clip, (0, max(0, max_length - len(clip))))[:max_length]
+    return feature_extractor(clip, sampling_rate=SAMPLE_RATE, max_length=max_length,
+                             truncation=True, return_tensors="pt")
+
+
+def setup_feature_extraction():
+    feature_extractor = _load_feature_extractor()
+    clips = _audio_clips()
+    return (lambda i: _prepare(feature_extractor, clips[i % len(clips)])), "chunks"
+
+
+def setup_emotion_inference():
+    torch = _require("torch")
+    transformers = _require("transformers")
+    feature_extractor = _load_feature_extractor()
+    try:
+        model = transformers.AutoModelForAudioClassification.from_pretrained(
+            EMOTION_MODEL_ID, local_files_only=True)
+    except OSError:
+        raise SkipStage(f"weights for {EMOTION_MODEL_ID} are not cached locally")
+    model.eval()
+    inputs = [_prepare(feature_extractor, clip) for clip in _audio_clips()]
+
+    def infer(i):
+        with torch.no_grad():
+            return model(**inputs[i % len(inputs)])
+    return infer, "chunks"
+
+
+def setup_decision_fusion():
+    from core.decision_engine import DecisionEngine
+    engine = DecisionEngine()
+    rng = np.random.default_rng(0)
+    cases = [({"risky_pose": bool(a), "motion": bool(b)}, {"audio_alert": bool(c)})
+             for a, b, c in rng.integers(0, 2, (256, 3))]
+    return (lambda i: engine.assess_threat(*cases[i % len(cases)])), "decisions"
+
+
+STAGES = {
+    "person_detect": setup_person_detect,
+    "person_detect_empty": lambda: setup_person_detect("empty"),
+    "pose": setup_pose,
+    "pose_empty": lambda: setup_pose("empty"),
+    "motion": setup_motion,
+    "motion_empty": lambda: setup_motion("empty"),
+    "blur": setup_blur,
+    "feature_extraction": setup_feature_extraction,
+    "emotion_inference": setup_emotion_inference,
+    "decision_fusion": setup_decision_fusion,
+}
+
+
+def run_stage(fn, warmup, min_iterations, min_time):
+    """Time fn until both min_iterations and min_time are reached"""
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    start = time.perf_counter()
+    i = 0
+    while len(latencies) < min_iterations or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - t0)
+        i += 1
+    latencies = np.array(latencies)
+    return {
+        "iterations": len(latencies),
+        "mean_ms": float(latencies.mean() * 1000),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "throughput": float(len(latencies) / latencies.sum()),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages for stages slower than baseline * (1 + tolerance)"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("stages", {}).get(name)
+        if not base or result.get("skipped") or base.get("skipped"):
+            continue
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p50 {result['p50_ms']:.3f} ms vs baseline {base['p50_ms']:.3f} ms")
+        if result["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {result['throughput']:.1f}/s "
+                               f"vs baseline {base['throughput']:.1f}/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Women Safety benchmark suite")
+    parser.add_argument("--stages", nargs="*", default=list(STAGES), help="Stages to run (default: all)")
+    parser.add_argument("--warmup", type=int, default=3, help="Warm-up iterations per stage (default: 3)")
+    parser.add_argument("--iterations", type=int, default=20, help="Minimum timed iterations (default: 20)")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Minimum timed seconds per stage (default: 1)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--save-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown before failing, as a fraction (default: 0.25)")
+    parser.add_argument("--output", help="Also write results JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    print("🏁 Women Safety benchmarks")
+    print("=" * 60)
+    for name in args.stages:
+        if name not in STAGES:
+            print(f"❌ Unknown stage: {name}")
+            return 2
+        try:
+            fn, unit = STAGES[name]()
+        except SkipStage as e:
+            print(f"⏭️  {name:<20} skipped: {e}")
+            results[name] = {"skipped": True, "reason": str(e)}
+            continue
+        result = run_stage(fn, args.warmup, args.iterations, args.min_time)
+        result["unit"] = unit
+        results[name] = result
+        print(f"✅ {name:<20} p50 {result['p50_ms']:9.3f} ms | p95 {result['p95_ms']:9.3f} ms | "
+              f"{result['throughput']:9.1f} {unit}/s")
+    print("=" * 60)
+
+    report = {
+        "machine": {"platform": platform.platform(), "python": platform.python_version(),
+                    "cpus": os.cpu_count()},
+        "timestamp": time.time(),
+        "stages": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"ℹ️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ Regressions beyond {args.tolerance:.0%}:")
+        for message in regressions:
+            print(f"   - {message}")
+        return 1
+    print(f"✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,9 @@ Core module for the Women Safety Application
 Contains the main decision engine and coordination logic
 """
 
+# Number of risky modalities -> threat level
+THREAT_LEVELS = ("LOW", "MEDIUM", "HIGH", "HIGH")
+
 class DecisionEngine:
     """Central decision engine for coordinating all safety systems"""
     
@@ -11,6 +14,8 @@ class DecisionEngine:
         self.audio_system = None
         self.emergency_system = None
         self.threat_level = "LOW"
+        self.active_modalities = []
+        self.last_alerted = 0
         
     def initialize_systems(self):
         """Initialize all subsystems"""
@@ -19,10 +24,34 @@ class DecisionEngine:
         return True
     
     def assess_threat(self, vision_data=None, audio_data=None):
-        """Assess threat level based on all available data"""
-        # TODO: Implement threat assessment logic
+        """Assess threat level based on all available data
+        
+        vision_data: {"risky_pose": bool, "motion": bool}
+        audio_data: {"audio_alert": bool}
+        Two or more risky modalities mean HIGH, one means MEDIUM.
+        """
+        vision_data = vision_data or {}
+        audio_data = audio_data or {}
+        modalities = {
+            "risky_pose": bool(vision_data.get("risky_pose")),
+            "motion": bool(vision_data.get("motion")),
+            "audio_alert": bool(audio_data.get("audio_alert")),
+        }
+        self.active_modalities = [name for name, active in modalities.items() if active]
+        self.threat_level = THREAT_LEVELS[len(self.active_modalities)]
         return self.threat_level
     
+    def should_alert(self, now, wait):
+        """True when the threat is HIGH and the last alert is more than `wait` seconds old"""
+        if self.threat_level != "HIGH" or now - self.last_alerted <= wait:
+            return False
+        self.last_alerted = now
+        return True
+    
+    def needs_confirmation(self):
+        """True when a single modality is active and the heavy models should confirm it"""
+        return len(self.active_modalities) == 1
+    
     def trigger_emergency_response(self):
         """Trigger emergency response procedures"""
         print("🚨 Emergency response triggered!")
@@ -32,4 +61,4 @@ class DecisionEngine:
 # Example usage
 if __name__ == "__main__":
     engine = DecisionEngine()
-    print("Decision Engine module loaded successfully!")
\ No newline at end of file
+    print("Decision Engine module loaded successfully!")
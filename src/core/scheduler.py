@@ -0,0 +1,123 @@
+"""
+Cascaded inference scheduling for the Women Safety Application
+Cheap detectors (motion, audio level) run on every pass; the heavy models
+(YOLO, Whisper) only run when a cheap signal fires, the decision engine asks
+for confirmation, or their last result is older than the refresh limit
+"""
+
+import time
+import threading
+
+from utils.config import get_config_manager
+from utils.metrics import get_metrics
+
+# Buckets for time-to-alert, 10 ms .. 30 s
+ALERT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class CascadeScheduler:
+    """Decides per pass whether each heavy model should run
+
+    Thresholds come from config.scheduler and are re-read on every call:
+    `<model>_max_interval` bounds how stale a model's result may get, and
+    `hold` keeps a model escalated for that many seconds after the last
+    trigger so a brief dip in the cheap signal does not drop the confirmation.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or get_config_manager()
+        self.lock = threading.Lock()
+        self.last_run = {}
+        self.escalated_until = {}
+        self.episode_start = None
+
+        self.metrics = get_metrics()
+        self.runs = {}
+        self.skipped = {}
+        self.time_to_alert = self.metrics.histogram(
+            "time_to_alert_seconds", "Time from the first cheap trigger to the alert", buckets=ALERT_BUCKETS)
+
+    def _counters(self, name):
+        if name not in self.skipped:
+            self.skipped[name] = self.metrics.counter(
+                "cascade_skipped_total", "Heavy model passes skipped by the cascade", {"model": name})
+            for reason in ("trigger", "confirm", "refresh", "disabled"):
+                self.runs[(name, reason)] = self.metrics.counter(
+                    "cascade_runs_total", "Heavy model passes by escalation reason",
+                    {"model": name, "reason": reason})
+
+    def should_run(self, name, trigger, now=None):
+        """Return True if model `name` should run this pass (and record it as run)
+
+        trigger is the cheap detector's verdict for this pass.
+        """
+        now = time.perf_counter() if now is None else now
+        cfg = self.config.current.scheduler
+        self._counters(name)
+        with self.lock:
+            if trigger:
+                self.escalated_until[name] = now + cfg.hold
+                if self.episode_start is None:
+                    self.episode_start = now
+
+            if not cfg.enabled:
+                reason = "disabled"
+            elif trigger:
+                reason = "trigger"
+            elif now < self.escalated_until.get(name, 0.0):
+                reason = "confirm"
+            elif now - self.last_run.get(name, float("-inf")) >= getattr(cfg, f"{name}_max_interval", 0.0):
+                reason = "refresh"
+            else:
+                reason = None
+
+            if self.episode_start is not None and not any(
+                    until > now for until in self.escalated_until.values()):
+                # Every model has calmed down; the next trigger starts a new episode
+                self.episode_start = None
+
+            if reason is None:
+                self.skipped[name].inc()
+                return False
+            self.last_run[name] = now
+        self.runs[(name, reason)].inc()
+        return True
+
+    def confirm(self, names, seconds=None, now=None):
+        """Keep `names` running for `seconds` (default: config hold), e.g. while a threat is unconfirmed"""
+        now = time.perf_counter() if now is None else now
+        seconds = self.config.current.scheduler.hold if seconds is None else seconds
+        with self.lock:
+            for name in names:
+                self.escalated_until[name] = max(self.escalated_until.get(name, 0.0), now + seconds)
+
+    def alerted(self, now=None):
+        """Record an alert; observes the time since this episode's first cheap trigger"""
+        now = time.perf_counter() if now is None else now
+        with self.lock:
+            start, self.episode_start = self.episode_start, None
+        if start is not None:
+            self.time_to_alert.observe(now - start)
+            return now - start
+        return None
+
+    def stats(self):
+        with self.lock:
+            names = list(self.skipped)
+        return {name: {"skipped": self.skipped[name].get(),
+                       "runs": {reason: counter.get() for (model, reason), counter in self.runs.items()
+                                if model == name}}
+                for name in names}
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler():
+    """Process-wide CascadeScheduler"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = CascadeScheduler()
+        return _scheduler
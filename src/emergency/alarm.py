@@ -0,0 +1,317 @@
+"""
+Alarm playback for the Women Safety Application
+Tones are synthesized once and cached; patterns play on a worker thread so
+raising an alarm never stalls the detection loop
+"""
+
+import io
+import os
+import sys
+import wave
+import queue
+import shutil
+import tempfile
+import threading
+import subprocess
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+PATTERNS = ("beep", "repeat", "siren")
+
+
+class ToneCache:
+    """int16 tone buffers keyed by their synthesis parameters"""
+
+    def __init__(self, sample_rate=SAMPLE_RATE, volume=0.5, fade_ms=5):
+        self.sample_rate = sample_rate
+        self.volume = volume
+        self.fade_ms = fade_ms
+        self.lock = threading.Lock()
+        self.tones = {}
+
+    def _fade(self, wave_f):
+        # Short linear ramps avoid clicks at the start/end of each tone
+        n = min(len(wave_f) // 2, int(self.sample_rate * self.fade_ms / 1000))
+        if n > 0:
+            ramp = np.linspace(0.0, 1.0, n, endpoint=False)
+            wave_f[:n] *= ramp
+            wave_f[-n:] *= ramp[::-1]
+        return wave_f
+
+    def tone(self, freq, duration_ms):
+        """Sine tone at freq Hz"""
+        key = ("tone", int(freq), int(duration_ms))
+        with self.lock:
+            samples = self.tones.get(key)
+            if samples is None:
+                t = np.arange(int(self.sample_rate * duration_ms / 1000)) / self.sample_rate
+                wave_f = self._fade(self.volume * np.sin(2 * np.pi * float(freq) * t))
+                samples = self.tones[key] = np.int16(wave_f * 32767)
+            return samples
+
+    def sweep(self, low_hz, high_hz, duration_ms):
+        """Linear up-then-down frequency sweep (one siren cycle)"""
+        key = ("sweep", int(low_hz), int(high_hz), int(duration_ms))
+        with self.lock:
+            samples = self.tones.get(key)
+            if samples is None:
+                n = int(self.sample_rate * duration_ms / 1000)
+                half = n // 2
+                freq = np.concatenate([np.linspace(low_hz, high_hz, half),
+                                       np.linspace(high_hz, low_hz, n - half)])
+                phase = 2 * np.pi * np.cumsum(freq) / self.sample_rate
+                wave_f = self._fade(self.volume * np.sin(phase))
+                samples = self.tones[key] = np.int16(wave_f * 32767)
+            return samples
+
+    def silence(self, duration_ms):
+        key = ("silence", int(duration_ms))
+        with self.lock:
+            samples = self.tones.get(key)
+            if samples is None:
+                samples = self.tones[key] = np.zeros(int(self.sample_rate * duration_ms / 1000), dtype=np.int16)
+            return samples
+
+    def pattern(self, pattern, freq, duration_ms, repeat=1, gap_ms=150):
+        """Return the full int16 buffer for a pattern (cached like single tones)"""
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown alarm pattern: {pattern!r}")
+        key = ("pattern", pattern, int(freq), int(duration_ms), int(repeat), int(gap_ms))
+        with self.lock:
+            samples = self.tones.get(key)
+        if samples is not None:
+            return samples
+
+        if pattern == "beep":
+            samples = self.tone(freq, duration_ms)
+        elif pattern == "repeat":
+            beep, gap = self.tone(freq, duration_ms), self.silence(gap_ms)
+            parts = []
+            for i in range(max(1, repeat)):
+                parts.append(beep)
+                if i < repeat - 1:
+                    parts.append(gap)
+            samples = np.concatenate(parts)
+        else:
+            # Each siren cycle sweeps an octave around freq over duration_ms
+            cycle = self.sweep(freq * 0.7, freq * 1.4, duration_ms)
+            samples = np.concatenate([cycle] * max(1, repeat))
+        with self.lock:
+            self.tones[key] = samples
+        return samples
+
+    def wav_bytes(self, samples):
+        """Encode a buffer as an in-memory mono 16-bit WAV"""
+        buf = io.BytesIO()
+        with wave.open(buf, "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(self.sample_rate)
+            w.writeframes(samples.tobytes())
+        return buf.getvalue()
+
+
+class NullSink:
+    """Records what would have been played; for headless runs and tests"""
+
+    name = "null"
+
+    def __init__(self):
+        self.played = []
+
+    def play(self, samples, sample_rate):
+        self.played.append((len(samples), sample_rate))
+
+    def stop(self):
+        pass
+
+
+class PygameSink:
+    """Plays buffers through the pygame mixer"""
+
+    name = "pygame"
+
+    def __init__(self, sample_rate=SAMPLE_RATE):
+        import pygame
+        self.pygame = pygame
+        if not pygame.mixer.get_init():
+            pygame.mixer.init(frequency=sample_rate, size=-16, channels=1)
+        self.mixer_rate, _, self.channels = pygame.mixer.get_init()
+        self.sounds = {}
+        self.channel = None
+
+    def _sound(self, samples, sample_rate):
+        key = (id(samples), sample_rate)
+        entry = self.sounds.get(key)
+        if entry is None or entry[0] is not samples:
+            data = samples
+            if self.mixer_rate != sample_rate:
+                # The mixer was initialised elsewhere at another rate; resample once
+                n = int(len(samples) * self.mixer_rate / sample_rate)
+                data = np.interp(np.linspace(0, len(samples) - 1, n), np.arange(len(samples)),
+                                 samples).astype(np.int16)
+            if self.channels > 1:
+                data = np.repeat(data[:, None], self.channels, axis=1)
+            entry = self.sounds[key] = (samples, self.pygame.sndarray.make_sound(np.ascontiguousarray(data)))
+        return entry[1]
+
+    def play(self, samples, sample_rate):
+        sound = self._sound(samples, sample_rate)
+        self.channel = sound.play()
+        # Runs on the alarm thread, so waiting here only delays the next alarm
+        self.pygame.time.wait(int(sound.get_length() * 1000))
+
+    def stop(self):
+        if self.channel is not None:
+            self.channel.stop()
+
+
+class WinsoundSink:
+    """Plays in-memory WAVs with winsound on Windows"""
+
+    name = "winsound"
+
+    def __init__(self, tones):
+        import winsound
+        self.winsound = winsound
+        self.tones = tones
+        self.wavs = {}
+
+    def play(self, samples, sample_rate):
+        entry = self.wavs.get(id(samples))
+        if entry is None or entry[0] is not samples:
+            entry = self.wavs[id(samples)] = (samples, self.tones.wav_bytes(samples))
+        self.winsound.PlaySound(entry[1], self.winsound.SND_MEMORY)
+
+    def stop(self):
+        self.winsound.PlaySound(None, 0)
+
+
+class SystemPlayerSink:
+    """Writes each buffer to a cached WAV once and plays it with afplay/aplay"""
+
+    name = "system"
+
+    def __init__(self, tones, player):
+        self.tones = tones
+        self.player = player
+        self.directory = tempfile.mkdtemp(prefix="ws_alarm_")
+        self.files = {}
+        self.process = None
+
+    def play(self, samples, sample_rate):
+        entry = self.files.get(id(samples))
+        if entry is None or entry[0] is not samples:
+            path = os.path.join(self.directory, f"tone_{len(self.files)}.wav")
+            with open(path, "wb") as f:
+                f.write(self.tones.wav_bytes(samples))
+            entry = self.files[id(samples)] = (samples, path)
+        cmd = [self.player, "-q", entry[1]] if os.path.basename(self.player) == "aplay" else [self.player, entry[1]]
+        self.process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.process.wait()
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+
+
+def default_sink(tones):
+    """Pick the first available output: winsound, pygame, afplay/aplay, else NullSink"""
+    if sys.platform.startswith("win"):
+        try:
+            return WinsoundSink(tones)
+        except Exception:
+            pass
+    try:
+        return PygameSink(tones.sample_rate)
+    except Exception:
+        pass
+    for player in ("afplay", "aplay", "paplay"):
+        path = shutil.which(player)
+        if path:
+            return SystemPlayerSink(tones, path)
+    print("⚠️ No audio output available; alarms will be silent")
+    return NullSink()
+
+
+class AlarmService:
+    """Asynchronous alarm player
+
+    play() returns immediately; the pattern is rendered from the tone cache
+    and played on a daemon thread. While an alarm is sounding, further
+    requests are coalesced (at most one is kept pending) so a burst of
+    alerts cannot build up minutes of queued beeping.
+    """
+
+    def __init__(self, sink=None, sample_rate=SAMPLE_RATE):
+        self.tones = ToneCache(sample_rate)
+        self.sink = sink if sink is not None else default_sink(self.tones)
+        self.requests = queue.Queue(maxsize=1)
+        self.playing = threading.Event()
+        self.played = 0
+        self.coalesced = 0
+        self.is_running = True
+        self.thread = threading.Thread(target=self._run, name="alarm")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def play(self, freq=2000, duration_ms=800, pattern="beep", repeat=1, gap_ms=150):
+        """Queue an alarm without blocking; returns False if it was coalesced"""
+        samples = self.tones.pattern(pattern, freq, duration_ms, repeat, gap_ms)
+        try:
+            self.requests.put_nowait(samples)
+            return True
+        except queue.Full:
+            self.coalesced += 1
+            return False
+
+    def _run(self):
+        while self.is_running:
+            try:
+                samples = self.requests.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if samples is None:
+                break
+            self.playing.set()
+            try:
+                self.sink.play(samples, self.tones.sample_rate)
+                self.played += 1
+            except Exception as e:
+                print(f"❌ Error playing alarm: {str(e)}")
+            finally:
+                self.playing.clear()
+
+    def is_playing(self):
+        return self.playing.is_set()
+
+    def stop(self):
+        """Drop any pending alarm and cut the current one short"""
+        try:
+            self.requests.get_nowait()
+        except queue.Empty:
+            pass
+        self.sink.stop()
+
+    def close(self):
+        self.stop()
+        self.is_running = False
+        try:
+            self.requests.put_nowait(None)
+        except queue.Full:
+            pass
+        self.thread.join(1.0)
+
+
+_alarm_service = None
+_alarm_lock = threading.Lock()
+
+
+def get_alarm_service(sink=None):
+    """Process-wide AlarmService; sink is only used when it is first created"""
+    global _alarm_service
+    with _alarm_lock:
+        if _alarm_service is None:
+            _alarm_service = AlarmService(sink)
+        return _alarm_service
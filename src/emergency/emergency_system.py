@@ -3,13 +3,41 @@ Emergency response system for the Women Safety Application
 Handles emergency calls, messaging, and alert systems
 """
 
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import time
+from collections import deque
+
+from utils.config import get_config_manager
+from emergency.help_locations import load_index, describe
+
 class EmergencySystem:
     """Emergency response system for handling critical situations"""
     
-    def __init__(self):
+    def __init__(self, help_index=None, max_alerts=100):
         self.contacts = []
         self.location_service = None
         self.alert_system = None
+        # Only the most recent alerts are kept; the fleet aggregator runs for days
+        self.alerts = deque(maxlen=max_alerts)
+        self.alerts_handled = 0
+        self.config = get_config_manager().current.emergency
+        # Built (or loaded from its disk cache) once here so alerts never wait on it
+        self.help_index = help_index if help_index is not None else self._load_help_index()
+    
+    def _load_help_index(self):
+        path = self.config.help_locations
+        if not path:
+            return None
+        if not os.path.exists(path):
+            print(f"⚠️ Help locations file not found: {path}")
+            return None
+        start = time.perf_counter()
+        index = load_index(path, self.config.cache_dir or None)
+        print(f"🗺️ Loaded {len(index)} help locations in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return index
         
     def add_contact(self, name, phone, relationship):
         """Add an emergency contact"""
@@ -33,11 +61,34 @@ class EmergencySystem:
         # TODO: Implement contact notification
         return True
     
-    def share_location(self):
-        """Share current location with emergency services"""
-        print("📍 Sharing location with emergency services...")
-        # TODO: Implement location sharing
+    def handle_alert(self, alert):
+        """Respond to an alert raised by a node or the fleet aggregator"""
+        self.alerts.append(alert)
+        self.alerts_handled += 1
+        print(f"🚨 Handling alert: {alert.get('id', self.alerts_handled)}")
+        self.notify_contacts()
+        self.share_location()
         return True
+    
+    def share_location(self, latitude=None, longitude=None):
+        """Share current location (default: this node's configured position) with the nearest help
+        
+        Returns the payload: the location, the nearest places overall and the
+        closest place of each kind (police, hospital, ...). Nothing is sent
+        from here; callers deliver the returned payload themselves.
+        """
+        latitude = self.config.latitude if latitude is None else latitude
+        longitude = self.config.longitude if longitude is None else longitude
+        payload = {"location": {"lat": latitude, "lon": longitude}, "nearest_help": [], "nearest_by_kind": {}}
+        if self.help_index is not None:
+            payload["nearest_help"] = describe(
+                self.help_index.nearest(latitude, longitude, self.config.nearest_count))
+            for kind in self.help_index.kinds():
+                payload["nearest_by_kind"][kind] = describe(self.help_index.nearest(latitude, longitude, 1, kind))
+        print("📍 Sharing location with emergency services...")
+        for place in payload["nearest_help"]:
+            print(f"   {place['kind']:<10} {place['name']} ({place['distance_m']} m)")
+        return payload
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,314 @@
+"""
+Nearest-help lookup for the Women Safety Application
+Police stations, hospitals and safe zones loaded from a local CSV/GeoJSON
+file, indexed once with a KD-tree over unit-sphere coordinates and cached
+on disk (as plain JSON arrays) so emergency payloads never wait on the network
+"""
+
+import os
+import csv
+import json
+import math
+import heapq
+from dataclasses import dataclass, astuple, asdict
+
+EARTH_RADIUS_M = 6371008.8
+CACHE_VERSION = 2
+
+LAT_COLUMNS = ("lat", "latitude", "y")
+LON_COLUMNS = ("lon", "lng", "long", "longitude", "x")
+KIND_COLUMNS = ("kind", "type", "category", "amenity")
+
+
+@dataclass(frozen=True)
+class HelpLocation:
+    """A place that can help: police, hospital, safe_zone, ..."""
+    name: str
+    kind: str
+    lat: float
+    lon: float
+    phone: str = ""
+    address: str = ""
+
+
+def _first(row, names, default=None):
+    for name in names:
+        value = row.get(name)
+        if value not in (None, ""):
+            return value
+    return default
+
+
+def _location(props, lat, lon):
+    props = {str(k).lower(): v for k, v in props.items()}
+    return HelpLocation(
+        name=str(_first(props, ("name", "title"), "")),
+        kind=str(_first(props, KIND_COLUMNS, "help")).lower(),
+        lat=float(lat),
+        lon=float(lon),
+        phone=str(_first(props, ("phone", "telephone", "contact"), "")),
+        address=str(_first(props, ("address", "addr"), "")),
+    )
+
+
+def load_locations(path):
+    """Read HelpLocations from a CSV (lat/lon columns) or GeoJSON (Point features) file"""
+    locations = []
+    if path.lower().endswith((".geojson", ".json")):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for feature in data.get("features", []):
+            geometry = feature.get("geometry") or {}
+            if geometry.get("type") != "Point":
+                continue
+            lon, lat = geometry["coordinates"][:2]
+            locations.append(_location(feature.get("properties") or {}, lat, lon))
+        return locations
+
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            row = {str(k).strip().lower(): v for k, v in row.items() if k is not None}
+            lat, lon = _first(row, LAT_COLUMNS), _first(row, LON_COLUMNS)
+            if lat is None or lon is None:
+                continue
+            locations.append(_location(row, lat, lon))
+    return locations
+
+
+def _unit_vector(lat, lon):
+    phi, lam = math.radians(lat), math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def chord_to_meters(chord):
+    return 2.0 * EARTH_RADIUS_M * math.asin(min(1.0, chord / 2.0))
+
+
+def meters_to_chord(meters):
+    return 2.0 * math.sin(min(math.pi, meters / EARTH_RADIUS_M) / 2.0)
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in meters"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2.0 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+class KDTree:
+    """Static 3-D KD-tree stored as flat lists in implicit (median) order
+
+    Points are unit vectors, so Euclidean chord distance orders results
+    exactly like great-circle distance, with no special cases at the poles
+    or the antimeridian.
+    """
+
+    def __init__(self, points, ids):
+        order = list(range(len(points)))
+        self.xyz = [None] * len(points)
+        self.ids = [None] * len(points)
+        self.axes = [0] * len(points)
+        self._build(points, ids, order, 0, len(order))
+
+    def _build(self, points, ids, order, lo, hi):
+        # Iterative to stay clear of the recursion limit on large datasets
+        columns = [[p[a] for p in points] for a in range(3)]
+        stack = [(lo, hi)]
+        while stack:
+            lo, hi = stack.pop()
+            if hi - lo <= 0:
+                continue
+            segment = order[lo:hi]
+            # Split on the axis with the widest spread
+            axis, widest = 0, -1.0
+            for a, column in enumerate(columns):
+                values = [column[i] for i in segment]
+                spread = max(values) - min(values)
+                if spread > widest:
+                    axis, widest = a, spread
+            segment.sort(key=columns[axis].__getitem__)
+            order[lo:hi] = segment
+            mid = (lo + hi) // 2
+            self.xyz[mid] = points[order[mid]]
+            self.ids[mid] = ids[order[mid]]
+            self.axes[mid] = axis
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def to_dict(self):
+        return {"xyz": [c for p in self.xyz for c in p], "ids": self.ids, "axes": self.axes}
+
+    @classmethod
+    def from_dict(cls, data):
+        tree = cls.__new__(cls)
+        flat = [float(c) for c in data["xyz"]]
+        tree.xyz = list(zip(flat[0::3], flat[1::3], flat[2::3]))
+        tree.ids = [int(i) for i in data["ids"]]
+        tree.axes = [int(a) for a in data["axes"]]
+        if not len(tree.xyz) == len(tree.ids) == len(tree.axes):
+            raise ValueError("KD-tree arrays differ in length")
+        return tree
+
+    def nearest(self, q, k):
+        """Return [(chord^2, id)] for the k closest points, closest first"""
+        best = []  # max-heap via negated distances
+        qx, qy, qz = q
+        xyz, axes, ids = self.xyz, self.axes, self.ids
+        # (lo, hi, lower bound on chord^2 to anything in the range)
+        stack = [(0, len(ids), 0.0)]
+        while stack:
+            lo, hi, bound = stack.pop()
+            if hi <= lo or (len(best) == k and bound >= -best[0][0]):
+                continue
+            mid = (lo + hi) // 2
+            px, py, pz = xyz[mid]
+            d2 = (px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2
+            if len(best) < k:
+                heapq.heappush(best, (-d2, ids[mid]))
+            elif d2 < -best[0][0]:
+                heapq.heapreplace(best, (-d2, ids[mid]))
+            axis = axes[mid]
+            diff = q[axis] - xyz[mid][axis]
+            # Visit the near side first (pushed last); the far side is pruned when popped
+            if diff < 0:
+                stack.append((mid + 1, hi, max(bound, diff * diff)))
+                stack.append((lo, mid, bound))
+            else:
+                stack.append((lo, mid, max(bound, diff * diff)))
+                stack.append((mid + 1, hi, bound))
+        return sorted((-d, i) for d, i in best)
+
+    def within(self, q, chord):
+        """Return [(chord^2, id)] for all points within chord distance, closest first"""
+        found = []
+        r2 = chord * chord
+        qx, qy, qz = q
+        xyz, axes, ids = self.xyz, self.axes, self.ids
+        stack = [(0, len(ids))]
+        while stack:
+            lo, hi = stack.pop()
+            if hi <= lo:
+                continue
+            mid = (lo + hi) // 2
+            px, py, pz = xyz[mid]
+            d2 = (px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2
+            if d2 <= r2:
+                found.append((d2, ids[mid]))
+            diff = q[axes[mid]] - xyz[mid][axes[mid]]
+            if diff < 0 or diff * diff <= r2:
+                stack.append((lo, mid))
+            if diff >= 0 or diff * diff <= r2:
+                stack.append((mid + 1, hi))
+        found.sort()
+        return found
+
+
+class HelpIndex:
+    """k-nearest and radius queries over HelpLocations, optionally per kind"""
+
+    def __init__(self, locations):
+        self.locations = list(locations)
+        points = [_unit_vector(loc.lat, loc.lon) for loc in self.locations]
+        self.trees = {None: KDTree(points, list(range(len(points))))}
+        by_kind = {}
+        for i, loc in enumerate(self.locations):
+            by_kind.setdefault(loc.kind, []).append(i)
+        if len(by_kind) > 1:
+            for kind, ids in by_kind.items():
+                self.trees[kind] = KDTree([points[i] for i in ids], ids)
+
+    def __len__(self):
+        return len(self.locations)
+
+    def to_dict(self):
+        return {"locations": [astuple(loc) for loc in self.locations],
+                "trees": [[kind, tree.to_dict()] for kind, tree in self.trees.items()]}
+
+    @classmethod
+    def from_dict(cls, data):
+        index = cls.__new__(cls)
+        index.locations = [HelpLocation(str(name), str(kind), float(lat), float(lon), str(phone), str(address))
+                           for name, kind, lat, lon, phone, address in data["locations"]]
+        index.trees = {kind: KDTree.from_dict(tree) for kind, tree in data["trees"]}
+        if None not in index.trees or any(i >= len(index.locations) for t in index.trees.values() for i in t.ids):
+            raise ValueError("help index cache does not match its locations")
+        return index
+
+    def kinds(self):
+        return sorted(k for k in self.trees if k is not None) or sorted({loc.kind for loc in self.locations})
+
+    def _tree(self, kind):
+        if kind is not None and len(self.trees) == 1:
+            # Single-kind dataset: the main tree already is the per-kind tree
+            return self.trees[None] if self.locations and self.locations[0].kind == kind else None
+        return self.trees.get(kind)
+
+    def _results(self, matches):
+        return [(self.locations[i], chord_to_meters(math.sqrt(d2))) for d2, i in matches]
+
+    def nearest(self, lat, lon, k=3, kind=None):
+        """Return [(HelpLocation, meters)] for the k closest places (of `kind`, if given)"""
+        tree = self._tree(kind)
+        if tree is None or k <= 0:
+            return []
+        return self._results(tree.nearest(_unit_vector(lat, lon), k))
+
+    def within(self, lat, lon, radius_m, kind=None):
+        """Return [(HelpLocation, meters)] for every place within radius_m, closest first"""
+        tree = self._tree(kind)
+        if tree is None:
+            return []
+        return self._results(tree.within(_unit_vector(lat, lon), meters_to_chord(radius_m)))
+
+
+def linear_nearest(locations, lat, lon, k=3, kind=None):
+    """Reference linear scan with haversine distances (used by the benchmark)"""
+    candidates = ((haversine_m(lat, lon, loc.lat, loc.lon), i) for i, loc in enumerate(locations)
+                  if kind is None or loc.kind == kind)
+    return [(locations[i], d) for d, i in heapq.nsmallest(k, candidates)]
+
+
+def _source_signature(path):
+    stat = os.stat(path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def load_index(path, cache_dir=None):
+    """Build (or load from the on-disk cache) the HelpIndex for a dataset file
+
+    The cache is keyed by the source file's path, size and mtime, so editing
+    the dataset rebuilds it automatically. It holds only JSON arrays (never
+    pickles), so a writable dataset directory cannot inject code.
+    """
+    cache_dir = cache_dir or os.path.dirname(os.path.abspath(path))
+    cache_path = os.path.join(cache_dir, os.path.basename(path) + ".index.json")
+    signature = _source_signature(path)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("version") == CACHE_VERSION and cached.get("source") == signature:
+            return HelpIndex.from_dict(cached["index"])
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        pass
+
+    index = HelpIndex(load_locations(path))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": CACHE_VERSION, "source": signature, "index": index.to_dict()}, f,
+                      separators=(",", ":"))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not cache help index: {str(e)}")
+    return index
+
+
+def describe(results):
+    """JSON-ready list for emergency payloads"""
+    return [dict(asdict(loc), distance_m=round(meters)) for loc, meters in results]
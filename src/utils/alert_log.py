@@ -0,0 +1,221 @@
+"""
+Buffered, rotating JSONL alert log for the Women Safety Application
+Keeps a sidecar offset index so time-range queries can seek directly
+"""
+
+import os
+import json
+import time
+import struct
+import bisect
+import threading
+
+# Sidecar index entry: record timestamp, byte offset in the .jsonl file
+INDEX_ENTRY = struct.Struct("<dQ")
+
+# Pre-JSONL history (one JSON object per line, "%Y-%m-%d %H:%M:%S" timestamps)
+LEGACY_LOG = "alerts_log.json"
+LEGACY_PART = "legacy"
+
+
+class AlertLog:
+    """JSONL alert writer with buffered writes, rotation and a time index"""
+
+    def __init__(self, directory="snapshots", prefix="alerts", max_bytes=8 * 1024 * 1024,
+                 flush_interval=1.0, flush_records=64):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval
+        self.flush_records = flush_records
+        os.makedirs(self.directory, exist_ok=True)
+        self._import_legacy()
+
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.last_flush = time.time()
+        self.log_file = None
+        self.index_file = None
+        self.current_day = None
+        self.current_path = None
+        self.offset = 0
+
+        self.is_running = True
+        self.flush_thread = threading.Thread(target=self._flush_loop, name="alert-log-flush")
+        self.flush_thread.daemon = True
+        self.flush_thread.start()
+
+    def _path_for(self, day, part):
+        suffix = "" if part == 0 else f".{part}"
+        return os.path.join(self.directory, f"{self.prefix}_{day}{suffix}.jsonl")
+
+    def _import_legacy(self):
+        """Index the old alerts_log.json once so query() keeps returning its history
+
+        Records go to per-day `<prefix>_<day>.legacy.jsonl` files, which sort
+        before that day's regular files; the old file is renamed to
+        alerts_log.json.imported afterwards.
+        """
+        legacy_path = os.path.join(self.directory, LEGACY_LOG)
+        if not os.path.exists(legacy_path):
+            return
+        fallback = os.path.getmtime(legacy_path)
+        by_day = {}
+        skipped = 0
+        with open(legacy_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    metadata = json.loads(line)
+                except ValueError:
+                    skipped += 1
+                    continue
+                try:
+                    timestamp = time.mktime(time.strptime(str(metadata.get("timestamp")), "%Y-%m-%d %H:%M:%S"))
+                except (ValueError, AttributeError):
+                    timestamp = fallback
+                day = time.strftime("%Y%m%d", time.localtime(timestamp))
+                by_day.setdefault(day, []).append((timestamp, line.encode("utf-8") + b"\n"))
+
+        for day, records in by_day.items():
+            records.sort(key=lambda record: record[0])
+            path = os.path.join(self.directory, f"{self.prefix}_{day}.{LEGACY_PART}.jsonl")
+            with open(path, "ab") as log_file, open(path + ".idx", "ab") as index_file:
+                offset = log_file.tell()
+                for timestamp, line in records:
+                    log_file.write(line)
+                    index_file.write(INDEX_ENTRY.pack(timestamp, offset))
+                    offset += len(line)
+        os.replace(legacy_path, legacy_path + ".imported")
+        imported = sum(len(records) for records in by_day.values())
+        print(f"📥 Imported {imported} alerts from {LEGACY_LOG}" + (f" ({skipped} unreadable lines)" if skipped else ""))
+
+    def _open(self, day):
+        """Open the newest file for the day, starting a new part when it is full"""
+        if self.log_file is not None:
+            self.log_file.close()
+            self.index_file.close()
+
+        part = 0
+        while os.path.exists(self._path_for(day, part + 1)):
+            part += 1
+        path = self._path_for(day, part)
+        if os.path.exists(path) and os.path.getsize(path) >= self.max_bytes:
+            part += 1
+            path = self._path_for(day, part)
+
+        self.log_file = open(path, "ab")
+        self.index_file = open(path + ".idx", "ab")
+        self.offset = self.log_file.tell()
+        self.current_day = day
+        self.current_path = path
+
+    def write(self, metadata, timestamp=None):
+        """Buffer one alert; flushes when the size or time threshold is hit"""
+        if timestamp is None:
+            timestamp = time.time()
+        line = (json.dumps(metadata, separators=(",", ":")) + "\n").encode("utf-8")
+        with self.lock:
+            self.buffer.append((timestamp, line))
+            if (len(self.buffer) >= self.flush_records
+                    or time.time() - self.last_flush >= self.flush_interval):
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self.buffer:
+            self.last_flush = time.time()
+            return
+
+        for timestamp, line in self.buffer:
+            day = time.strftime("%Y%m%d", time.localtime(timestamp))
+            if self.log_file is None or day != self.current_day:
+                self._flush_files()
+                self._open(day)
+            elif self.offset >= self.max_bytes:
+                self._flush_files()
+                self._open(day)
+            self.log_file.write(line)
+            self.index_file.write(INDEX_ENTRY.pack(timestamp, self.offset))
+            self.offset += len(line)
+
+        self.buffer = []
+        self._flush_files()
+        self.last_flush = time.time()
+
+    def _flush_files(self):
+        if self.log_file is not None:
+            self.log_file.flush()
+            self.index_file.flush()
+
+    def flush(self):
+        """Write all buffered alerts to disk"""
+        with self.lock:
+            self._flush_locked()
+
+    def _flush_loop(self):
+        while self.is_running:
+            time.sleep(self.flush_interval)
+            with self.lock:
+                if self.buffer and time.time() - self.last_flush >= self.flush_interval:
+                    self._flush_locked()
+
+    def _log_files(self):
+        """List log files ordered by day, then by rotation part"""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.startswith(self.prefix + "_") and name.endswith(".jsonl"):
+                stem = name[len(self.prefix) + 1:-len(".jsonl")]
+                day, _, part = stem.partition(".")
+                part = -1 if part == LEGACY_PART else int(part or 0)
+                files.append((day, part, os.path.join(self.directory, name)))
+        return [path for _, _, path in sorted(files)]
+
+    def _read_index(self, path):
+        index_path = path + ".idx"
+        if not os.path.exists(index_path):
+            return [], []
+        with open(index_path, "rb") as f:
+            raw = f.read()
+        usable = len(raw) - len(raw) % INDEX_ENTRY.size
+        times, offsets = [], []
+        for timestamp, offset in INDEX_ENTRY.iter_unpack(raw[:usable]):
+            times.append(timestamp)
+            offsets.append(offset)
+        return times, offsets
+
+    def query(self, start=None, end=None):
+        """Return alerts logged with start <= timestamp <= end, oldest first"""
+        self.flush()
+        start = float("-inf") if start is None else start
+        end = float("inf") if end is None else end
+
+        results = []
+        for path in self._log_files():
+            times, offsets = self._read_index(path)
+            if not times or times[-1] < start or times[0] > end:
+                continue
+            lo = bisect.bisect_left(times, start)
+            hi = bisect.bisect_right(times, end)
+            if lo >= hi:
+                continue
+            with open(path, "rb") as f:
+                f.seek(offsets[lo])
+                for _ in range(hi - lo):
+                    line = f.readline()
+                    if not line:
+                        break
+                    results.append(json.loads(line))
+        return results
+
+    def close(self):
+        """Flush pending alerts and close the open files"""
+        self.is_running = False
+        with self.lock:
+            self._flush_locked()
+            if self.log_file is not None:
+                self.log_file.close()
+                self.index_file.close()
+                self.log_file = None
+                self.index_file = None
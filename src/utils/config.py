@@ -0,0 +1,317 @@
+"""
+Typed configuration for the Women Safety Application
+Parsed once into immutable objects and hot-reloaded when the file changes
+"""
+
+import os
+import json
+import time
+import threading
+from dataclasses import dataclass, field, fields, replace
+
+DEFAULT_CONFIG_PATH = os.environ.get("WOMEN_SAFETY_CONFIG", "config.json")
+
+
+@dataclass(frozen=True)
+class VisionConfig:
+    """Detection thresholds for the crowd detector loop"""
+    th_crowd: int = 5
+    th_motion: float = 5000.0
+    th_audio: float = 0.06
+    person_conf: float = 0.3
+
+
+@dataclass(frozen=True)
+class DisplayConfig:
+    """Live view settings (read at startup); headless skips annotation and windows"""
+    headless: bool = False
+    max_fps: float = 15.0
+
+
+@dataclass(frozen=True)
+class CameraConfig:
+    """Camera discovery settings (read at startup); candidates are device indices in preference order"""
+    candidates: str = "1,2,3,4,5,0"
+    probe_timeout: float = 3.0
+    width: int = 640
+    height: int = 480
+    cache_path: str = "cache/camera.json"
+
+
+@dataclass(frozen=True)
+class AlertConfig:
+    """Alert cooldown, alarm tone and UDP broadcast settings"""
+    wait: float = 60.0
+    alert_hz: int = 2000
+    alert_time: int = 800
+    alarm_pattern: str = "beep"
+    alarm_repeat: int = 1
+    alarm_sink: str = "auto"
+    udp_host: str = "<broadcast>"
+    udp_port: int = 5005
+
+
+@dataclass(frozen=True)
+class EvidenceConfig:
+    """Snapshot and pre-roll clip settings (read at startup)"""
+    log_dir: str = "snapshots"
+    snapshots: bool = False
+    snapshot_quality: int = 85
+    snapshot_max_width: int = 0
+    preroll_clips: bool = False
+    preroll_before: float = 10.0
+    preroll_after: float = 5.0
+
+
+@dataclass(frozen=True)
+class EvidenceStoreConfig:
+    """Append-only evidence store (read at startup); empty directory means evidence/ at the project root, empty key stores plaintext"""
+    directory: str = ""
+    compress: bool = True
+    key: str = ""
+
+
+@dataclass(frozen=True)
+class AudioConfig:
+    """Speech emotion chunking and confidence settings"""
+    sample_rate: int = 16000
+    chunk_duration: float = 3.0
+    overlap: float = 1.0
+    threshold: float = 0.3
+    heads_dir: str = "models/audio_heads"
+
+
+@dataclass(frozen=True)
+class ApiConfig:
+    """Safety status API server settings (read at startup); relay_port carries audio state from other processes"""
+    enabled: bool = True
+    host: str = "127.0.0.1"
+    port: int = 8000
+    relay_port: int = 8001
+
+
+@dataclass(frozen=True)
+class MetricsConfig:
+    """Metrics export settings (read at startup); http_port 0 disables the standalone endpoint"""
+    json_dir: str = "metrics"
+    json_interval: float = 30.0
+    http_port: int = 0
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    """Cascade gates: cheap signals decide when YOLO/Whisper run; max_interval bounds staleness"""
+    enabled: bool = True
+    motion_gate: float = 0.3
+    audio_gate: float = 0.01
+    people_max_interval: float = 1.0
+    emotion_max_interval: float = 15.0
+    hold: float = 3.0
+
+
+@dataclass(frozen=True)
+class FleetConfig:
+    """Node identity and fleet aggregator settings (read at startup); key is a shared Fernet key"""
+    key: str = ""
+    node_id: str = ""
+    zone: str = ""
+    heartbeat_interval: float = 10.0
+    listen_host: str = "0.0.0.0"
+    listen_port: int = 5005
+    dedup_window: float = 10.0
+    node_timeout: float = 30.0
+    max_token_age: int = 0
+
+
+@dataclass(frozen=True)
+class EmergencyConfig:
+    """Node position and the local help-location dataset (read at startup)"""
+    help_locations: str = ""
+    cache_dir: str = ""
+    latitude: float = 0.0
+    longitude: float = 0.0
+    nearest_count: int = 3
+
+
+@dataclass(frozen=True)
+class ResourcesConfig:
+    """CPU thread budget per component (read at startup); preset is auto, off, 4, 8 or 16 cores"""
+    preset: str = "off"
+    vision_threads: int = 0
+    audio_threads: int = 0
+    pin_cpus: bool = True
+
+
+@dataclass(frozen=True)
+class SafetyConfig:
+    """Complete application configuration"""
+    vision: VisionConfig = field(default_factory=VisionConfig)
+    display: DisplayConfig = field(default_factory=DisplayConfig)
+    camera: CameraConfig = field(default_factory=CameraConfig)
+    alerts: AlertConfig = field(default_factory=AlertConfig)
+    evidence: EvidenceConfig = field(default_factory=EvidenceConfig)
+    evidence_store: EvidenceStoreConfig = field(default_factory=EvidenceStoreConfig)
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    api: ApiConfig = field(default_factory=ApiConfig)
+    metrics: MetricsConfig = field(default_factory=MetricsConfig)
+    scheduler: SchedulerConfig = field(default_factory=SchedulerConfig)
+    fleet: FleetConfig = field(default_factory=FleetConfig)
+    emergency: EmergencyConfig = field(default_factory=EmergencyConfig)
+    resources: ResourcesConfig = field(default_factory=ResourcesConfig)
+
+
+def _coerce(value, target_type, name):
+    """Convert a JSON value to the declared field type"""
+    if target_type is bool:
+        if isinstance(value, bool):
+            return value
+        if isinstance(value, str) and value.lower() in ("true", "false", "1", "0", "yes", "no"):
+            return value.lower() in ("true", "1", "yes")
+        raise ValueError(f"{name}: expected a boolean, got {value!r}")
+    if target_type is int:
+        if isinstance(value, bool) or float(value) != int(float(value)):
+            raise ValueError(f"{name}: expected an integer, got {value!r}")
+        return int(float(value))
+    if target_type is float:
+        if isinstance(value, bool):
+            raise ValueError(f"{name}: expected a number, got {value!r}")
+        return float(value)
+    if target_type is str:
+        return str(value)
+    return value
+
+
+def _parse_section(section_cls, raw, name):
+    if raw is None:
+        return section_cls()
+    if not isinstance(raw, dict):
+        raise ValueError(f"{name}: expected an object")
+    known = {f.name: f for f in fields(section_cls)}
+    values = {}
+    for key, value in raw.items():
+        if key not in known:
+            print(f"⚠️ Unknown config key ignored: {name}.{key}")
+            continue
+        values[key] = _coerce(value, known[key].type, f"{name}.{key}")
+    return section_cls(**values)
+
+
+def parse_config(raw):
+    """Build a SafetyConfig from a decoded JSON dict, raising ValueError on bad values"""
+    if not isinstance(raw, dict):
+        raise ValueError("config root must be an object")
+    sections = {}
+    for f in fields(SafetyConfig):
+        sections[f.name] = _parse_section(f.default_factory, raw.get(f.name), f.name)
+    config = SafetyConfig(**sections)
+    if config.audio.overlap >= config.audio.chunk_duration:
+        raise ValueError("audio.overlap must be smaller than audio.chunk_duration")
+    if config.resources.preset not in ("auto", "off", "4", "8", "16"):
+        raise ValueError("resources.preset must be one of auto, off, 4, 8, 16")
+    try:
+        [int(part) for part in config.camera.candidates.split(",") if part.strip()]
+    except ValueError:
+        raise ValueError("camera.candidates must be comma-separated device indices")
+    if config.alerts.alarm_pattern not in ("beep", "repeat", "siren"):
+        raise ValueError("alerts.alarm_pattern must be one of beep, repeat, siren")
+    return config
+
+
+class ConfigManager:
+    """Holds the current SafetyConfig and reloads it when the file's mtime changes
+
+    Readers take `manager.current`, a plain attribute read of an immutable object,
+    so hot loops never lock or touch the filesystem.
+    """
+
+    def __init__(self, path=DEFAULT_CONFIG_PATH):
+        self.path = path
+        self.mtime = None
+        self.current = SafetyConfig()
+        self.callbacks = []
+        self.lock = threading.Lock()
+        self.watch_thread = None
+        self.is_watching = False
+        self.reload()
+
+    def _file_mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def reload(self):
+        """Re-read the file; a bad file keeps the previous config. Returns True on change"""
+        with self.lock:
+            mtime = self._file_mtime()
+            if mtime is None:
+                self.mtime = None
+                return False
+            try:
+                with open(self.path, "r") as f:
+                    new_config = parse_config(json.load(f))
+            except (OSError, ValueError, TypeError) as e:
+                print(f"❌ Config reload failed, keeping previous values: {str(e)}")
+                self.mtime = mtime
+                return False
+            self.mtime = mtime
+            old_config = self.current
+            if new_config == old_config:
+                return False
+            self.current = new_config
+
+        for callback in list(self.callbacks):
+            try:
+                callback(old_config, new_config)
+            except Exception as e:
+                print(f"❌ Error in config change callback: {str(e)}")
+        return True
+
+    def on_change(self, callback):
+        """Register callback(old_config, new_config) for reloads"""
+        self.callbacks.append(callback)
+
+    def update(self, **sections):
+        """Override sections in memory, e.g. update(vision=replace(cfg.vision, th_crowd=3))"""
+        with self.lock:
+            self.current = replace(self.current, **sections)
+
+    def start_watching(self, interval=2.0):
+        """Poll the file's mtime in a daemon thread and reload on change"""
+        if self.is_watching:
+            return
+        self.is_watching = True
+
+        def watch():
+            while self.is_watching:
+                time.sleep(interval)
+                if self._file_mtime() != self.mtime:
+                    if self.reload():
+                        print(f"🔄 Configuration reloaded from {self.path}")
+
+        self.watch_thread = threading.Thread(target=watch, name="config-watcher")
+        self.watch_thread.daemon = True
+        self.watch_thread.start()
+
+    def stop_watching(self):
+        self.is_watching = False
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_config_manager(path=None, watch=True):
+    """Return the shared ConfigManager, creating (and watching) it on first use"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = ConfigManager(path or DEFAULT_CONFIG_PATH)
+            if watch:
+                _manager.start_watching()
+        return _manager
+
+
+def get_config():
+    """Return the current SafetyConfig snapshot"""
+    return get_config_manager().current
@@ -0,0 +1,131 @@
+"""
+Compact binary log of timestamped sensor events for the Women Safety Application
+Written by the vision and audio loops, read back by core/replay.py
+"""
+
+import os
+import sys
+import time
+import heapq
+import struct
+import threading
+
+MAGIC = b"WSEV\x01"
+RECORD_HEADER = struct.Struct("<dBB")  # timestamp, kind, payload length
+RECORD_ENV = "WS_RECORD"
+RECORD_DIR_ENV = "WS_RECORD_DIR"
+
+# Values are raw detector outputs (people count, raised-hands fraction, motion
+# score, peak amplitude, (label, confidence)) so replays can retune thresholds
+
+PEOPLE, POSE, MOTION, AUDIO, EMOTION, FRAME, ALERT = range(1, 8)
+KIND_NAMES = {PEOPLE: "people", POSE: "pose", MOTION: "motion", AUDIO: "audio",
+              EMOTION: "emotion", FRAME: "frame", ALERT: "alert"}
+
+_U16 = struct.Struct("<H")
+_F32 = struct.Struct("<f")
+
+
+def encode(kind, value):
+    """Payload bytes for an event value"""
+    if kind == PEOPLE:
+        return _U16.pack(min(int(value), 0xFFFF))
+    if kind in (POSE, MOTION, AUDIO):
+        return _F32.pack(float(value))
+    if kind == EMOTION:
+        label, confidence = value
+        return _F32.pack(float(confidence)) + label.encode("utf-8")[:250]
+    if kind == ALERT:
+        return str(value or "").encode("utf-8")[:250]
+    return b""
+
+
+def decode(kind, payload):
+    """Inverse of encode()"""
+    if kind == PEOPLE:
+        return _U16.unpack(payload)[0]
+    if kind in (POSE, MOTION, AUDIO):
+        return _F32.unpack(payload)[0]
+    if kind == EMOTION:
+        return payload[4:].decode("utf-8"), _F32.unpack_from(payload)[0]
+    if kind == ALERT:
+        return payload.decode("utf-8")
+    return None
+
+
+class EventRecorder:
+    """Appends (timestamp, kind, value) records to a buffered binary file
+
+    Each record is a 10-byte header plus a 0-254 byte payload, so a 30 FPS
+    vision loop logs roughly 1.5 KB/s.
+    """
+
+    def __init__(self, path, buffer_size=64 * 1024):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "wb", buffering=buffer_size)
+        self.file.write(MAGIC)
+        self.count = 0
+
+    def record(self, kind, value=None, timestamp=None):
+        payload = encode(kind, value)
+        header = RECORD_HEADER.pack(time.time() if timestamp is None else timestamp, kind, len(payload))
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(header + payload)
+            self.count += 1
+
+    def flush(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+        print(f"🎞️ Recorded {self.count} events to {self.path}")
+
+
+def read_events(path):
+    """Yield (timestamp, kind, value) from one log; a truncated tail is ignored"""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a Women Safety event log")
+        data = f.read()
+    offset, end = 0, len(data)
+    while offset + RECORD_HEADER.size <= end:
+        timestamp, kind, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + length > end:
+            break
+        yield timestamp, kind, decode(kind, data[offset:offset + length])
+        offset += length
+
+
+def merge_events(paths):
+    """Merge several logs (e.g. vision + audio) into one stream ordered by timestamp"""
+    return heapq.merge(*(read_events(p) for p in paths), key=lambda event: event[0])
+
+
+def recording_requested(argv=None):
+    """True when --record is on the command line or WS_RECORD is set"""
+    argv = sys.argv if argv is None else argv
+    return "--record" in argv or os.environ.get(RECORD_ENV, "") not in ("", "0", "false")
+
+
+def maybe_start_recorder(component, enabled=None):
+    """EventRecorder writing to $WS_RECORD_DIR/<component>_<stamp>.wsev when recording is requested"""
+    if enabled is None:
+        enabled = recording_requested()
+    if not enabled:
+        return None
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    path = os.path.join(os.environ.get(RECORD_DIR_ENV, "recordings"), f"{component}_{stamp}.wsev")
+    print(f"🎞️ Recording sensor events to {path}")
+    return EventRecorder(path)
@@ -0,0 +1,361 @@
+"""
+Append-only evidence store for the Women Safety Application
+Records are written to segment files by a background writer thread
+"""
+
+import os
+import json
+import time
+import zlib
+import queue
+import struct
+import bisect
+import threading
+
+# Record layout: header | event type | payload
+# header = magic, flags, event type length, timestamp, payload length, crc32
+RECORD_MAGIC = b"EV"
+RECORD_HEADER = struct.Struct("<2sBBdII")
+
+FLAG_COMPRESSED = 0x01
+FLAG_ENCRYPTED = 0x02
+
+SEGMENT_PREFIX = "segment_"
+SEGMENT_SUFFIX = ".evd"
+
+
+class EvidenceIntegrityError(Exception):
+    """Raised when a stored record fails its checksum"""
+
+
+def _record_at(data, offset):
+    """Return (end, timestamp, event_type) if an intact record starts at offset, else None"""
+    if offset + RECORD_HEADER.size > len(data):
+        return None
+    magic, _, type_len, timestamp, payload_len, crc = RECORD_HEADER.unpack_from(data, offset)
+    if magic != RECORD_MAGIC:
+        return None
+    type_start = offset + RECORD_HEADER.size
+    payload_start = type_start + type_len
+    end = payload_start + payload_len
+    if end > len(data):
+        return None
+    type_bytes = data[type_start:payload_start]
+    if zlib.crc32(data[payload_start:end], zlib.crc32(type_bytes)) != crc:
+        return None
+    return end, timestamp, bytes(type_bytes).decode("utf-8", "replace")
+
+
+def _next_record(data, offset):
+    """Offset of the next intact record at or after offset, or None"""
+    while True:
+        offset = data.find(RECORD_MAGIC, offset)
+        if offset < 0:
+            return None
+        if _record_at(data, offset) is not None:
+            return offset
+        offset += 1
+
+
+def _insert_sorted(entries, entry):
+    """Append in the common in-order case, otherwise insert in place"""
+    if entries and entry < entries[-1]:
+        bisect.insort(entries, entry)
+    else:
+        entries.append(entry)
+
+
+class EvidenceStore:
+    """Append-only, segmented evidence store with a timestamp/type index"""
+
+    def __init__(self, directory="evidence", segment_size=16 * 1024 * 1024,
+                 compress=True, key=None, queue_size=10000, sync=True):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.compress = compress
+        self.sync = sync
+        self.cipher = None
+        if key is not None:
+            from cryptography.fernet import Fernet
+            self.cipher = Fernet(key)
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Index entries are (timestamp, seq, event_type, segment_id, offset);
+        # type_index holds the same entries split per event type, also sorted
+        self.index = []
+        self.type_index = {}
+        self.index_lock = threading.Lock()
+        self.next_seq = 0
+        self.seq_lock = threading.Lock()
+        self.dropped = 0
+        self.corrupted = 0
+        # (segment_id, start, end) byte ranges that held no intact record on open
+        self.damaged = []
+
+        self.segment_id = 0
+        self.segment_file = None
+        self.segment_offset = 0
+        self._load_index()
+        self._open_segment()
+
+        self.write_queue = queue.Queue(maxsize=queue_size)
+        self.is_running = True
+        self.writer_thread = threading.Thread(target=self._writer_loop, name="evidence-writer")
+        self.writer_thread.daemon = True
+        self.writer_thread.start()
+
+    def _segment_path(self, segment_id):
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment_id:06d}{SEGMENT_SUFFIX}")
+
+    def _list_segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    segments.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+                except ValueError:
+                    continue
+        return sorted(segments)
+
+    def _load_index(self):
+        """Rebuild the in-memory index by scanning (and checksumming) every record
+
+        Damaged bytes are skipped by resyncing to the next intact record and
+        are left on disk. Only a torn tail on the newest segment, the one a
+        crash can interrupt mid-write, is truncated.
+        """
+        segments = self._list_segments()
+        for segment_id in segments:
+            path = self._segment_path(segment_id)
+            with open(path, "rb") as f:
+                data = f.read()
+            view = memoryview(data)
+            offset = valid_end = 0
+            while offset < len(data):
+                record = _record_at(view, offset)
+                if record is None:
+                    resync = _next_record(data, offset + 1)
+                    if resync is None:
+                        break
+                    self.damaged.append((segment_id, offset, resync))
+                    print(f"⚠️ Evidence segment {segment_id}: skipped damaged bytes {offset}-{resync}")
+                    offset = resync
+                    continue
+                end, timestamp, event_type = record
+                entry = (timestamp, self.next_seq, event_type, segment_id, offset)
+                self.index.append(entry)
+                self.type_index.setdefault(event_type, []).append(entry)
+                self.next_seq += 1
+                offset = valid_end = end
+            view.release()
+
+            if valid_end < len(data):
+                if segment_id == segments[-1]:
+                    # Drop a torn record left by a crash mid-write
+                    with open(path, "r+b") as f:
+                        f.truncate(valid_end)
+                else:
+                    self.damaged.append((segment_id, valid_end, len(data)))
+                    print(f"⚠️ Evidence segment {segment_id}: damaged tail {valid_end}-{len(data)} left in place")
+            self.segment_id = segment_id
+
+        self.index.sort()
+        for entries in self.type_index.values():
+            entries.sort()
+
+    def _open_segment(self):
+        path = self._segment_path(self.segment_id)
+        self.segment_file = open(path, "ab")
+        self.segment_offset = self.segment_file.tell()
+        if self.segment_offset >= self.segment_size:
+            self._rotate()
+
+    def _rotate(self):
+        self.segment_file.close()
+        self.segment_id += 1
+        self.segment_file = open(self._segment_path(self.segment_id), "ab")
+        self.segment_offset = 0
+
+    def append(self, data, event_type="evidence", timestamp=None):
+        """Queue a record for writing and return its sequence number immediately
+
+        Returns None when the write queue is full and the record was dropped.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        with self.seq_lock:
+            seq = self.next_seq
+            self.next_seq += 1
+        try:
+            self.write_queue.put_nowait((timestamp, seq, event_type, data))
+        except queue.Full:
+            self.dropped += 1
+            return None
+        return seq
+
+    def _encode(self, data):
+        payload = json.dumps(data, separators=(",", ":")).encode("utf-8")
+        flags = 0
+        if self.compress:
+            payload = zlib.compress(payload, 6)
+            flags |= FLAG_COMPRESSED
+        if self.cipher is not None:
+            payload = self.cipher.encrypt(payload)
+            flags |= FLAG_ENCRYPTED
+        return flags, payload
+
+    def _write_record(self, timestamp, seq, event_type, data):
+        flags, payload = self._encode(data)
+        type_bytes = event_type.encode("utf-8")[:255]
+        crc = zlib.crc32(payload, zlib.crc32(type_bytes))
+        header = RECORD_HEADER.pack(RECORD_MAGIC, flags, len(type_bytes),
+                                    float(timestamp), len(payload), crc)
+
+        if self.segment_offset >= self.segment_size:
+            self._rotate()
+        offset = self.segment_offset
+        try:
+            self.segment_file.write(header + type_bytes + payload)
+        except Exception:
+            # A partial write (ENOSPC, ...) still moved the file position; later
+            # index offsets must follow the bytes actually on disk
+            self.segment_offset = self.segment_file.tell()
+            raise
+        self.segment_offset += len(header) + len(type_bytes) + len(payload)
+        return (float(timestamp), seq, event_type, self.segment_id, offset)
+
+    def _writer_loop(self):
+        """Drain the queue in batches and sync once per batch"""
+        while self.is_running or not self.write_queue.empty():
+            try:
+                item = self.write_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+
+            batch = [item]
+            while len(batch) < 512:
+                try:
+                    batch.append(self.write_queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = []
+            for record in batch:
+                try:
+                    entries.append(self._write_record(*record))
+                except Exception as e:
+                    print(f"❌ Error writing evidence record: {str(e)}")
+
+            try:
+                self.segment_file.flush()
+                if self.sync:
+                    os.fsync(self.segment_file.fileno())
+            except OSError as e:
+                print(f"❌ Error syncing evidence segment: {str(e)}")
+
+            with self.index_lock:
+                for entry in entries:
+                    _insert_sorted(self.index, entry)
+                    _insert_sorted(self.type_index.setdefault(entry[2], []), entry)
+
+            for _ in batch:
+                self.write_queue.task_done()
+
+    def _read_record(self, segment_id, offset):
+        with open(self._segment_path(segment_id), "rb") as f:
+            f.seek(offset)
+            magic, flags, type_len, timestamp, payload_len, crc = RECORD_HEADER.unpack(
+                f.read(RECORD_HEADER.size))
+            if magic != RECORD_MAGIC:
+                raise EvidenceIntegrityError(f"Bad record magic at segment {segment_id}:{offset}")
+            type_bytes = f.read(type_len)
+            payload = f.read(payload_len)
+
+        if zlib.crc32(payload, zlib.crc32(type_bytes)) != crc:
+            raise EvidenceIntegrityError(f"Checksum mismatch at segment {segment_id}:{offset}")
+        if flags & FLAG_ENCRYPTED:
+            if self.cipher is None:
+                raise EvidenceIntegrityError("Record is encrypted but no key was given")
+            payload = self.cipher.decrypt(payload)
+        if flags & FLAG_COMPRESSED:
+            payload = zlib.decompress(payload)
+
+        return {
+            "timestamp": timestamp,
+            "event_type": type_bytes.decode("utf-8"),
+            "data": json.loads(payload.decode("utf-8")),
+        }
+
+    def query(self, start=None, end=None, event_type=None, limit=None):
+        """Return records with start <= timestamp <= end, oldest first
+
+        With event_type the range is taken from that type's own index, so
+        other types' records are never visited.
+        """
+        with self.index_lock:
+            index = self.index if event_type is None else self.type_index.get(event_type, [])
+            lo = 0 if start is None else bisect.bisect_left(index, (start,))
+            hi = len(index) if end is None else bisect.bisect_right(index, (end, float("inf")))
+            entries = index[lo:hi]
+
+        results = []
+        for timestamp, seq, entry_type, segment_id, offset in entries:
+            try:
+                record = self._read_record(segment_id, offset)
+            except EvidenceIntegrityError as e:
+                self.corrupted += 1
+                print(f"⚠️ Skipping evidence record: {str(e)}")
+                continue
+            record["seq"] = seq
+            results.append(record)
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def verify(self):
+        """Check every indexed record's checksum and return the bad entries"""
+        with self.index_lock:
+            entries = list(self.index)
+        bad = []
+        for timestamp, seq, event_type, segment_id, offset in entries:
+            try:
+                self._read_record(segment_id, offset)
+            except (EvidenceIntegrityError, struct.error, zlib.error) as e:
+                bad.append((seq, segment_id, offset, str(e)))
+        return bad
+
+    def flush(self, timeout=None):
+        """Block until all queued records are on disk"""
+        if timeout is None:
+            self.write_queue.join()
+            return True
+        deadline = time.time() + timeout
+        while self.write_queue.unfinished_tasks:
+            if time.time() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stats(self):
+        """Return store counters for monitoring"""
+        with self.index_lock:
+            records = len(self.index)
+            types = {event_type: len(entries) for event_type, entries in self.type_index.items()}
+        return {
+            "records": records,
+            "event_types": types,
+            "pending": self.write_queue.qsize(),
+            "dropped": self.dropped,
+            "corrupted": self.corrupted,
+            "damaged_spans": len(self.damaged),
+            "segment_id": self.segment_id,
+        }
+
+    def close(self):
+        """Stop the writer thread after draining pending records; safe to call twice"""
+        if not self.is_running:
+            return
+        self.is_running = False
+        self.writer_thread.join()
+        self.segment_file.close()
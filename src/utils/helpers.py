@@ -4,30 +4,81 @@ Contains helper functions and common utilities
 """
 
 import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import copy
 import json
+import atexit
+import threading
 from datetime import datetime
 
+from utils.config import get_config_manager
+from utils.evidence_store import EvidenceStore
+
+# Default evidence directory, anchored to the project root rather than the cwd
+EVIDENCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'evidence')
+
+_evidence_store = None
+_evidence_lock = threading.Lock()
+_config_cache = {}
+
 def get_timestamp():
     """Get current timestamp in ISO format"""
     return datetime.now().isoformat()
 
+def get_evidence_store():
+    """Return the shared evidence store, creating it from the evidence_store config on first use
+
+    The store is closed (pending records drained) at interpreter exit.
+    """
+    global _evidence_store
+    with _evidence_lock:
+        if _evidence_store is None:
+            store_cfg = get_config_manager().current.evidence_store
+            _evidence_store = EvidenceStore(os.path.normpath(store_cfg.directory or EVIDENCE_DIR),
+                                            compress=store_cfg.compress, key=store_cfg.key or None)
+            atexit.register(close_evidence_store)
+        return _evidence_store
+
+def close_evidence_store():
+    """Drain and close the shared evidence store if it was opened"""
+    with _evidence_lock:
+        store = _evidence_store
+    if store is not None:
+        store.close()
+
 def save_evidence(data, filename):
-    """Save evidence data to file"""
-    filepath = os.path.join("evidence", filename)
-    os.makedirs(os.path.dirname(filepath), exist_ok=True)
-    
-    with open(filepath, 'w') as f:
-        json.dump(data, f)
-    
-    return filepath
+    """Queue evidence data for the store under the given name
+
+    Returns a reference "<store directory>#<sequence>" in place of the old
+    file path, or None if the write queue was full. Never blocks on disk.
+    """
+    store = get_evidence_store()
+    seq = store.append({"filename": filename, "data": data}, "evidence")
+    return None if seq is None else f"{store.directory}#{seq}"
+
+def record_evidence(data, event_type="evidence", timestamp=None):
+    """Queue evidence data for the append-only store and return its sequence number"""
+    return get_evidence_store().append(data, event_type, timestamp)
 
 def load_config(config_file="config.json"):
-    """Load configuration from file"""
+    """Load configuration from file, re-reading only when its mtime changes
+
+    Each call returns its own copy, so callers may modify it freely. For
+    typed, hot-reloaded settings use utils.config.get_config() instead.
+    """
     try:
-        with open(config_file, 'r') as f:
-            return json.load(f)
+        mtime = os.stat(config_file).st_mtime_ns
     except FileNotFoundError:
         return {}
+    cached = _config_cache.get(config_file)
+    if cached is not None and cached[0] == mtime:
+        return copy.deepcopy(cached[1])
+    with open(config_file, 'r') as f:
+        data = json.load(f)
+    _config_cache[config_file] = (mtime, data)
+    return copy.deepcopy(data)
 
 def format_threat_level(level):
     """Format threat level for display"""
@@ -0,0 +1,283 @@
+"""
+Lightweight metrics for the Women Safety Application
+Counters, gauges and latency histograms with Prometheus text and JSON export
+"""
+
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+# Latency buckets in seconds, 1 ms .. 10 s
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Called as hook(stage) -> previous stage when a stage timer starts, and
+# hook(previous) when it ends; installed by the sampling profiler
+_stage_hook = None
+
+
+def set_stage_hook(hook):
+    """Install (or clear with None) the stage enter/exit hook"""
+    global _stage_hook
+    _stage_hook = hook
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+def _format_labels(key, extra=None):
+    items = list(key)
+    if extra:
+        items += list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+        self.lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self.lock:
+            self.value += amount
+
+    def get(self):
+        return self.value
+
+
+class Gauge:
+    """Value that can go up and down (queue depth, load time, ...)"""
+
+    kind = "gauge"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+
+class Histogram:
+    """Bucketed distribution of observed values with running sum and count"""
+
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.stage_name = None
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall time of the with-block"""
+        hook = _stage_hook if self.stage_name else None
+        previous = hook(self.stage_name) if hook else None
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.observe(time.perf_counter() - start)
+            if hook:
+                hook(previous)
+
+    def get(self):
+        with self.lock:
+            counts = list(self.counts)
+            total, count = self.sum, self.count
+        cumulative, running = [], 0
+        for c in counts:
+            running += c
+            cumulative.append(running)
+        return {"buckets": dict(zip(list(self.bounds) + ["+Inf"], cumulative)),
+                "sum": total, "count": count}
+
+    def quantile(self, q):
+        """Approximate quantile from bucket upper bounds"""
+        with self.lock:
+            counts = list(self.counts)
+            count = self.count
+        if count == 0:
+            return 0.0
+        target = q * count
+        running = 0
+        for bound, c in zip(self.bounds, counts):
+            running += c
+            if running >= target:
+                return bound
+        return float("inf")
+
+
+class MetricsRegistry:
+    """Named metric families, each with optional label sets"""
+
+    def __init__(self, prefix="women_safety"):
+        self.prefix = prefix
+        self.families = {}
+        self.lock = threading.Lock()
+        self.dump_thread = None
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        key = _label_key(labels)
+        family = self.families.get(name)
+        if family is None:
+            with self.lock:
+                family = self.families.setdefault(name, {"kind": cls.kind, "help": help_text, "children": {}})
+        metric = family["children"].get(key)
+        if metric is None:
+            with self.lock:
+                metric = family["children"].setdefault(key, cls(**kwargs))
+        return metric
+
+    def counter(self, name, help_text="", labels=None):
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", labels=None):
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", labels=None, buckets=DEFAULT_BUCKETS):
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    @contextmanager
+    def timer(self, stage):
+        """Time a pipeline stage into stage_latency_seconds{stage=...}"""
+        with self.stage(stage).time() as histogram:
+            yield histogram
+
+    def stage(self, stage):
+        """Return the latency histogram for a stage; bind it once outside hot loops"""
+        histogram = self.histogram("stage_latency_seconds", "Latency of each pipeline stage",
+                                   {"stage": stage})
+        histogram.stage_name = stage
+        return histogram
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            families = [(name, dict(f, children=dict(f["children"]))) for name, f in sorted(self.families.items())]
+        for name, family in families:
+            full = f"{self.prefix}_{name}"
+            if family["help"]:
+                lines.append(f"# HELP {full} {family['help']}")
+            lines.append(f"# TYPE {full} {family['kind']}")
+            for key, metric in sorted(family["children"].items()):
+                if family["kind"] == "histogram":
+                    data = metric.get()
+                    for bound, value in data["buckets"].items():
+                        lines.append(f"{full}_bucket{_format_labels(key, [('le', bound)])} {value}")
+                    lines.append(f"{full}_sum{_format_labels(key)} {data['sum']}")
+                    lines.append(f"{full}_count{_format_labels(key)} {data['count']}")
+                else:
+                    lines.append(f"{full}{_format_labels(key)} {metric.get()}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self):
+        """Return a JSON-serialisable snapshot of all metrics"""
+        result = {}
+        with self.lock:
+            families = [(name, dict(f["children"])) for name, f in self.families.items()]
+        for name, children in families:
+            entries = []
+            for key, metric in children.items():
+                entry = {"labels": dict(key), "value": metric.get()}
+                if isinstance(metric, Histogram):
+                    entry["p50"] = metric.quantile(0.5)
+                    entry["p99"] = metric.quantile(0.99)
+                entries.append(entry)
+            result[name] = entries
+        return result
+
+    def start_json_dump(self, path, interval=30.0):
+        """Write to_dict() to `path` every `interval` seconds from a daemon thread"""
+        def dump():
+            while True:
+                time.sleep(interval)
+                try:
+                    tmp_path = path + ".tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump({"timestamp": time.time(), "metrics": self.to_dict()}, f)
+                    os.replace(tmp_path, path)
+                except Exception as e:
+                    print(f"❌ Error dumping metrics: {str(e)}")
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.dump_thread = threading.Thread(target=dump, name="metrics-dump")
+        self.dump_thread.daemon = True
+        self.dump_thread.start()
+
+    def start_http_server(self, port=9100, host="127.0.0.1"):
+        """Serve /metrics on a local port for processes without the safety API"""
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.to_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        thread = threading.Thread(target=server.serve_forever, name="metrics-http")
+        thread.daemon = True
+        thread.start()
+        print(f"📈 Metrics available at http://{host}:{server.server_address[1]}/metrics")
+        return server
+
+    def prometheus_route(self):
+        """Handler for SafetyApiServer.add_route('/metrics', ...)"""
+        return "text/plain; version=0.0.4", self.to_prometheus().encode("utf-8")
+
+
+_registry = MetricsRegistry()
+
+
+def start_exporters(component, metrics_config):
+    """Start the periodic JSON dump (and optional /metrics port) for a component
+
+    metrics_config is a utils.config.MetricsConfig.
+    """
+    if metrics_config.json_dir and metrics_config.json_interval > 0:
+        _registry.start_json_dump(os.path.join(metrics_config.json_dir, f"{component}.json"),
+                                  metrics_config.json_interval)
+    if metrics_config.http_port:
+        _registry.start_http_server(metrics_config.http_port)
+    return _registry
+
+
+def get_metrics():
+    """Return the process-wide metrics registry"""
+    return _registry
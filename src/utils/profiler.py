@@ -0,0 +1,154 @@
+"""
+Sampling profiler for the Women Safety Application
+Periodically samples the stacks of all pipeline threads and writes
+collapsed-stack files (flamegraph.pl / speedscope input) per stage
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+
+from utils import metrics
+
+PROFILE_ENV = "WS_PROFILE"
+PROFILE_HZ_ENV = "WS_PROFILE_HZ"
+PROFILE_DURATION_ENV = "WS_PROFILE_DURATION"
+PROFILE_DIR_ENV = "WS_PROFILE_DIR"
+
+# thread id -> name of the pipeline stage currently running on it
+_thread_stages = {}
+
+
+def set_stage(name):
+    """Mark the calling thread as running `name` (None clears it); returns the previous stage"""
+    thread_id = threading.get_ident()
+    previous = _thread_stages.get(thread_id)
+    if name is None:
+        _thread_stages.pop(thread_id, None)
+    else:
+        _thread_stages[thread_id] = name
+    return previous
+
+
+class SamplingProfiler:
+    """Low-rate stack sampler producing collapsed stacks keyed by thread and stage"""
+
+    def __init__(self, hz=50, duration=None, output_dir="profiles", max_depth=64):
+        self.interval = 1.0 / hz
+        self.duration = duration
+        self.output_dir = output_dir
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self.sample_count = 0
+        self.sampling_time = 0.0
+        self.started_at = None
+        self.is_running = False
+        self.thread = None
+        self._frame_names = {}
+
+    def _frame_name(self, code):
+        name = self._frame_names.get(code)
+        if name is None:
+            name = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            self._frame_names[code] = name
+        return name
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own_id:
+                continue
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(self._frame_name(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+            stage = _thread_stages.get(thread_id, "idle")
+            thread_name = names.get(thread_id, str(thread_id)).replace(";", "_")
+            key = ";".join([thread_name, stage] + stack)
+            self.samples[key] += 1
+        self.sample_count += 1
+
+    def _run(self):
+        next_sample = time.perf_counter()
+        while self.is_running:
+            start = time.perf_counter()
+            self._sample()
+            self.sampling_time += time.perf_counter() - start
+            if self.duration is not None and time.time() - self.started_at >= self.duration:
+                self.is_running = False
+                self.write()
+                break
+            next_sample += self.interval
+            time.sleep(max(0.0, next_sample - time.perf_counter()))
+
+    def start(self):
+        """Start sampling in a daemon thread"""
+        self.started_at = time.time()
+        self.is_running = True
+        metrics.set_stage_hook(set_stage)
+        self.thread = threading.Thread(target=self._run, name="sampling-profiler")
+        self.thread.daemon = True
+        self.thread.start()
+        window = f" for {self.duration:.0f}s" if self.duration else ""
+        print(f"🔬 Sampling profiler running at {1.0 / self.interval:.0f} Hz{window}")
+        return self
+
+    def overhead(self):
+        """Fraction of wall time spent taking samples"""
+        if not self.started_at:
+            return 0.0
+        return self.sampling_time / max(1e-9, time.time() - self.started_at)
+
+    def write(self):
+        """Write all samples plus one collapsed file per stage; returns the combined path"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(self.started_at or time.time()))
+        combined = os.path.join(self.output_dir, f"profile_{stamp}.collapsed")
+        by_stage = {}
+        with open(combined, "w") as f:
+            for key, count in sorted(self.samples.items()):
+                f.write(f"{key} {count}\n")
+                thread_name, stage, rest = (key.split(";", 2) + [""])[:3]
+                by_stage.setdefault(stage, []).append((f"{thread_name};{rest}".rstrip(";"), count))
+
+        for stage, entries in by_stage.items():
+            safe_stage = "".join(c if c.isalnum() or c in "-_" else "_" for c in stage)
+            with open(os.path.join(self.output_dir, f"profile_{stamp}.{safe_stage}.collapsed"), "w") as f:
+                for key, count in entries:
+                    f.write(f"{key} {count}\n")
+
+        print(f"🔬 Profile written to {combined} ({self.sample_count} samples, "
+              f"{self.overhead() * 100:.2f}% sampling overhead)")
+        return combined
+
+    def stop(self):
+        """Stop sampling and write the profile (if it was not already written)"""
+        if not self.is_running:
+            return None
+        self.is_running = False
+        self.thread.join()
+        return self.write()
+
+
+def profiling_requested(argv=None):
+    """True when --profile is on the command line or WS_PROFILE is set"""
+    argv = sys.argv if argv is None else argv
+    return "--profile" in argv or os.environ.get(PROFILE_ENV, "") not in ("", "0", "false")
+
+
+def maybe_start_profiler(enabled=None):
+    """Start a profiler configured from the environment when profiling is requested"""
+    if enabled is None:
+        enabled = profiling_requested()
+    if not enabled:
+        return None
+    duration = os.environ.get(PROFILE_DURATION_ENV)
+    return SamplingProfiler(
+        hz=float(os.environ.get(PROFILE_HZ_ENV, 50)),
+        duration=float(duration) if duration else None,
+        output_dir=os.environ.get(PROFILE_DIR_ENV, "profiles"),
+    ).start()
@@ -0,0 +1,91 @@
+"""
+CPU thread budgeting for the Women Safety Application
+Splits the box's cores between the vision (YOLO) and audio (Whisper)
+components so their PyTorch/OpenMP pools stop oversubscribing the CPU
+"""
+
+import os
+
+# Per core count: component -> (intra-op threads, inter-op threads, pinned CPU ids)
+# One core is left for capture, rendering, the API server and the OS where possible
+PRESETS = {
+    4: {"vision": (2, 1, (0, 1)), "audio": (2, 1, (2, 3))},
+    8: {"vision": (3, 1, (0, 1, 2)), "audio": (4, 1, (3, 4, 5, 6))},
+    16: {"vision": (6, 2, tuple(range(0, 6))), "audio": (8, 2, tuple(range(6, 14)))},
+}
+
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS", "NUMEXPR_NUM_THREADS")
+
+
+def available_cpus():
+    """CPU ids this process may run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def select_preset(cpu_count, preset="auto"):
+    """Return the preset dict for `preset` ("auto", "4", "8", "16") or None when budgeting is off"""
+    if preset in ("off", "none", ""):
+        return None
+    if preset != "auto":
+        return PRESETS[int(preset)]
+    fitting = [cores for cores in PRESETS if cores <= cpu_count]
+    return PRESETS[max(fitting)] if fitting else None
+
+
+def plan_budget(component, resources_config, cpus=None):
+    """Return (intra_threads, inter_threads, cpu ids or None) for a component, or None"""
+    cpus = available_cpus() if cpus is None else list(cpus)
+    preset = select_preset(len(cpus), resources_config.preset)
+    if preset is None or component not in preset:
+        return None
+    intra, inter, slots = preset[component]
+    override = getattr(resources_config, f"{component}_threads", 0)
+    if override > 0:
+        intra = override
+    # Preset slots index into the CPUs we are allowed to use (containers, taskset)
+    pinned = [cpus[i] for i in slots if i < len(cpus)] if resources_config.pin_cpus else None
+    return intra, inter, pinned or None
+
+
+def apply_thread_budget(component, resources_config, cpus=None):
+    """Apply the component's thread budget to this process; returns the plan that was applied
+
+    Call it before numpy, cv2 or torch are imported: OpenMP and BLAS read the
+    thread environment variables once when their pools start, and torch only
+    accepts inter-op changes before any parallel work has run.
+    """
+    plan = plan_budget(component, resources_config, cpus)
+    if plan is None:
+        return None
+    intra, inter, pinned = plan
+
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(intra)
+    if pinned and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, pinned)
+        except OSError as e:
+            print(f"⚠️ Could not pin {component} to CPUs {pinned}: {str(e)}")
+            pinned = None
+
+    try:
+        import torch
+        torch.set_num_threads(intra)
+        try:
+            torch.set_num_interop_threads(inter)
+        except RuntimeError:
+            # Already fixed by earlier parallel work; intra-op threads still apply
+            pass
+    except ImportError:
+        pass
+    try:
+        import cv2
+        cv2.setNumThreads(intra)
+    except ImportError:
+        pass
+
+    where = f" on CPUs {','.join(map(str, pinned))}" if pinned else ""
+    print(f"🧵 {component}: {intra} intra-op / {inter} inter-op threads{where}")
+    return intra, inter, pinned
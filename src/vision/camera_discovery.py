@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Camera discovery for the Women Safety vision loop
+Candidate devices are probed concurrently with a deadline (in order on the
+main thread on macOS, where AVFoundation asks for camera permission there),
+the winner's open capture is handed straight to the frame loop, and the
+device and its capabilities are cached on disk so the next start opens it
+directly
+"""
+
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import json
+import time
+import queue
+import argparse
+import threading
+from dataclasses import dataclass, field
+
+import cv2
+
+CACHE_VERSION = 1
+
+
+@dataclass
+class CameraDiscovery:
+    """An open capture plus how it was found; source is cache, probe or fallback"""
+    capture: object
+    index: int
+    source: str
+    seconds: float
+    capabilities: dict = field(default_factory=dict)
+
+
+def parse_candidates(text):
+    """"1,2,3,4,5,0" -> [1, 2, 3, 4, 5, 0], in preference order"""
+    return [int(part) for part in str(text).split(",") if part.strip()]
+
+
+def capabilities_of(capture, frame):
+    """What the device actually delivered, as stored in the cache"""
+    fourcc = int(capture.get(cv2.CAP_PROP_FOURCC))
+    try:
+        backend = capture.getBackendName()
+    except cv2.error:
+        backend = ""
+    return {
+        "width": int(frame.shape[1]),
+        "height": int(frame.shape[0]),
+        "fps": round(float(capture.get(cv2.CAP_PROP_FPS) or 0.0), 2),
+        "fourcc": "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00") if fourcc > 0 else "",
+        "backend": backend,
+    }
+
+
+class _Probe:
+    """Opens one device on its own thread; a probe abandoned past the deadline releases its capture when it returns"""
+
+    def __init__(self, index, width, height, results):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.results = results
+        self.lock = threading.Lock()
+        self.done = False
+        self.abandoned = False
+        self.capture = None
+        self.capabilities = None
+        self.seconds = 0.0
+        self.thread = threading.Thread(target=self._run, name=f"camera-probe-{index}", daemon=True)
+
+    def start(self, threaded=True):
+        if threaded:
+            self.thread.start()
+        else:
+            self._run()
+        return self
+
+    def _run(self):
+        start = time.perf_counter()
+        capture, frame = None, None
+        try:
+            capture = cv2.VideoCapture(self.index)
+            if capture.isOpened():
+                if self.width and self.height:
+                    capture.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+                    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+                ret, frame = capture.read()
+                if not ret:
+                    frame = None
+        except cv2.error:
+            frame = None
+        with self.lock:
+            self.seconds = time.perf_counter() - start
+            if frame is not None and not self.abandoned:
+                self.capture = capture
+                self.capabilities = capabilities_of(capture, frame)
+            elif capture is not None:
+                capture.release()
+            self.done = True
+        self.results.put(self.index)
+
+    def take(self):
+        """Hand over the open capture (the probe no longer owns it)"""
+        with self.lock:
+            capture, self.capture = self.capture, None
+        return capture
+
+    def abandon(self):
+        with self.lock:
+            self.abandoned = True
+            capture, self.capture = self.capture, None
+        if capture is not None:
+            capture.release()
+
+
+def probe_cameras(indices, timeout, width=0, height=0, threaded=None):
+    """Probe indices concurrently; return (index, capture, capabilities) for the most preferred
+    device that delivered a frame before the deadline, or None
+
+    A device is chosen as soon as every more-preferred candidate has failed,
+    so one slow or hung index only costs time if it could have won. On macOS
+    the probes run one after another on the calling thread instead, and no
+    new probe starts once the deadline has passed.
+    """
+    if threaded is None:
+        threaded = sys.platform != "darwin"
+    results = queue.Queue()
+    deadline = time.monotonic() + timeout
+    if not threaded:
+        for index in indices:
+            if time.monotonic() >= deadline:
+                break
+            probe = _Probe(index, width, height, results).start(threaded=False)
+            capture = probe.take()
+            if capture is not None:
+                return index, capture, probe.capabilities
+        return None
+
+    probes = [_Probe(index, width, height, results).start() for index in indices]
+    chosen = None
+    while True:
+        waiting = False
+        for probe in probes:
+            with probe.lock:
+                done, ok = probe.done, probe.capture is not None
+            if ok:
+                chosen = probe
+                break
+            if not done:
+                waiting = True
+                break
+        remaining = deadline - time.monotonic()
+        if chosen is not None or not waiting or remaining <= 0:
+            break
+        try:
+            results.get(timeout=remaining)
+        except queue.Empty:
+            pass
+    if chosen is None:
+        # Deadline hit while a preferred probe was still opening: settle for any device that answered
+        chosen = next((p for p in probes if p.capture is not None), None)
+
+    for probe in probes:
+        if probe is not chosen:
+            probe.abandon()
+    if chosen is None:
+        return None
+    capture = chosen.take()
+    return (chosen.index, capture, chosen.capabilities) if capture is not None else None
+
+
+def load_cached(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+        if cached.get("version") == CACHE_VERSION:
+            return cached
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+
+def save_cached(cache_path, index, capabilities):
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "index": index, "capabilities": capabilities,
+                       "updated": time.time()}, f, indent=2)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not cache camera selection: {str(e)}")
+
+
+def discover_camera(camera_config, use_cache=True):
+    """Return a CameraDiscovery with an already-open capture
+
+    The cached device is probed together with every candidate preferred over
+    it, so a preferred camera plugged in since the last run still wins; when
+    it is the top choice it is probed alone. If none of those delivers frames
+    the remaining candidates are probed. When nothing answers, the last
+    candidate is opened unverified, as the old sequential search did with 0.
+    """
+    start = time.perf_counter()
+    candidates = parse_candidates(camera_config.candidates) or [0]
+    fallback = candidates[-1]
+    timeout = camera_config.probe_timeout
+    width, height = camera_config.width, camera_config.height
+    cache_path = camera_config.cache_path
+
+    cached = load_cached(cache_path) if use_cache and cache_path else None
+    if cached is not None and cached.get("index") in candidates:
+        preferred = candidates[:candidates.index(cached["index"]) + 1]
+        found = probe_cameras(preferred, timeout, width, height)
+        if found is not None:
+            index, capture, capabilities = found
+            if index != cached["index"] or capabilities != cached.get("capabilities"):
+                save_cached(cache_path, index, capabilities)
+            source = "cache" if index == cached["index"] else "probe"
+            return CameraDiscovery(capture, index, source, time.perf_counter() - start, capabilities)
+        candidates = candidates[len(preferred):]
+
+    found = probe_cameras(candidates, timeout, width, height) if candidates else None
+    if found is not None:
+        index, capture, capabilities = found
+        if cache_path:
+            save_cached(cache_path, index, capabilities)
+        return CameraDiscovery(capture, index, "probe", time.perf_counter() - start, capabilities)
+
+    capture = cv2.VideoCapture(fallback)
+    if width and height:
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    return CameraDiscovery(capture, fallback, "fallback", time.perf_counter() - start)
+
+
+def describe(discovery):
+    caps = discovery.capabilities
+    detail = f" {caps['width']}x{caps['height']} @ {caps['fps']:g} fps ({caps['backend'] or 'unknown backend'})" if caps else ""
+    return f"camera {discovery.index} via {discovery.source} in {discovery.seconds * 1000:.0f} ms{detail}"
+
+
+def main():
+    from utils.config import get_config_manager
+
+    parser = argparse.ArgumentParser(description="Probe cameras and report discovery time")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore the cached device and probe every candidate")
+    args = parser.parse_args()
+
+    discovery = discover_camera(get_config_manager(watch=False).current.camera, use_cache=not args.no_cache)
+    print(f"📷 {describe(discovery)}")
+    discovery.capture.release()
+
+
+if __name__ == "__main__":
+    main()
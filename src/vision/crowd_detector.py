@@ -1,59 +1,130 @@
+import os
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.config import get_config_manager
+from utils.resources import apply_thread_budget
+
+# Share the CPU with the audio models (resources.preset). This runs before
+# numpy/cv2/torch are imported because OpenMP and BLAS read their thread
+# environment variables once, when their pools start
+apply_thread_budget("vision", get_config_manager().current.resources)
+
 import cv2
 import numpy as np
 import socket
 import time
 import json
-import os
-import sys
-sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+import threading
+import signal
 
 from ultralytics import YOLO
-import pygame
-import shutil
 from cryptography.fernet import Fernet
 import sounddevice as sd
 
+from utils.alert_log import AlertLog
+from utils.helpers import record_evidence, close_evidence_store
+from utils.metrics import get_metrics, start_exporters
+from utils.profiler import maybe_start_profiler
+from utils import event_log
+from api.state import get_safety_state
+from api.server import SafetyApiServer
+from vision.preroll_buffer import PreRollBuffer
+from vision.snapshot_pool import SnapshotPool
+from vision.image_ops import blur_faces, MotionDetector
+from vision.frame_pool import FramePool
+from vision.renderer import LiveRenderer
+from vision.camera_discovery import discover_camera, describe as describe_camera
+from core.decision_engine import DecisionEngine
+from core.scheduler import get_scheduler
+from emergency.alarm import NullSink, get_alarm_service
+
+metrics = get_metrics()
+# WS_PROFILE=1 or --profile samples thread stacks into profiles/*.collapsed
+profiler = maybe_start_profiler()
+# WS_RECORD=1 or --record logs sensor events for core/replay.py
+recorder = event_log.maybe_start_recorder("vision")
+
 # Load models from the models directory
 models_path = os.path.join(os.path.dirname(__file__), '..', '..', 'models')
+load_start = time.perf_counter()
 people_m = YOLO(os.path.join(models_path, "yolov8n.pt"))
+metrics.gauge("model_load_seconds", "Model load time", {"model": "people"}).set(time.perf_counter() - load_start)
+load_start = time.perf_counter()
 poses_m = YOLO(os.path.join(models_path, "yolov8n-pose.pt"))
+metrics.gauge("model_load_seconds", "Model load time", {"model": "pose"}).set(time.perf_counter() - load_start)
 
-th_crowd = 5
-wait = 60
-last_alerted = 0
+# Stage timers are bound once so the frame loop only pays for perf_counter + observe
+t_capture = metrics.stage("capture")
+t_people = metrics.stage("people_detect")
+t_pose = metrics.stage("pose")
+t_motion = metrics.stage("motion")
+t_audio = metrics.stage("audio_amplitude")
+t_alert = metrics.stage("alert")
+t_annotate = metrics.stage("annotate")
+t_frame = metrics.stage("frame_total")
+frames_total = metrics.counter("frames_total", "Frames processed by the vision loop")
+frames_dropped = metrics.counter("frames_dropped_total", "Frames lost between capture reads")
+alerts_total = metrics.counter("alerts_total", "Alerts raised", {"source": "auto"})
+manual_alerts_total = metrics.counter("alerts_total", "Alerts raised", {"source": "manual"})
+snapshot_pending = metrics.gauge("queue_depth", "Pending jobs per queue", {"queue": "snapshots"})
+snapshot_saturated = metrics.counter("snapshot_pool_saturated_total", "Snapshots dropped because the pool was full")
 
-alert_Hz = 2000 
-alert_time = 800  
+# Thresholds live in config.json (see utils/config.py) and are hot-reloaded;
+# hot paths read config.current so retuning never restarts the models
+config = get_config_manager()
 
-th_motion = 5000
-th_audio = 0.06
-
-snapshots = False   
-d_log = "snapshots"
+evidence_cfg = config.current.evidence
+d_log = evidence_cfg.log_dir
 os.makedirs(d_log, exist_ok=True)
+alert_log = AlertLog(d_log)
+
+# Dashboards read this snapshot through the API server instead of polling the detectors
+safety_state = get_safety_state()
+api_server = None
+if config.current.api.enabled:
+    # The audio detectors are separate processes; they forward their fields to relay_port
+    api_server = SafetyApiServer(safety_state, config.current.api.host, config.current.api.port,
+                                 relay_port=config.current.api.relay_port)
+    api_server.add_route("/metrics", metrics.prometheus_route)
+    try:
+        api_server.start_in_thread()
+    except OSError as e:
+        print(f"❌ Safety API failed to start on {config.current.api.host}:{config.current.api.port}: {str(e)}")
+        api_server = None
+start_exporters("vision", config.current.metrics)
+
+# Pre-event clips: seconds kept before/after an alert; like snapshots, off by
+# default, and faces are blurred before any frame is written
+preroll = PreRollBuffer(evidence_cfg.preroll_before, evidence_cfg.preroll_after,
+                        output_dir=d_log, blur=blur_faces) if evidence_cfg.preroll_clips else None
+
+# Alarm tones are cached and played on their own thread; "null" keeps headless boxes silent
+alarm = get_alarm_service(NullSink() if config.current.alerts.alarm_sink == "null" else None)
 
-ip_UDP = "broadcast"
-port_UDP = 5005
 sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
 sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
 
-key_f = Fernet.generate_key()
+# All nodes share fleet.key so the fleet aggregator (api/fleet.py) can decrypt
+fleet_cfg = config.current.fleet
+if fleet_cfg.key:
+    key_f = fleet_cfg.key.split(",")[0].strip().encode()
+else:
+    print("⚠️ fleet.key is not set; alerts are encrypted with a throwaway key no aggregator can read")
+    key_f = Fernet.generate_key()
 cipher_f = Fernet(key_f)
-cas_face = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-def pic_blur(fr):
-    gray = cv2.cvtColor(fr, cv2.COLOR_BGR2GRAY)
-    faces = cas_face.detectMultiScale(gray, 1.3, 5)
-    for (x, y, w, h) in faces:
-        face = fr[y:y+h, x:x+w]
-        blur = cv2.GaussianBlur(face, (49, 49), 30)
-        fr[y:y+h, x:x+w] = blur
-    return fr
+node_id = fleet_cfg.node_id or socket.gethostname()
+pic_blur = blur_faces
+snapshot_pool = SnapshotPool(pic_blur, jpeg_quality=evidence_cfg.snapshot_quality,
+                             max_width=evidence_cfg.snapshot_max_width) if evidence_cfg.snapshots else None
 def crowd_risk(fr, p_b):
     n_people = len(p_b)
-    if n_people < th_crowd:
+    if n_people < config.current.vision.th_crowd:
         return False
     risk = 0
-    final_pose = poses_m(fr)
+    with t_pose.time():
+        final_pose = poses_m(fr)
     for p in final_pose:
         for box in p.boxes:
             if hasattr(box, "keypoints") and len(box.keypoints) >= 2:
@@ -61,184 +132,240 @@ def crowd_risk(fr, p_b):
                 sh_y = box.keypoints[1][1]
                 if hand_y < sh_y:
                     risk += 1
-    return risk / max(1, n_people) > 0.3
+    ratio = risk / max(1, n_people)
+    record_event(event_log.POSE, ratio)
+    return ratio > 0.3
 
-def motion_risk(prev_fr, curr_fr):
-    if prev_fr is None:
-        return False
-    gray_prev = cv2.cvtColor(prev_fr, cv2.COLOR_BGR2GRAY)
-    gray_curr = cv2.cvtColor(curr_fr, cv2.COLOR_BGR2GRAY)
-    diff = cv2.absdiff(gray_prev, gray_curr)
-    motion = np.sum(diff) / 255
-    return motion > th_motion
+def record_event(kind, value=None):
+    if recorder is not None:
+        recorder.record(kind, value)
+
+motion_detector = MotionDetector()
+def motion_level(curr_fr):
+    score = motion_detector.update(curr_fr)
+    score = 0.0 if score is None else score
+    record_event(event_log.MOTION, score)
+    return score
 def audio_risk(dur=0.5, fs=16000):
     try:
         record = sd.rec(int(dur * fs), samplerate=fs, channels=1)
         sd.wait()
-        ampl_max = np.max(np.abs(record))
-        return ampl_max > th_audio
+        if preroll is not None:
+            preroll.push_audio(record)
+        ampl_max = float(np.max(np.abs(record)))
+        record_event(event_log.AUDIO, ampl_max)
+        return ampl_max > config.current.vision.th_audio
     except Exception:
         return False
 
-def alert(message, metadata):
-    encry = cipher_f.encrypt(json.dumps(metadata).encode())
-    sock.sendto(encry, (ip_UDP, port_UDP))
-
-def play_beep(freq=alert_Hz, duration_ms=alert_time):
-    """Cross-platform beep: use winsound on Windows, pygame if available,
-    otherwise fallback to system players (afplay/aplay) when present.
-    """
-    # Try Windows winsound
+def send_fleet(payload):
+    """Broadcast one encrypted datagram; a network error is reported, never raised into the frame loop"""
+    encry = cipher_f.encrypt(json.dumps(dict(payload, node_id=node_id, zone=fleet_cfg.zone)).encode())
+    alerts_cfg = config.current.alerts
     try:
-        if sys.platform.startswith("win"):
-            import winsound
-            winsound.Beep(int(freq), int(duration_ms))
-            return
-    except Exception:
-        pass
+        sock.sendto(encry, (alerts_cfg.udp_host, alerts_cfg.udp_port))
+        return True
+    except OSError as e:
+        print(f"⚠️ Fleet send to {alerts_cfg.udp_host}:{alerts_cfg.udp_port} failed: {str(e)}")
+        return False
 
-    # Try pygame synthesis
-    try:
-        # initialize mixer if needed
-        if not pygame.get_init():
-            pygame.init()
-        fs = 16000
-        duration = float(duration_ms) / 1000.0
-        t = np.linspace(0, duration, int(fs * duration), False)
-        wave = 0.5 * np.sin(2 * np.pi * float(freq) * t)
-        audio = np.int16(wave * 32767)
-        # Make a sound and play
-        snd = pygame.sndarray.make_sound(audio)
-        snd.play()
-        # wait for sound to finish
-        pygame.time.delay(int(duration_ms) + 50)
-        return
-    except Exception:
-        pass
+def alert(message, metadata):
+    send_fleet(dict(metadata, type="alert", message=message))
 
-    # Fallback to system players (macOS: afplay, Linux: aplay)
-    try:
-        if sys.platform == "darwin" and shutil.which("afplay"):
-            # play a system sound
-            os.system("afplay /System/Library/Sounds/Glass.aiff")
-            return
-        if sys.platform.startswith("linux") and shutil.which("aplay"):
-            os.system("aplay /usr/share/sounds/alsa/Front_Center.wav || true")
-            return
-    except Exception:
-        pass
-def meta_log(metadata):
-    with open(os.path.join(d_log, "alerts_log.json"), "a") as f:
-        json.dump(metadata, f)
-        f.write("\n")
-
-
-# Try to use OBS Virtual Camera as default, fallback to default camera if not found
-def find_obs_camera():
-    # Try common device indices where OBS Virtual Camera might appear
-    # OBS Virtual Camera typically appears as device index 1 when enabled
-    obs_indices = [1, 2, 3, 4, 5]
-    
-    for idx in obs_indices:
-        cap = cv2.VideoCapture(idx)
-        if cap.isOpened():
-            # Test if we can read a frame
-            ret, _ = cap.read()
-            if ret:
-                cap.release()
-                print(f"Testing camera at index {idx}")
-                return idx
-            cap.release()
-    
-    # If specific indices don't work, try the default camera (0) as fallback
-    return 0
-
-# Use OBS Virtual Camera as default if available
+def heartbeat_loop():
+    """Tell the fleet aggregator this node is alive, with a few health numbers"""
+    started = time.time()
+    while True:
+        time.sleep(fleet_cfg.heartbeat_interval)
+        try:
+            send_fleet({"type": "heartbeat", "info": {
+                "uptime": round(time.time() - started),
+                "frames": frames_total.get(),
+                "alerts": alerts_total.get(),
+                "threat_level": engine.threat_level}})
+        except Exception as e:
+            print(f"⚠️ Fleet heartbeat failed: {str(e)}")
+
+def play_beep(alerts_cfg):
+    """Sound the alarm configured in alerts_cfg without blocking the frame loop"""
+    alarm.play(alerts_cfg.alert_hz, alerts_cfg.alert_time, alerts_cfg.alarm_pattern, alerts_cfg.alarm_repeat)
+def meta_log(metadata, timestamp=None):
+    alert_log.write(metadata, timestamp)
+    record_evidence(metadata, "alert", timestamp)
+
+
+# Use OBS Virtual Camera as default if available (camera.candidates lists it first)
 # To ensure OBS Virtual Camera is used:
 # 1. Start OBS Studio
 # 2. Go to Tools > Virtual Camera
 # 3. Click "Start" to enable the virtual camera
 # 4. Run this script
-camera_index = find_obs_camera()
-capture = cv2.VideoCapture(camera_index)
-capture.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-capture.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-
-print(f"Using camera index: {camera_index}")
-if camera_index != 0:
-    print("Successfully connected to camera (likely OBS Virtual Camera if started)")
-else:
+# Candidates are probed concurrently and the last working device is cached,
+# so the capture that answered is used as-is instead of being reopened
+discovery = discover_camera(config.current.camera)
+capture = discovery.capture
+metrics.gauge("camera_discovery_seconds", "Time to find and open the camera").set(discovery.seconds)
+
+print(f"📷 Using {describe_camera(discovery)}")
+if discovery.source == "fallback":
+    print("⚠️ No camera delivered a frame during discovery; opened the fallback device unverified")
+elif discovery.index == 0:
     print("Using default camera (start OBS Virtual Camera for better results)")
-prev_fr = None
+# Frames are read into reusable buffers; consumers that outlive the
+# iteration (the renderer) retain the buffer and release it when done
+frame_pool = FramePool(size=4)
+
+# Motion and audio level gate the person detector (config.scheduler); the
+# decision engine keeps it, and Whisper in the audio processes, running while a
+# single-modality threat is unconfirmed
+scheduler = get_scheduler()
+engine = DecisionEngine()
+p_b = []
+rsky_cr = False
 
 latest_alert = "No Alerts"
 alert_color = (0, 255, 0)
+
+# Rendering runs on its own thread at a capped FPS; --headless (or display.headless)
+# skips annotation and windows entirely
+headless = config.current.display.headless or "--headless" in sys.argv
+renderer = LiveRenderer(config.current.display.max_fps, headless=headless)
+if fleet_cfg.heartbeat_interval > 0:
+    threading.Thread(target=heartbeat_loop, name="fleet-heartbeat", daemon=True).start()
 print("Women Safety System Running....")
 
-while True:
-    ret, fr = capture.read()
-    if not ret:
-        break
-
-    res = people_m(fr, conf=0.3)
-    p_b = [b for b in res[0].boxes if people_m.names[int(b.cls[0])] == "person"]
-    ann_fr = res[0].plot()
-
-    rsky_cr = len(p_b) >= th_crowd and crowd_risk(fr, p_b)
-    motion = motion_risk(prev_fr, fr)
-    audio_alert = audio_risk()
-
-    modalities = [rsky_cr, motion, audio_alert]
-    if sum(modalities) >= 2:
-        pres_time = time.time()
-        if pres_time - last_alerted > wait:
-            play_beep(alert_Hz, alert_time)
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(pres_time))
-
-            metadata = {
-                "timestamp": timestamp,
-                "n_people": len(p_b),
-                "risky_pose": rsky_cr,
-                "motion": motion,
-                "audio_alert": audio_alert}
-
-            if snapshots:
-                safe_fr = pic_blur(ann_fr.copy())
-                snap_path = os.path.join(d_log, f"blur_{int(pres_time)}.jpg")
-                cv2.imwrite(snap_path, safe_fr)
-                metadata["snapshot_path"] = snap_path
-
-            alert("Risk Detection:", metadata)
-            meta_log(metadata)
-
-            latest_alert = f"Alert at: {timestamp}"
+camera_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+last_read = None
+
+# SIGTERM (systemd, docker stop, kill) unwinds like Ctrl+C so the finally
+# block below flushes the profiler, event recorder and alert log
+signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+try:
+    while True:
+        frame_start = time.perf_counter()
+        with t_capture.time():
+            ret, pooled = frame_pool.read(capture)
+        if not ret:
+            break
+        fr = pooled.array
+        frames_total.inc()
+        # Frames the camera produced while we were busy are dropped by the driver
+        now = time.perf_counter()
+        if last_read is not None:
+            missed = int((now - last_read) * camera_fps) - 1
+            if missed > 0:
+                frames_dropped.inc(missed)
+        last_read = now
+        if preroll is not None:
+            preroll.push_frame(fr)
+
+        cfg = config.current
+        # Cheap signals first; they decide whether YOLO runs on this frame
+        with t_motion.time():
+            motion_score = motion_level(fr)
+        motion = motion_score > cfg.vision.th_motion
+        with t_audio.time():
+            audio_alert = audio_risk()
+
+        people_trigger = audio_alert or motion_score > cfg.vision.th_motion * cfg.scheduler.motion_gate
+        if scheduler.should_run("people", people_trigger):
+            with t_people.time():
+                res = people_m(fr, conf=cfg.vision.person_conf)
+                p_b = [b for b in res[0].boxes if people_m.names[int(b.cls[0])] == "person"]
+            people_result = res[0]
+            record_event(event_log.PEOPLE, len(p_b))
+            rsky_cr = len(p_b) >= cfg.vision.th_crowd and crowd_risk(fr, p_b)
+        else:
+            # Keep the last detections; they are at most scheduler.people_max_interval old
+            people_result = None
+
+        record_event(event_log.FRAME)
+        threat_level = engine.assess_threat({"risky_pose": rsky_cr, "motion": motion}, {"audio_alert": audio_alert})
+        if engine.needs_confirmation():
+            scheduler.confirm(("people",))
+            # Whisper runs in the audio processes; ask them over the state relay
+            if api_server is not None:
+                api_server.confirm_remote(("emotion",), cfg.scheduler.hold)
+        safety_state.update(
+            peopleCount=len(p_b),
+            motionStatus="Rapid" if motion else "Normal",
+            poseRisk="High Risk" if rsky_cr else "Safe",
+            audioLevel="HIGH" if audio_alert else "OK",
+            threatLevel=threat_level)
+        if threat_level == "HIGH":
+            pres_time = time.time()
+            if engine.should_alert(pres_time, cfg.alerts.wait):
+                alert_start = time.perf_counter()
+                alerts_total.inc()
+                record_event(event_log.ALERT, "auto")
+                scheduler.alerted(alert_start)
+                play_beep(cfg.alerts)
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(pres_time))
+
+                metadata = {
+                    "timestamp": timestamp,
+                    "n_people": len(p_b),
+                    "risky_pose": rsky_cr,
+                    "motion": motion,
+                    "audio_alert": audio_alert}
+
+                if snapshot_pool is not None:
+                    snap_path = os.path.join(d_log, f"blur_{int(pres_time)}.jpg")
+                    with t_annotate.time():
+                        ann_fr = people_result.plot() if people_result is not None else fr.copy()
+                    if snapshot_pool.submit(ann_fr, snap_path):
+                        metadata["snapshot_path"] = snap_path
+                    else:
+                        snapshot_saturated.inc()
+                        print(f"⚠️ Snapshot pool saturated: {snapshot_pool.stats()}")
+                    snapshot_pending.set(snapshot_pool.jobs.qsize())
+
+                if preroll is not None:
+                    metadata["clip_path"], metadata["clip_audio_path"] = preroll.trigger(pres_time)
+
+                alert("Risk Detection:", metadata)
+                meta_log(metadata, pres_time)
+
+                latest_alert = f"Alert at: {timestamp}"
+                safety_state.update(lastAlert=timestamp)
+                alert_color = (0, 0, 255)
+                print(f"[Alert at:] {metadata}")
+                t_alert.observe(time.perf_counter() - alert_start)
+
+        renderer.submit(people_result, fr, {
+            "people": len(p_b),
+            "motion": "YES" if motion else "NO",
+            "audio": "HIGH" if audio_alert else "OK",
+            "pose": "YES" if rsky_cr else "NO",
+            "alert": latest_alert,
+            "alert_color": alert_color,
+        }, on_done=pooled.retain().release)
+        pooled.release()
+        t_frame.observe(time.perf_counter() - frame_start)
+        key_f = renderer.poll_key()
+        if key_f == 27:  # ESC
+            break
+        elif key_f == ord('e'):  # manual emergency
+            manual_alerts_total.inc()
+            record_event(event_log.ALERT, "manual")
+            play_beep(cfg.alerts)
+            latest_alert = "Manual Emergency!"
+            safety_state.update(threatLevel="CRITICAL", lastAlert=time.strftime("%Y-%m-%d %H:%M:%S"))
             alert_color = (0, 0, 255)
-            last_alerted = pres_time
-            print(f"[Alert at:] {metadata}")
-
-    dashboard = np.zeros((300, 640, 3), dtype=np.uint8)
-    cv2.putText(dashboard, f"People : {len(p_b)}", (20, 60),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
-    cv2.putText(dashboard, f"Motion : {'YES' if motion else 'NO'}", (20, 110),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (255,255,0), 2)
-    cv2.putText(dashboard, f"Audio : {'HIGH' if audio_alert else 'OK'}", (20, 160),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (255,165,0), 2)
-    cv2.putText(dashboard, f"Pose Risk : {'YES' if rsky_cr else 'NO'}", (20, 210),
-                cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,255), 2)
-    cv2.putText(dashboard, f"Alert at : {latest_alert}", (20, 260),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.9, alert_color, 2)
-
-    cv2.imshow("Live Camera", ann_fr)
-    cv2.imshow("Safety Dashboard", dashboard)
-    prev_fr = fr.copy()
-    key_f = cv2.waitKey(1) & 0xFF
-    if key_f == 27:  # ESC
-        break
-    elif key_f == ord('e'):  # manual emergency
-        play_beep(alert_Hz, alert_time)
-        latest_alert = "Manual Emergency!"
-        alert_color = (0, 0, 255)
-        print("Emergency triggered by the user....")
-
-capture.release()
-cv2.destroyAllWindows()
+            print("Emergency triggered by the user....")
+except KeyboardInterrupt:
+    print("\n👋 Stopping Women Safety System...")
+finally:
+    capture.release()
+    if recorder is not None:
+        recorder.close()
+    if profiler is not None:
+        profiler.stop()
+    alert_log.close()
+    close_evidence_store()
+    if preroll is not None:
+        preroll.close()
+    if snapshot_pool is not None:
+        snapshot_pool.close()
+    renderer.close()
+    alarm.close()
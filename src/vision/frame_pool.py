@@ -0,0 +1,110 @@
+"""
+Reusable frame buffers for the Women Safety vision loop
+Frames are read into preallocated arrays and reference-counted so a buffer
+is only reused once every consumer (renderer, encoders, ...) has released it
+"""
+
+import threading
+
+import numpy as np
+
+
+class PooledFrame:
+    """A pool-owned frame buffer with a reference count"""
+
+    __slots__ = ("array", "pool", "refs")
+
+    def __init__(self, array, pool):
+        self.array = array
+        self.pool = pool
+        self.refs = 0
+
+    def retain(self):
+        """Take an extra reference before handing the frame to another consumer"""
+        with self.pool.lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        """Drop a reference; the buffer returns to the pool when none are left"""
+        self.pool._release(self)
+
+
+class FramePool:
+    """Fixed set of preallocated frame buffers
+
+    acquire() hands out a free buffer with one reference. If every buffer is
+    still referenced a temporary one is allocated and counted as exhausted,
+    so a slow consumer costs memory churn, never a corrupted frame.
+    """
+
+    def __init__(self, size=4, shape=None, dtype=np.uint8):
+        self.size = size
+        self.dtype = dtype
+        self.lock = threading.Lock()
+        self.free = []
+        self.shape = None
+        self.allocations = 0
+        self.exhausted = 0
+        if shape is not None:
+            self._allocate(shape)
+
+    def _allocate(self, shape):
+        self.shape = tuple(shape)
+        self.free = [PooledFrame(np.empty(self.shape, dtype=self.dtype), self) for _ in range(self.size)]
+        self.allocations += self.size
+
+    def acquire(self, shape=None):
+        """Return a free PooledFrame (refs=1), reshaping the pool if the frame size changed"""
+        with self.lock:
+            if shape is not None and tuple(shape) != self.shape:
+                self._allocate(shape)
+            if self.free:
+                frame = self.free.pop()
+            else:
+                self.exhausted += 1
+                self.allocations += 1
+                frame = PooledFrame(np.empty(self.shape, dtype=self.dtype), self)
+            frame.refs = 1
+            return frame
+
+    def _release(self, frame):
+        with self.lock:
+            frame.refs -= 1
+            if frame.refs > 0:
+                return
+            if frame.refs < 0:
+                raise RuntimeError("PooledFrame released more times than retained")
+            # Buffers from an old shape or overflow allocations are simply dropped
+            if frame.array.shape == self.shape and len(self.free) < self.size:
+                self.free.append(frame)
+
+    def read(self, capture):
+        """Read the next frame from a cv2.VideoCapture into a pooled buffer
+
+        Returns (ok, PooledFrame or None). The first read sizes the pool.
+        """
+        if self.shape is None:
+            ok, image = capture.read()
+            if not ok:
+                return False, None
+            frame = self.acquire(image.shape)
+            frame.array[...] = image
+            return True, frame
+
+        frame = self.acquire()
+        ok, image = capture.read(frame.array)
+        if not ok:
+            frame.release()
+            return False, None
+        if image is not frame.array:
+            # The driver changed resolution; resize the pool and keep this frame
+            frame.release()
+            frame = self.acquire(image.shape)
+            frame.array[...] = image
+        return True, frame
+
+    def stats(self):
+        with self.lock:
+            return {"size": self.size, "free": len(self.free), "allocations": self.allocations,
+                    "exhausted": self.exhausted}
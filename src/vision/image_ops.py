@@ -0,0 +1,70 @@
+"""
+Image operations shared by the vision pipeline and benchmarks
+Motion scoring and face blurring without model or camera side effects
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+# detectMultiScale mutates the classifier's feature evaluator, so each thread
+# (frame loop, snapshot workers, pre-roll encoder) gets its own instance
+_face_cascades = threading.local()
+
+
+def get_face_cascade():
+    """Load the Haar face cascade once per thread"""
+    cascade = getattr(_face_cascades, "cascade", None)
+    if cascade is None:
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        _face_cascades.cascade = cascade
+    return cascade
+
+
+def blur_faces(fr):
+    """Blur detected faces in place and return the frame"""
+    gray = cv2.cvtColor(fr, cv2.COLOR_BGR2GRAY)
+    faces = get_face_cascade().detectMultiScale(gray, 1.3, 5)
+    for (x, y, w, h) in faces:
+        face = fr[y:y+h, x:x+w]
+        blur = cv2.GaussianBlur(face, (49, 49), 30)
+        fr[y:y+h, x:x+w] = blur
+    return fr
+
+
+def motion_score(prev_fr, curr_fr):
+    """Sum of absolute grayscale differences, in units of full-intensity pixels"""
+    gray_prev = cv2.cvtColor(prev_fr, cv2.COLOR_BGR2GRAY)
+    gray_curr = cv2.cvtColor(curr_fr, cv2.COLOR_BGR2GRAY)
+    diff = cv2.absdiff(gray_prev, gray_curr)
+    return np.sum(diff) / 255
+
+
+class MotionDetector:
+    """Frame-difference motion score with preallocated grayscale buffers
+
+    Keeps the previous frame's grayscale image, so each update converts one
+    frame instead of two and the caller no longer has to keep prev_fr alive.
+    """
+
+    def __init__(self):
+        self.prev_gray = None
+        self.curr_gray = None
+        self.diff = None
+
+    def update(self, frame):
+        """Return the motion score against the previous frame (None for the first)"""
+        height, width = frame.shape[:2]
+        if self.prev_gray is None or self.prev_gray.shape != (height, width):
+            self.prev_gray = np.empty((height, width), dtype=np.uint8)
+            self.curr_gray = np.empty((height, width), dtype=np.uint8)
+            self.diff = np.empty((height, width), dtype=np.uint8)
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.prev_gray)
+            return None
+
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.curr_gray)
+        cv2.absdiff(self.prev_gray, self.curr_gray, dst=self.diff)
+        score = cv2.sumElems(self.diff)[0] / 255
+        self.prev_gray, self.curr_gray = self.curr_gray, self.prev_gray
+        return score
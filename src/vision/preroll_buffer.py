@@ -0,0 +1,228 @@
+"""
+Pre-event ring buffer for the Women Safety Application
+Keeps the last few seconds of JPEG frames and int16 audio in memory and
+writes evidence clips around an alert through a background encoder
+"""
+
+import os
+import time
+import wave
+import queue
+import threading
+from collections import deque
+
+import cv2
+import numpy as np
+
+
+class PreRollBuffer:
+    """Fixed-capacity in-memory pre-roll of compressed video and audio"""
+
+    def __init__(self, pre_seconds=10, post_seconds=5, fps=15, jpeg_quality=70,
+                 max_frame_bytes=32 * 1024 * 1024, audio_rate=16000,
+                 output_dir="snapshots", blur=None):
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.fps = fps
+        self.jpeg_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+        self.max_frame_bytes = max_frame_bytes
+        self.audio_rate = audio_rate
+        self.output_dir = output_dir
+        # Applied to every frame on the encoder thread before it reaches disk
+        self.blur = blur
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        # Frames are (timestamp, jpeg bytes); the deque is bounded by count
+        # and the byte budget is enforced on every push
+        self.window = pre_seconds + post_seconds
+        self.frames = deque(maxlen=max(1, int(self.window * fps)))
+        self.frame_bytes = 0
+        self.min_frame_interval = 1.0 / fps
+        self.last_frame_time = 0.0
+
+        # Audio arrives as separate recordings with gaps between them, so each
+        # int16 block keeps its own end timestamp; clips pad the gaps with silence
+        self.audio_blocks = deque()
+        self.audio_samples = 0
+        self.audio_capacity = int(self.window * audio_rate)
+
+        self.lock = threading.Lock()
+        self.pending = []
+        self.encode_queue = queue.Queue(maxsize=4)
+        self.clips_written = 0
+        self.clips_dropped = 0
+
+        self.is_running = True
+        self.encoder_thread = threading.Thread(target=self._encoder_loop, name="preroll-encoder")
+        self.encoder_thread.daemon = True
+        self.encoder_thread.start()
+
+    def push_frame(self, frame, timestamp=None):
+        """Compress and store a frame, skipping frames above the target FPS"""
+        if timestamp is None:
+            timestamp = time.time()
+        if timestamp - self.last_frame_time < self.min_frame_interval:
+            self._check_pending(timestamp)
+            return False
+        ok, encoded = cv2.imencode(".jpg", frame, self.jpeg_params)
+        if not ok:
+            return False
+        data = encoded.tobytes()
+
+        with self.lock:
+            if len(self.frames) == self.frames.maxlen:
+                self.frame_bytes -= len(self.frames[0][1])
+            self.frames.append((timestamp, data))
+            self.frame_bytes += len(data)
+            while self.frame_bytes > self.max_frame_bytes and len(self.frames) > 1:
+                self.frame_bytes -= len(self.frames.popleft()[1])
+            self.last_frame_time = timestamp
+
+        self._check_pending(timestamp)
+        return True
+
+    def push_audio(self, samples, timestamp=None):
+        """Store float [-1, 1] or int16 samples; timestamp marks the last sample"""
+        if timestamp is None:
+            timestamp = time.time()
+        samples = np.asarray(samples).reshape(-1)
+        if samples.dtype != np.int16:
+            samples = (np.clip(samples, -1.0, 1.0) * 32767).astype(np.int16)
+        else:
+            samples = samples.copy()
+        if len(samples) > self.audio_capacity:
+            samples = samples[-self.audio_capacity:]
+
+        with self.lock:
+            self.audio_blocks.append((timestamp, samples))
+            self.audio_samples += len(samples)
+            while self.audio_samples > self.audio_capacity and len(self.audio_blocks) > 1:
+                self.audio_samples -= len(self.audio_blocks.popleft()[1])
+
+        self._check_pending(timestamp)
+
+    def trigger(self, timestamp=None, name=None):
+        """Schedule a clip from pre_seconds before to post_seconds after the trigger
+
+        Returns the (.avi, .wav) paths the clip will be written to; each file
+        is only written if that stream has data in the window.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        if name is None:
+            name = f"clip_{int(timestamp)}"
+        with self.lock:
+            self.pending.append((timestamp, name))
+        base = os.path.join(self.output_dir, name)
+        return base + ".avi", base + ".wav"
+
+    def _check_pending(self, now):
+        """Hand finished clip windows to the encoder without blocking"""
+        if not self.pending:
+            return
+        with self.lock:
+            ready = [p for p in self.pending if now - p[0] >= self.post_seconds]
+            if not ready:
+                return
+            self.pending = [p for p in self.pending if now - p[0] < self.post_seconds]
+            jobs = [self._snapshot_window(trigger_time, name) for trigger_time, name in ready]
+
+        for job in jobs:
+            try:
+                self.encode_queue.put_nowait(job)
+            except queue.Full:
+                self.clips_dropped += 1
+                print(f"⚠️ Pre-roll encoder busy, dropped clip {job[0]}")
+
+    def _snapshot_window(self, trigger_time, name):
+        """Copy out the frames and audio for a clip (called with the lock held)
+
+        Audio is laid out on the video's timeline: sample 0 is the first
+        frame, and time not covered by any recording is silence.
+        """
+        start = trigger_time - self.pre_seconds
+        end = trigger_time + self.post_seconds
+        frames = [f for f in self.frames if start <= f[0] <= end]
+
+        if frames:
+            origin = frames[0][0]
+            span = frames[-1][0] - origin
+            stop = frames[-1][0] + (span / (len(frames) - 1) if span > 0 else 1.0 / self.fps)
+        else:
+            origin, stop = start, end
+        blocks = [(t - len(b) / self.audio_rate, b) for t, b in self.audio_blocks
+                  if t > origin and t - len(b) / self.audio_rate < stop]
+        if not blocks:
+            return name, frames, np.zeros(0, dtype=np.int16)
+        if not frames:
+            # Audio-only clip: trim the leading and trailing silence
+            origin = max(origin, blocks[0][0])
+            stop = min(stop, max(b_start + len(b) / self.audio_rate for b_start, b in blocks))
+
+        audio = np.zeros(max(0, int(round((stop - origin) * self.audio_rate))), dtype=np.int16)
+        for block_start, block in blocks:
+            at = int(round((block_start - origin) * self.audio_rate))
+            lo, hi = max(0, -at), min(len(block), len(audio) - at)
+            if hi > lo:
+                audio[at + lo:at + hi] = block[lo:hi]
+        return name, frames, audio
+
+    def _encoder_loop(self):
+        while self.is_running or not self.encode_queue.empty():
+            try:
+                name, frames, audio = self.encode_queue.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                self._write_clip(name, frames, audio)
+                self.clips_written += 1
+            except Exception as e:
+                print(f"❌ Error writing pre-roll clip {name}: {str(e)}")
+            finally:
+                self.encode_queue.task_done()
+
+    def _write_clip(self, name, frames, audio):
+        base = os.path.join(self.output_dir, name)
+        if frames:
+            first = cv2.imdecode(np.frombuffer(frames[0][1], dtype=np.uint8), cv2.IMREAD_COLOR)
+            height, width = first.shape[:2]
+            span = frames[-1][0] - frames[0][0]
+            fps = (len(frames) - 1) / span if span > 0 else self.fps
+            writer = cv2.VideoWriter(base + ".avi", cv2.VideoWriter_fourcc(*"MJPG"),
+                                     fps, (width, height))
+            for _, data in frames:
+                frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if self.blur is not None:
+                    frame = self.blur(frame)
+                writer.write(frame)
+            writer.release()
+
+        if len(audio):
+            with wave.open(base + ".wav", "wb") as w:
+                w.setnchannels(1)
+                w.setsampwidth(2)
+                w.setframerate(self.audio_rate)
+                w.writeframes(audio.tobytes())
+
+    def memory_usage(self):
+        """Return bytes held by the buffer, split by modality"""
+        with self.lock:
+            frames = self.frame_bytes
+            count = len(self.frames)
+            audio = self.audio_samples * 2
+        return {
+            "frames": count,
+            "frame_bytes": frames,
+            "audio_bytes": audio,
+            "total_bytes": frames + audio,
+        }
+
+    def close(self):
+        """Flush clips that are still waiting on post-trigger time, then stop"""
+        with self.lock:
+            jobs = [self._snapshot_window(t, n) for t, n in self.pending]
+            self.pending = []
+        for job in jobs:
+            self.encode_queue.put(job)
+        self.is_running = False
+        self.encoder_thread.join()
@@ -0,0 +1,173 @@
+"""
+Live view and Safety Dashboard renderer for the Women Safety Application
+Draws at a capped FPS on its own thread so inference never waits on the GUI
+"""
+
+import sys
+import time
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+from utils.metrics import get_metrics
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# (status key, label, baseline y, font scale, colour); colour None = use status["alert_color"]
+DASHBOARD_LINES = (
+    ("people", "People : ", 60, 1.0, (0, 255, 0)),
+    ("motion", "Motion : ", 110, 1.0, (255, 255, 0)),
+    ("audio", "Audio : ", 160, 1.0, (255, 165, 0)),
+    ("pose", "Pose Risk : ", 210, 1.0, (0, 255, 255)),
+    ("alert", "Alert at : ", 260, 0.9, None),
+)
+
+
+class LiveRenderer:
+    """Renders the latest frame and dashboard status, dropping stale frames
+
+    Frames are annotated lazily (result.plot() only runs for frames that are
+    actually shown) and the dashboard background is drawn once; only values
+    that changed are redrawn. In headless mode nothing is annotated or shown.
+    """
+
+    def __init__(self, max_fps=15, headless=False, size=(300, 640), threaded=None):
+        self.min_interval = 1.0 / max_fps if max_fps > 0 else 0.0
+        self.headless = headless
+        # Cocoa only allows GUI calls from the main thread
+        self.threaded = (sys.platform != "darwin") if threaded is None else threaded
+
+        self.metrics = get_metrics()
+        self.t_render = self.metrics.stage("render")
+        self.skipped = self.metrics.counter("renders_skipped_total", "Frames not displayed due to the FPS cap")
+
+        self.keys = queue.Queue()
+        self.latest = None
+        self.latest_lock = threading.Lock()
+        self.new_frame = threading.Event()
+        self.last_render = 0.0
+        self.is_running = True
+
+        if not headless:
+            self.dashboard = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+            self.value_x = {}
+            self.drawn_values = {}
+            self._draw_background()
+
+        self.thread = None
+        if not headless and self.threaded:
+            self.thread = threading.Thread(target=self._render_loop, name="renderer")
+            self.thread.daemon = True
+            self.thread.start()
+
+    def _draw_background(self):
+        for key, label, y, scale, colour in DASHBOARD_LINES:
+            if colour is not None:
+                cv2.putText(self.dashboard, label, (20, y), FONT, scale, colour, 2)
+            (width, _), _ = cv2.getTextSize(label, FONT, scale, 2)
+            self.value_x[key] = 20 + width
+
+    def _update_dashboard(self, status):
+        for key, label, y, scale, colour in DASHBOARD_LINES:
+            text = str(status.get(key, ""))
+            line_colour = colour or tuple(status.get("alert_color", (0, 255, 0)))
+            previous = self.drawn_values.get(key)
+            if previous == (text, line_colour):
+                continue
+            if colour is None and (previous is None or previous[1] != line_colour):
+                # The alert label shares the value colour, so redraw the whole line
+                cv2.rectangle(self.dashboard, (0, y - 30), (self.dashboard.shape[1], y + 10), (0, 0, 0), -1)
+                cv2.putText(self.dashboard, label, (20, y), FONT, scale, line_colour, 2)
+            else:
+                x = self.value_x[key]
+                cv2.rectangle(self.dashboard, (x, y - 30), (self.dashboard.shape[1], y + 10), (0, 0, 0), -1)
+            cv2.putText(self.dashboard, text, (self.value_x[key], y), FONT, scale, line_colour, 2)
+            self.drawn_values[key] = (text, line_colour)
+
+    def _render(self, result, frame, status):
+        with self.t_render.time():
+            view = result.plot() if result is not None else frame
+            self._update_dashboard(status)
+            cv2.imshow("Live Camera", view)
+            cv2.imshow("Safety Dashboard", self.dashboard)
+            key = cv2.waitKey(1) & 0xFF
+            if key != 0xFF:
+                self.keys.put(key)
+        self.last_render = time.perf_counter()
+
+    def submit(self, result, frame, status, on_done=None):
+        """Offer the latest detection result/frame and dashboard status for display
+
+        result is the YOLO result to annotate (or None to show frame as-is).
+        on_done() is called once the renderer no longer needs frame (after it
+        is drawn or dropped), e.g. to release a pooled buffer.
+        Never blocks on the GUI; older undisplayed frames are dropped.
+        """
+        if self.headless:
+            if on_done is not None:
+                on_done()
+            return
+        if not self.threaded:
+            # Inline mode: honour the FPS cap but draw on the caller's thread
+            try:
+                if time.perf_counter() - self.last_render < self.min_interval:
+                    self.skipped.inc()
+                    return
+                self._render(result, frame, status)
+            finally:
+                if on_done is not None:
+                    on_done()
+            return
+        with self.latest_lock:
+            dropped = self.latest
+            self.latest = (result, frame, status, on_done)
+        if dropped is not None:
+            self.skipped.inc()
+            if dropped[3] is not None:
+                dropped[3]()
+        self.new_frame.set()
+
+    def _render_loop(self):
+        while self.is_running:
+            if not self.new_frame.wait(0.1):
+                # Keep the windows responsive even without new frames
+                key = cv2.waitKey(1) & 0xFF
+                if key != 0xFF:
+                    self.keys.put(key)
+                continue
+            wait = self.min_interval - (time.perf_counter() - self.last_render)
+            if wait > 0:
+                time.sleep(wait)
+            with self.latest_lock:
+                item = self.latest
+                self.latest = None
+                self.new_frame.clear()
+            if item is not None:
+                result, frame, status, on_done = item
+                try:
+                    self._render(result, frame, status)
+                except Exception as e:
+                    print(f"❌ Error rendering frame: {str(e)}")
+                finally:
+                    if on_done is not None:
+                        on_done()
+
+    def poll_key(self):
+        """Return the next key pressed in a window, or None"""
+        try:
+            return self.keys.get_nowait()
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.is_running = False
+        if self.thread is not None:
+            self.thread.join(1.0)
+        with self.latest_lock:
+            item, self.latest = self.latest, None
+        if item is not None and item[3] is not None:
+            item[3]()
+        if not self.headless:
+            cv2.destroyAllWindows()
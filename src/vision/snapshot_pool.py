@@ -0,0 +1,106 @@
+"""
+Snapshot worker pool for the Women Safety Application
+Blurs, encodes and writes alert snapshots off the frame loop
+"""
+
+import os
+import queue
+import threading
+
+import cv2
+
+
+class SnapshotPool:
+    """Bounded pool of worker threads for blur + JPEG encode + write jobs"""
+
+    def __init__(self, blur_fn=None, workers=2, max_pending=8, jpeg_quality=85, max_width=None):
+        self.blur_fn = blur_fn
+        self.jpeg_quality = jpeg_quality
+        self.max_width = max_width
+        self.jobs = queue.Queue(maxsize=max_pending)
+
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.written = 0
+        self.failed = 0
+        self.saturated = 0
+        self.busy = 0
+
+        self.is_running = True
+        self.threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._worker, name=f"snapshot-worker-{i}")
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, frame, path):
+        """Queue a snapshot; returns False (and counts saturation) when the pool is full
+
+        The pool takes ownership of frame, so pass a copy if the caller reuses it.
+        """
+        try:
+            self.jobs.put_nowait((frame, path))
+        except queue.Full:
+            with self.lock:
+                self.saturated += 1
+            return False
+        with self.lock:
+            self.submitted += 1
+        return True
+
+    def _encode(self, frame):
+        if self.blur_fn is not None:
+            frame = self.blur_fn(frame)
+        if self.max_width and frame.shape[1] > self.max_width:
+            scale = self.max_width / frame.shape[1]
+            frame = cv2.resize(frame, (self.max_width, int(frame.shape[0] * scale)),
+                               interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), int(self.jpeg_quality)])
+        if not ok:
+            raise RuntimeError("JPEG encoding failed")
+        return encoded
+
+    def _worker(self):
+        while self.is_running or not self.jobs.empty():
+            try:
+                frame, path = self.jobs.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            with self.lock:
+                self.busy += 1
+            try:
+                encoded = self._encode(frame)
+                directory = os.path.dirname(path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(encoded.tobytes())
+                with self.lock:
+                    self.written += 1
+            except Exception as e:
+                with self.lock:
+                    self.failed += 1
+                print(f"❌ Error writing snapshot {path}: {str(e)}")
+            finally:
+                with self.lock:
+                    self.busy -= 1
+                self.jobs.task_done()
+
+    def stats(self):
+        """Return pool counters; saturated > 0 means alerts outran the workers"""
+        with self.lock:
+            return {
+                "submitted": self.submitted,
+                "written": self.written,
+                "failed": self.failed,
+                "saturated": self.saturated,
+                "pending": self.jobs.qsize(),
+                "busy": self.busy,
+            }
+
+    def close(self):
+        """Finish queued snapshots and stop the workers"""
+        self.is_running = False
+        for thread in self.threads:
+            thread.join()